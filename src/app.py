@@ -1,14 +1,26 @@
 import curses
 import enum
 import logging
+import selectors
+import sys
+import time
+import typing
 
+import httpx
+
+from bench import Benchmark
 import colors
 import commands
+import completion
 import controls
 import executor
+import finder
+import timers
 from entities.context import AppContext
 from entities.request import Collection, Method, Request
 from entities.response import Response
+from profiling import Profiler
+from runner import CollectionRunner
 import util
 
 from views.request_view import RequestView
@@ -21,27 +33,41 @@ class Mode(enum.Enum):
 
 
 class App:
-    __stdscr: curses.window
+    __stdscr: controls.Window
 
     __mode: Mode
     __running: bool
 
     # UI
+    __compositor: controls.Compositor
+
     __collection_pane: controls.Panel
     __collection: controls.ListBox
     __command: controls.LineEdit
 
-    __request_pane: controls.Panel
+    __request_pane: RequestView
+    __response_pane: ResponseView
 
     __focus: controls.Control | None
 
     # Internal
     __executor: executor.RequestExecutor
+    __timers: timers.TimerQueue
+    __streams: dict[str, tuple[Response, bytearray]]
+    __handlers: dict[str, typing.Callable[[str, executor.Result], typing.Any]]
+    __benchmark: Benchmark | None
+    __runner: CollectionRunner | None
+    __profiler: Profiler | None
+    __finder: finder.FuzzyIndex
+    __matches: list[finder.Match] | None  # shown while a :find command is typed
+    __match: int
+    __names: completion.PrefixTrie  # of collections and requests
+    __completion: completion.Completion | None
 
     # Public
     context: AppContext
 
-    def __init__(self, stdscr: curses.window, context: AppContext):
+    def __init__(self, stdscr: controls.Window, context: AppContext, profiler: Profiler | None = None):
         self.__stdscr = stdscr
         self.__mode = Mode.control
         self.__running = True
@@ -49,7 +75,12 @@ class App:
 
         bounds = stdscr.getmaxyx()
 
-        controls.Control.configure(foreground=colors.get_color("foreground"), background=colors.get_color("background"))
+        self.__compositor = controls.Compositor()
+        controls.Control.configure(
+            foreground=colors.get_color("foreground"),
+            background=colors.get_color("background"),
+            compositor=self.__compositor,
+        )
         stdscr.bkgd(colors.color_pair(
             colors.get_color("foreground"),
             colors.get_color("background"),
@@ -63,6 +94,7 @@ class App:
         self.__collection_name.italic = True
         self.__collection_name.underline = True
         self.__collection = controls.ListBox(self.__collection_pane.window, (2, 1), (pane_size[0] - 1, pane_size[1]))
+        self.__collection.activate = self.select_request
 
         pane_width = (bounds[1] - 50) // 2
         self.__request_pane = RequestView(self, (0, 50), (bounds[0] - 2, pane_width))
@@ -74,9 +106,29 @@ class App:
         self.__command = controls.LineEdit(stdscr, (bounds[0] - 1, 0), bounds[1])
 
         self.__focus = None
-        self.__executor = executor.RequestExecutor()
-
-        self.create_collection("Unsorted Collection", True)
+        self.__executor = executor.create_executor(context.settings.executor)
+        self.__timers = timers.TimerQueue()
+        self.__streams = {}
+        self.__handlers = {}
+        self.__benchmark = None
+        self.__runner = None
+        self.__profiler = profiler
+        entries = [
+            (collection.name, request)
+            for collection in context.collections
+            for request in [None, *self.__request_names(collection)]
+        ]
+        self.__finder = finder.FuzzyIndex()
+        self.__finder.extend(entries)
+        self.__matches = None
+        self.__match = 0
+        self.__names = completion.PrefixTrie([request or collection for collection, request in entries])
+        self.__completion = None
+
+        if context.collections:
+            self.set_active_collection(context.collections[0])
+        else:
+            self.create_collection("Unsorted Collection", True)
 
         # TODO: temporary
         self.context.active_request = Request(name="", method=Method.GET, url="", headers={})
@@ -87,6 +139,7 @@ class App:
         self.__collection_name.repaint()
         self.__collection.repaint()
         self.__status.repaint()
+        self.render_frame()
 
     def update_focus(self):
         if self.__focus is not None and not self.__focus.focused:
@@ -105,21 +158,97 @@ class App:
 
     def update(self):
         for request_key, result in self.__executor.collect():
-            self.set_response(request_key, Response(status=result.status_code, headers=dict(result.headers), data=result.content))
+            handler = self.__handlers.get(request_key)
+            if handler is not None:
+                if not isinstance(result, (executor.StreamStart, executor.StreamChunk)):
+                    del self.__handlers[request_key]
+                handler(request_key, result)
+                continue
+
+            match result:
+                case Exception():
+                    self.__streams.pop(request_key, None)
+                    if request_key == self.active_request_key:
+                        self.__response_pane.set_loading(False)
+                        self.status_error("Error: " + str(result))
+                case executor.StreamStart():
+                    # show the response head immediately, body chunks follow
+                    response = Response(status=result.status, headers=result.headers, data=b"")
+                    buffer = bytearray()
+                    self.__streams[request_key] = response, buffer
+                    self.set_response(request_key, response, body=buffer)
+                    if request_key == self.active_request_key:
+                        self.__response_pane.set_progress(0, result.total)
+                case executor.StreamChunk():
+                    stream = self.__streams.get(request_key)
+                    if stream is None:
+                        continue
+                    stream[1].extend(result.data)
+                    if request_key == self.active_request_key:
+                        self.__response_pane.set_progress(result.received, result.total)
+                case _:
+                    stream = self.__streams.pop(request_key, None)
+                    if stream is not None:
+                        response, buffer = stream
+                        response.data = bytes(buffer)
+                        response.cache_status = executor.cache_status(result)
+                        response.timing = executor.response_timing(result)
+                        self.set_response(request_key, response)
+                    else:
+                        self.set_response(request_key, Response(
+                            status=result.status_code,
+                            headers=dict(result.headers),
+                            data=result.content,
+                            cache_status=executor.cache_status(result),
+                            timing=executor.response_timing(result),
+                        ))
 
     def run(self) -> int:
         curses.curs_set(0)
         self.__stdscr.nodelay(True)
+
+        # sleep until a key arrives, the executor signals a result or a timer is due
+        selector = selectors.DefaultSelector()
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        selector.register(self.__executor, selectors.EVENT_READ)
+        try:
+            while self.__running:
+                selector.select(self.__timers.timeout())
+                begin = time.perf_counter_ns()
+                self.__timers.run_due()
+                self.update()
+                keys = self.handle_keys()
+                self.update_focus()
+                self.render_frame()
+                if self.__profiler is not None:
+                    # select() returns as soon as a key arrives, so this is its latency up to the paint
+                    elapsed = time.perf_counter_ns() - begin
+                    self.__profiler.record("frame", elapsed)
+                    if keys:
+                        self.__profiler.record("key to paint", elapsed)
+        finally:
+            selector.close()
+
+        return 0
+
+    def render_frame(self):
+        cursor = self.__command if self.__mode == Mode.command else self.__focus
+        self.__compositor.flush(cursor)
+
+    def handle_keys(self) -> int:
+        """
+        Handle every pending key; returns how many there were.
+        """
+        handled = 0
         while self.__running:
             ch = self.__stdscr.getch()
+            if ch == -1:
+                break
+            handled += 1
             if ch == 27:
                 next = self.__stdscr.getch()
                 if next != -1:
                     continue
-            elif ch == -1:
-                self.update_focus()
-                self.update()
-                continue
 
             if self.__mode == Mode.control:
                 can_take_focus = self.__focus is None or (self.__focus is not None and not self.__focus.focus_greedy)
@@ -134,16 +263,23 @@ class App:
                     self.execute_command()
                 elif ch == 27:
                     self.cancel_command()
+                elif ch == ord('\t'):
+                    self.complete_command()
+                elif ch in (curses.KEY_UP, curses.KEY_DOWN, controls.Control.CTRL_P, controls.Control.CTRL_N) and self.__matches:
+                    step = -1 if ch in (curses.KEY_UP, controls.Control.CTRL_P) else 1
+                    self.__match = (self.__match + step) % len(self.__matches)
+                    self.show_matches()
                 else:
                     curses.curs_set(2)
                     self.update_command(ch)
                     command = self.__command.get_text()
                     if not command.startswith(':'):
                         self.cancel_command()
+                    else:
+                        self.update_matches()
 
             self.update()
-
-        return 0
+        return handled
 
     def begin_command(self):
         self.__mode = Mode.command
@@ -156,6 +292,10 @@ class App:
         self.__mode = Mode.control
         self.__command.set_text("")
         self.__command.unfocus()
+        self.__completion = None
+        if self.__matches is not None:
+            self.__matches = None
+            self.show_active_response()
 
     def execute_command(self):
         curses.curs_set(0)
@@ -168,10 +308,88 @@ class App:
             self.status_clear()
         except commands.CommandError as err:
             self.status_error("Error: " + str(err))
+        finally:
+            self.__matches = None
+            self.__completion = None
 
     def update_command(self, ch: int):
         self.__command.handle_input(ch)
 
+    def complete_command(self):
+        """
+        Complete the word at the end of the command: the command name, or
+        a collection or request name. Pressing Tab again steps through the
+        other candidates.
+        """
+        command = self.__command.get_text()
+        if self.__completion is None or self.__completion.text != command:
+            head, word = commands.split_command(command[1:])
+            if not head:
+                candidates = commands.complete(word)
+            else:
+                candidates = self.__names.completions(word, limit=500)
+            if not candidates:
+                self.__completion = None
+                return
+            self.__completion = completion.Completion(":" + head, candidates)
+
+        self.__command.set_text(self.__completion.next())
+        self.update_matches()
+        candidates, index = self.__completion.candidates, self.__completion.index
+        if len(candidates) > 1:
+            self.status_info(f"{index + 1}/{len(candidates)}: " + "  ".join(candidates[index:index + 20]))
+
+    def update_matches(self):
+        """
+        Re-rank the matches of a :find command being typed.
+        """
+        command = self.__command.get_text()
+        if not command.startswith(":find "):
+            if self.__matches is not None:
+                self.__matches = None
+                self.show_active_response()
+            return
+        # quotes that keep a completed name together are not part of it
+        query = command[len(":find "):].replace('"', " ").replace("'", " ")
+        self.__matches = self.__finder.search(query, limit=max(self.__response_pane.pane_size[0] - 1, 1))
+        self.__match = 0
+        self.show_matches()
+
+    def show_matches(self):
+        lines = []
+        for index, match in enumerate(self.__matches or []):
+            marker = ">" if index == self.__match else " "
+            if match.request is None:
+                lines.append(f"{marker} [{match.collection}]")
+            else:
+                lines.append(f"{marker} {match.request}  ({match.collection})")
+        self.__response_pane.set_report("find", "\n".join(lines) or "no matches")
+
+    def find(self, query: str):
+        """
+        Jump to the match of `query` selected while typing it, or its best.
+        """
+        matches = self.__matches if self.__matches is not None else self.__finder.search(query, limit=1)
+        selected = self.__match if self.__matches is not None else 0
+        self.__matches = None
+        if not matches:
+            self.show_active_response()
+            raise commands.CommandError("Nothing matches '%s'." % query)
+        self.jump_to(matches[selected])
+
+    def jump_to(self, match: finder.Match):
+        collection = next((collection for collection in self.context.collections if collection.name == match.collection), None)
+        if collection is None:
+            raise commands.CommandError("Collection '%s' no longer exists." % match.collection)
+        if collection is not self.context.active_collection:
+            self.set_active_collection(collection)
+        if match.request is None:
+            self.show_active_response()
+            return
+        self.select_request(match.request)
+        self.__collection.select_item(match.request)
+        self.set_focus(self.__collection)
+
     # convenience status functions
     def status_error(self, message: str):
         with self.__status.no_repaint():
@@ -195,14 +413,25 @@ class App:
             self.__status.set_text("")
 
     # public API
-    def set_response(self, request_key: str, response: Response):
+    def set_response(self, request_key: str, response: Response, body: bytearray | None = None):
+        """
+        Store and, if it belongs to the active request, display a response.
+        `body` is the buffer a streamed response is still being read into.
+        """
         self.context.responses[request_key] = response
         if request_key == self.active_request_key:
-            self.__response_pane.set_response(response)
+            self.__response_pane.set_response(response, body=body)
 
     def create_collection(self, name: str, activate: bool = False) -> Collection:
+        if name in [collection.name for collection in self.context.collections]:
+            raise commands.CommandError("Collection '%s' already exists." % name)
+
         new_collection = Collection(requests=[], name=name)
         self.context.collections.append(new_collection)
+        self.__finder.add(name)
+        self.__names.add(name)
+        if self.context.workspace:
+            self.context.workspace.create_collection(new_collection)
         if activate:
             self.set_active_collection(new_collection)
         return new_collection
@@ -212,35 +441,182 @@ class App:
         self.__collection_pane.window.move(1, 1)
         length = self.__collection_pane.pane_size[1]
         self.__collection_name.set_text(util.ellipsize(collection.name, length).ljust(length, " "))
-        self.__collection.clear()
-        for request in collection.requests:
-            self.__collection.add_item(request.name)
+        if self.context.workspace:
+            # only the names on screen are read, so large collections open at once
+            workspace = self.context.workspace
+            self.__collection.set_items(controls.PagedItems(
+                lambda offset, limit: workspace.request_names(collection, offset, limit),
+                lambda: workspace.request_count(collection),
+                key=util.name_key,
+            ))
+        else:
+            names = sorted((request.name for request in collection.requests), key=util.name_key)
+            self.__collection.set_items(controls.ListItems(names, key=util.name_key))
+
+    def __request_names(self, collection: Collection) -> list[str]:
+        if self.context.workspace:
+            return self.context.workspace.request_names(collection)
+        return [request.name for request in collection.requests]
 
     def set_active_request(self, request: Request):
-        pass
+        self.context.active_request = request
+        self.__request_pane.set_request(request)
+        self.show_active_response()
+
+    def show_active_response(self):
+        key = self.active_request_key
+        response = self.context.responses.get(key) if key is not None else None
+        if response is not None:
+            self.__response_pane.set_response(response)
+        else:
+            self.__response_pane.clear()
+
+    def select_request(self, name: str):
+        collection = self.context.active_collection
+        if collection is None:
+            return
+        if self.context.workspace:
+            request = self.context.workspace.get_request(collection, name)
+        else:
+            request = next((request for request in collection.requests if request.name == name), None)
+        if request is not None:
+            self.set_active_request(request)
+
+    def has_request(self, collection: Collection, name: str) -> bool:
+        if self.context.workspace:
+            return self.context.workspace.has_request(collection, name)
+        return name in [request.name for request in collection.requests]
+
+    def requests_of(self, collection: Collection) -> list[Request]:
+        """
+        All requests of a collection, including those a lazily loading
+        workspace store has not read yet.
+        """
+        if self.context.workspace:
+            workspace = self.context.workspace
+            requests = (workspace.get_request(collection, name) for name in workspace.request_names(collection))
+            return [request for request in requests if request is not None]
+        return list(collection.requests)
 
     def create_request(self, name: str, activate: bool = False) -> Request:
         if self.context.active_collection is None:
             raise ValueError("No active collection.")
 
-        if name in [request.name for request in self.context.active_collection.requests]:
+        if self.has_request(self.context.active_collection, name):
             raise commands.CommandError("Request '%s' already exists in this collection." % name)
 
         new_request = Request(name=name, method="POST", url="http://httpbin.org/get", headers={})
         self.context.active_collection.requests.append(new_request)
-        self.__collection.insort_item(name, key=str.lower)
+        if self.context.workspace:
+            self.context.workspace.create_request(self.context.active_collection, new_request)
+        self.__collection.insort_item(name, key=util.name_key)
+        self.__finder.add(self.context.active_collection.name, name)
+        self.__names.add(name)
         if activate:
             self.set_active_request(new_request)
         return new_request
 
+    def save_request(self, request: Request):
+        """
+        Record an edit made to a request of the active collection.
+        """
+        if self.context.workspace and self.context.active_collection:
+            self.context.workspace.update_request(self.context.active_collection, request)
+
     def execute_request(self):
         exec_id = self.active_request_key
         if exec_id and self.context.active_request:
-            self.__response_pane.set_loading(True)
-            self.__executor.dispatch(self.context.active_request, exec_id)
+            try:
+                started = self.__executor.dispatch(self.context.active_request, exec_id)
+            except executor.ExecutorBusy as err:
+                self.status_error("Error: " + str(err))
+                return
+            # a send coalesced into one already in flight keeps showing that one
+            if started:
+                self.__streams.pop(exec_id, None)
+                self.__response_pane.set_loading(True)
+
+    def dispatch(self, request: Request, exec_id: str, handler: typing.Callable[[str, executor.Result], typing.Any], stream: bool | None = None, cache: bool = True):
+        """
+        Execute a request on behalf of something other than the response
+        pane: its results go to `handler` instead. Raises ExecutorBusy when
+        the executor cannot take it right now. Without `cache`, the response
+        cache is bypassed.
+        """
+        self.__executor.dispatch(request, exec_id, stream=stream, cache=cache)
+        self.__handlers[exec_id] = handler
+
+    def cancel(self, exec_id: str):
+        """
+        Cancel an execution started with dispatch; its handler is not called.
+        """
+        self.__executor.cancel(exec_id)
+        self.__handlers.pop(exec_id, None)
+
+    def start_benchmark(self, total: int, concurrency: int, rate: float | None = None) -> Benchmark:
+        if self.context.active_request is None:
+            raise commands.CommandError("No active request.")
+        if self.__benchmark is not None and not self.__benchmark.done:
+            raise commands.CommandError("A benchmark is already running.")
+
+        # a snapshot, so editing the request does not change it mid-run
+        self.__benchmark = Benchmark(self, self.context.active_request.snapshot(), total, concurrency, rate)
+        self.__benchmark.start()
+        return self.__benchmark
+
+    def stop_benchmark(self):
+        if self.__benchmark is not None:
+            self.__benchmark.stop()
+
+    def start_run(self, concurrency: int) -> CollectionRunner:
+        collection = self.context.active_collection
+        if collection is None:
+            raise commands.CommandError("No active collection.")
+        if self.__runner is not None and not self.__runner.done:
+            raise commands.CommandError("A run is already in progress.")
+
+        # snapshots, so editing requests does not change them mid-run
+        requests = [request.snapshot() for request in self.requests_of(collection)]
+        try:
+            runner = CollectionRunner(self, collection, requests, concurrency)
+        except ValueError as err:
+            raise commands.CommandError(str(err))
+
+        def store(name: str, result: executor.Result, elapsed: float):
+            if isinstance(result, httpx.Response):
+                response = Response(
+                    status=result.status_code,
+                    headers=dict(result.headers),
+                    data=result.content,
+                    cache_status=executor.cache_status(result),
+                    timing=executor.response_timing(result),
+                )
+                self.set_response(f"{collection.name}/{name}", response)
+
+        def finished():
+            progress.cancel()
+            self.status_info(runner.summary())
+            self.__response_pane.set_report(f"run · {collection.name}", runner.report())
+
+        progress = self.schedule(0.25, lambda: self.status_info(runner.summary()), 0.25)
+        runner.result = store
+        runner.finished = finished
+        self.__runner = runner
+        runner.start()
+        return runner
+
+    def stop_run(self):
+        if self.__runner is not None:
+            self.__runner.stop()
+
+    def schedule(self, delay: float, callback: typing.Callable[[], typing.Any], interval: float | None = None) -> timers.Timer:
+        return self.__timers.schedule(delay, callback, interval)
 
     def quit(self):
         self.__running = False
+        self.__executor.shutdown()
+        if self.context.workspace:
+            self.context.workspace.close()
 
     @property
     def active_request_key(self) -> str | None:
@@ -250,7 +626,19 @@ class App:
         return None
 
     @property
-    def stdscr(self) -> curses.window:
+    def profiler(self) -> Profiler | None:
+        return self.__profiler
+
+    @property
+    def collection_list(self) -> controls.ListBox:
+        return self.__collection
+
+    @property
+    def response_pane(self) -> ResponseView:
+        return self.__response_pane
+
+    @property
+    def stdscr(self) -> controls.Window:
         return self.__stdscr
 
 
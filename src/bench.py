@@ -0,0 +1,181 @@
+from __future__ import annotations
+import collections
+import itertools
+import time
+import typing
+
+import httpx
+
+import executor
+from entities.request import Request
+from histogram import Histogram
+import util
+
+if typing.TYPE_CHECKING:
+    from app import App
+    from timers import Timer
+
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+REFRESH_INTERVAL = 0.25
+
+
+class Benchmark:
+    """
+    Load test of a single request. Without a rate it is a closed loop:
+    `concurrency` requests are kept in flight until `total` have been sent.
+    With a rate, requests are started on a fixed schedule (still capped at
+    `concurrency` in flight) and latency is measured from the moment each
+    one was due rather than when it could actually be sent, so a slow
+    server is not hidden by the requests it held back.
+    """
+    __app: App
+    __request: Request
+    __total: int
+    __concurrency: int
+    __rate: float | None
+    __prefix: str
+
+    __started: int
+    __finished: int
+    __due: dict[str, float]  # exec id -> time the request was due
+    __begin: float
+    __end: float | None
+    __ticker: Timer | None
+    __refresher: Timer | None
+
+    latencies: Histogram  # microseconds
+    statuses: collections.Counter[int]
+    errors: collections.Counter[str]
+
+    __sequence = itertools.count()
+
+    def __init__(self, app: App, request: Request, total: int, concurrency: int, rate: float | None = None):
+        if total < 1 or concurrency < 1:
+            raise ValueError("count and concurrency must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.__app = app
+        self.__request = request
+        self.__total = total
+        self.__concurrency = concurrency
+        self.__rate = rate
+        self.__prefix = f"bench:{next(Benchmark.__sequence)}:"
+
+        self.__started = 0
+        self.__finished = 0
+        self.__due = {}
+        self.__begin = 0.0
+        self.__end = None
+        self.__ticker = None
+        self.__refresher = None
+
+        self.latencies = Histogram()
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()
+
+    def start(self):
+        self.__begin = time.perf_counter()
+        rate = self.__rate
+        if rate is None:
+            self.__fill()
+        else:
+            self.__ticker = self.__app.schedule(0, lambda: self.__tick(rate), 1 / rate)
+        self.__refresher = self.__app.schedule(REFRESH_INTERVAL, self.__show, REFRESH_INTERVAL)
+        self.__show()
+
+    def stop(self):
+        for timer in (self.__ticker, self.__refresher):
+            if timer is not None:
+                timer.cancel()
+        self.__ticker = self.__refresher = None
+        for exec_id in self.__due:
+            self.__app.cancel(exec_id)
+        self.__due.clear()
+        if self.__end is None:
+            self.__end = time.perf_counter()
+        self.__show()
+
+    @property
+    def done(self) -> bool:
+        return self.__end is not None
+
+    def __fill(self):
+        while self.__started < self.__total and len(self.__due) < self.__concurrency:
+            if not self.__send(time.perf_counter()):
+                return
+
+    def __tick(self, rate: float):
+        # catch up on every request that fell due since the last tick
+        due = min(int((time.perf_counter() - self.__begin) * rate) + 1, self.__total)
+        while self.__started < due and len(self.__due) < self.__concurrency:
+            if not self.__send(self.__begin + self.__started / rate):
+                return
+        if self.__started >= self.__total and self.__ticker is not None:
+            self.__ticker.cancel()
+            self.__ticker = None
+
+    def __send(self, due: float) -> bool:
+        exec_id = f"{self.__prefix}{self.__started}"
+        try:
+            self.__app.dispatch(self.__request, exec_id, self.__on_result, stream=False, cache=False)
+        except executor.ExecutorBusy:
+            # a completion will make room
+            return False
+        self.__due[exec_id] = due
+        self.__started += 1
+        return True
+
+    def __on_result(self, exec_id: str, result: executor.Result):
+        due = self.__due.pop(exec_id, None)
+        if due is None or self.done:
+            return
+
+        self.latencies.record(int((time.perf_counter() - due) * 1e6))
+        self.__finished += 1
+        if not isinstance(result, httpx.Response):
+            # benchmarks are not streamed, so anything else is an Exception
+            self.errors[type(result).__name__] += 1
+        else:
+            self.statuses[result.status_code] += 1
+            if result.status_code >= 400:
+                self.errors[f"HTTP {result.status_code}"] += 1
+
+        if self.__finished >= self.__total:
+            self.stop()
+        elif self.__rate is None:
+            self.__fill()
+        else:
+            self.__tick(self.__rate)
+
+    def __show(self):
+        title = "bench" if self.done else f"bench · {self.__finished}/{self.__total}"
+        self.__app.response_pane.set_report(title, self.report())
+
+    def report(self) -> str:
+        elapsed = (self.__end or time.perf_counter()) - self.__begin
+        lines = [
+            f"{self.__request.method} {self.__request.url}",
+            f"{self.__finished}/{self.__total} requests, concurrency {self.__concurrency}"
+            + (f", target rate {self.__rate:g}/s" if self.__rate is not None else ""),
+            "",
+            f"elapsed     {elapsed:10.3f} s",
+            f"throughput  {self.__finished / elapsed if elapsed > 0 else 0.0:10.1f} req/s",
+            "",
+            "latency",
+        ]
+        for percentile in PERCENTILES:
+            lines.append(f"  p{percentile:<8g} {util.format_duration(self.latencies.value_at_percentile(percentile) / 1e6)}")
+        lines.append(f"  min       {util.format_duration(self.latencies.min / 1e6)}")
+        lines.append(f"  mean      {util.format_duration(self.latencies.mean / 1e6)}")
+        lines.append(f"  max       {util.format_duration(self.latencies.max / 1e6)}")
+
+        lines += ["", "status codes"]
+        for status, count in sorted(self.statuses.items()):
+            lines.append(f"  {status:<9} {count}")
+
+        lines += ["", "errors" if self.errors else "errors: none"]
+        for error, count in self.errors.most_common():
+            lines.append(f"  {error:<24} {count}")
+        return "\n".join(lines)
@@ -0,0 +1,77 @@
+"""
+Runs the benchmarks in benchmarks.cases. Run from src/ with
+
+    python -m benchmarks [--filter TEXT] [--results FILE]
+
+Every run is appended to the results file with the commit it measured, and
+compared with the previous run so regressions show up between commits.
+"""
+import argparse
+import json
+import os
+import subprocess
+import time
+import timeit
+
+from benchmarks.cases import CASES
+import fakecurses
+
+
+RESULTS = os.path.join(os.path.dirname(__file__), "results.ndjson")
+
+# slower than the previous run by more than this is flagged
+REGRESSION = 1.1
+
+
+def commit() -> str:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return revision + ("+" if dirty.strip() else "")
+
+
+def previous(path: str) -> dict[str, float]:
+    try:
+        with open(path) as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        return {}
+    return json.loads(lines[-1])["results"] if lines else {}
+
+
+def measure(name: str) -> float:
+    """
+    Seconds per call of a case, the best of five measurements.
+    """
+    function, number = CASES[name]()
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--results", default=RESULTS, help="NDJSON file runs are appended to")
+    args = parser.parse_args()
+
+    baseline = previous(args.results)
+    results = {}
+    with fakecurses.install():
+        for name in CASES:
+            if args.filter.lower() not in name.lower():
+                continue
+            results[name] = measure(name)
+            line = f"{name:<40} {results[name] * 1e6:12.2f} us"
+            if name in baseline:
+                ratio = results[name] / baseline[name]
+                line += f"   {ratio:5.2f}x previous" + ("   REGRESSION" if ratio > REGRESSION else "")
+            print(line)
+
+    with open(args.results, "a") as file:
+        file.write(json.dumps({"commit": commit(), "time": time.time(), "results": results}))
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Micro-benchmarks of the controls, search and completion, command parsing
+and entities. Controls draw into fakecurses windows, so no terminal is needed.
+"""
+import curses
+import types
+import typing
+
+from benchmarks.entities import request_kwargs
+import commands
+from completion import PrefixTrie
+import controls
+from entities.entity import EntityDecoder
+from entities.request import Collection, Method, Request
+from entities.response import Response
+from fakecurses import FakeWindow
+from finder import FuzzyIndex
+from views.response_view import ResponseView
+
+
+# a case sets up its state and returns the function to time, and how many calls make one measurement
+type Case = typing.Callable[[], tuple[typing.Callable[[], typing.Any], int]]
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str):
+    def decorator(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+    return decorator
+
+
+def screen() -> FakeWindow:
+    controls.Control.configure(foreground=7, background=0)
+    return FakeWindow(50, 200)
+
+
+@case("Label produce lines")
+def label_produce_lines():
+    label = controls.Label(screen(), (0, 0), (40, 120))
+    text = "\n".join(f"line {index} " + "x" * 150 for index in range(60))
+    return lambda: label.set_text(text), 200
+
+
+@case("ListBox scroll 10k items")
+def listbox_scroll():
+    listbox = controls.ListBox(screen(), (0, 0), (40, 48))
+    listbox.set_items([f"request {index}" for index in range(10000)])
+    listbox.focus()
+
+    def scroll():
+        for _ in range(200):
+            listbox.handle_input(ord('j'))
+        for _ in range(200):
+            listbox.handle_input(ord('k'))
+    return scroll, 5
+
+
+@case("ListBox insort into 10k items")
+def listbox_insort():
+    listbox = controls.ListBox(screen(), (0, 0), (40, 48))
+    items = sorted((f"request {index}" for index in range(10000)), key=str.lower)
+    names = iter(range(10**9))
+
+    def insort():
+        listbox.set_items(list(items))
+        for _ in range(100):
+            listbox.insort_item(f"new request {next(names)}", key=str.lower)
+    return insort, 5
+
+
+@case("ListBox open 100k paged items")
+def listbox_open_paged():
+    listbox = controls.ListBox(screen(), (0, 0), (40, 48))
+    names = sorted((f"request {index}" for index in range(100000)), key=str.lower)
+
+    def open_paged():
+        listbox.set_items(controls.PagedItems(
+            lambda offset, limit: names[offset:offset + limit],
+            lambda: len(names),
+            key=str.lower,
+        ))
+        listbox.paint()
+        listbox.select_item("request 77777")
+    return open_paged, 20
+
+
+@case("LineEdit typing")
+def lineedit_typing():
+    edit = controls.LineEdit(screen(), (0, 0), 80)
+    edit.focus()
+    keys = [ord(ch) for ch in "http://example.com/api/v1/resources?page=2&limit=100" * 3]
+    keys += [curses.KEY_LEFT] * 20 + [127] * 10 + [controls.Control.CTRL_C]
+
+    def type_url():
+        edit.set_text("")
+        for key in keys:
+            edit.handle_input(key)
+    return type_url, 50
+
+
+@case("ResponseView render 8 MiB body")
+def response_view_render():
+    view = ResponseView(typing.cast(typing.Any, types.SimpleNamespace(stdscr=screen())), (0, 0), (50, 120))
+    body = b"".join(b'{"id": %d, "name": "item %d", "tags": ["a", "b", "c"]}\n' % (index, index) for index in range(160000))
+    view.set_response(Response(status=200, headers={}, data=body))
+    view.scroll(80000)
+    return view.paint, 200
+
+
+@case("ResponseView index 8 MiB body")
+def response_view_index():
+    view = ResponseView(typing.cast(typing.Any, types.SimpleNamespace(stdscr=screen())), (0, 0), (50, 120))
+    body = b"x" * 100 + b"\n"
+    body *= 80000
+
+    def show():
+        view.set_response(Response(status=200, headers={}, data=body))
+    return show, 5
+
+
+@case("find, typing over 100k requests")
+def find_typing():
+    words = ["users", "orders", "invoices", "auth", "login", "search", "update", "delete", "token", "payment"]
+    index = FuzzyIndex()
+    index.extend(
+        (f"collection {number % 200}", f"{words[number % 10]} {words[number // 10 % 10]} {number}")
+        for number in range(100000)
+    )
+    query = "payment tok"
+
+    def type_query():
+        for end in range(1, len(query) + 1):
+            index.search(query[:end])
+    return type_query, 5
+
+
+@case("complete among 100k names")
+def complete_names():
+    trie = PrefixTrie([f"request {number}" for number in range(100000)])
+    return lambda: trie.completions("request 12", limit=500), 200
+
+
+@case("parse_arguments")
+def parse_arguments():
+    definition = ["count:optional", "concurrency:optional", "rate:optional"]
+    return lambda: commands.parse_arguments('1000 "25" 50.5', definition), 20000
+
+
+@case("Request construction")
+def request_construction():
+    kwargs = request_kwargs(1)
+    return lambda: Request(**kwargs), 20000
+
+
+@case("Collection validation, 5000 Requests")
+def collection_validation():
+    requests = [Request(**request_kwargs(index)) for index in range(5000)]
+    return lambda: Collection(name="c", requests=requests), 20
+
+
+@case("decode Collection, 5000 Requests")
+def collection_decoding():
+    data = '{"name": "c", "requests": [%s]}' % ", ".join(
+        '{"name": "r%d", "method": "%s", "url": "http://example.com/%d", "headers": {}}' % (index, Method.GET, index)
+        for index in range(5000)
+    )
+    decoder = EntityDecoder[Collection]()
+    return lambda: decoder.decode(data), 5
@@ -0,0 +1,122 @@
+"""
+Entity construction benchmarks. Run from src/ with
+
+    python -m benchmarks.entities
+"""
+import copy
+import gc
+import io
+import json
+import time
+import timeit
+import tracemalloc
+import typing
+
+from entities.entity import Entity, EntityDecoder, EntityEncoder, Field, iterload
+from entities.request import Collection, Method, Request
+
+
+class DictRequest(Entity):
+    """
+    Request without slots, for memory comparison.
+    """
+    name: str
+
+    method: Method
+    url: str
+    headers: dict[str, str]
+
+    depends_on: tuple[str, ...] = Field(default=())
+
+
+def reference_init(entity_type: type[Entity], **kwargs) -> Entity:
+    """
+    Construct an entity the way Entity.__init__ did before validators were
+    compiled: through FieldInfo.validate for every field.
+    """
+    entity = entity_type.__new__(entity_type)
+    for key, field in entity_type.__fields__.items():
+        if key not in kwargs:
+            if field.default[0]:
+                setattr(entity, key, field.get_default())
+                continue
+            raise ValueError(f"missing value for field '{key}'")
+        setattr(entity, key, field.validate(kwargs.pop(key)))
+    return entity
+
+
+def request_kwargs(index: int) -> dict:
+    return {
+        "name": f"request {index}",
+        "method": "GET",
+        "url": f"http://example.com/{index}",
+        "headers": {"accept": "application/json", "x-index": str(index)},
+    }
+
+
+def report(name: str, reference: float, compiled: float):
+    print(f"{name:<40} reference {reference * 1e3:9.2f} ms   compiled {compiled * 1e3:9.2f} ms   {reference / compiled:5.1f}x")
+
+
+def measure_memory(entity_type: type[Entity], count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    requests = [entity_type(name="", method=Method.GET, url="", headers={}) for _ in range(count)]
+    collection = Collection.__new__(Collection)
+    collection.name = ""
+    # DictRequest is measured the same way, though it is not a Request
+    collection.requests = typing.cast(list[Request], requests)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del collection, requests
+    return size
+
+
+def main():
+    kwargs = request_kwargs(1)
+    number = 20000
+    reference = min(timeit.repeat(lambda: reference_init(Request, **kwargs), number=number, repeat=3))
+    compiled = min(timeit.repeat(lambda: Request(**kwargs), number=number, repeat=3))
+    report(f"Request x{number}", reference, compiled)
+
+    typed = dict(kwargs, method=Method.GET)
+    reference = min(timeit.repeat(lambda: reference_init(Request, **typed), number=number, repeat=3))
+    compiled = min(timeit.repeat(lambda: Request(**typed), number=number, repeat=3))
+    report(f"Request (already typed) x{number}", reference, compiled)
+
+    requests = [Request(**request_kwargs(index)) for index in range(5000)]
+    reference = min(timeit.repeat(lambda: reference_init(Collection, name="c", requests=requests), number=20, repeat=3))
+    compiled = min(timeit.repeat(lambda: Collection(name="c", requests=requests), number=20, repeat=3))
+    report("Collection of 5000 Requests x20", reference, compiled)
+
+    request = Request(**dict(request_kwargs(1), headers={f"x-header-{index}": str(index) for index in range(50)}))
+    reference = min(timeit.repeat(lambda: copy.deepcopy(request), number=number, repeat=3))
+    compiled = min(timeit.repeat(request.copy, number=number, repeat=3))
+    report(f"copy Request with 50 headers x{number}", reference, compiled)
+
+    collection = Collection(name="c", requests=requests)
+    reference = min(timeit.repeat(lambda: copy.deepcopy(collection), number=5, repeat=3))
+    compiled = min(timeit.repeat(collection.copy, number=5, repeat=3))
+    report("copy Collection of 5000 Requests x5", reference, compiled)
+
+    workspace = [
+        Collection(name=f"collection {index}", requests=[Request(**request_kwargs(number)) for number in range(250)])
+        for index in range(200)
+    ]
+    data = json.dumps(workspace, cls=EntityEncoder)
+    reference = min(timeit.repeat(lambda: [Collection(**value) for value in json.loads(data)], number=1, repeat=3))
+    compiled = min(timeit.repeat(lambda: json.loads(data, cls=EntityDecoder[Collection]), number=1, repeat=3))
+    report(f"load {len(data) / 2**20:.1f} MiB workspace, 50000 Requests", reference, compiled)
+    start = time.perf_counter()
+    for _ in iterload(io.StringIO(data), Collection):
+        pass
+    print(f"{'iterload same workspace':<40} {(time.perf_counter() - start) * 1e3:9.2f} ms")
+
+    count = 100000
+    with_dict = measure_memory(DictRequest, count)
+    slotted = measure_memory(Request, count)
+    print(f"{f'{count} requests':<40} __dict__ {with_dict / 2**20:8.2f} MiB   slots {slotted / 2**20:8.2f} MiB   {with_dict / slotted:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
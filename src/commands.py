@@ -6,20 +6,41 @@ import typing
 
 import logging
 
+from completion import PrefixTrie, split_word
+
 
 class CommandError(Exception):
     pass
 
 
 __registry = {}
+__names = PrefixTrie()
 
 def register(command, args: list[str] | None = None):
     def decorator(fn):
         __registry[command] = fn, (args or [])
+        __names.add(command)
         return fn
     return decorator
 
 
+def complete(prefix: str) -> list[str]:
+    """
+    Names of the registered commands starting with `prefix`.
+    """
+    return __names.completions(prefix)
+
+
+def split_command(command: str) -> tuple[str, str]:
+    """
+    split_word for a command being typed, without its ':'. The whole of a
+    'rest' argument is the word, since it is parsed as one.
+    """
+    _, args = __registry.get(command.split(" ", maxsplit=1)[0], (None, []))
+    rest = next((position + 1 for position, arg in enumerate(args) if "rest" in arg.partition(":")[2].split(",")), None)
+    return split_word(command, rest)
+
+
 class ParseState(enum.Enum):
     expecting = 0
     argument = 1
@@ -80,7 +101,7 @@ def parse_arguments(raw_arguments: str, argument_definition: list[str]):
         arguments.append(argument.getvalue())
 
     parsed_arguments = {}
-    for raw_arg_name, arg_value in itertools.zip_longest(argument_definition, arguments):
+    for position, (raw_arg_name, arg_value) in enumerate(itertools.zip_longest(argument_definition, arguments)):
         if raw_arg_name is None:
             raise CommandError("too many arguments!")
         parts = raw_arg_name.split(":", maxsplit=2)
@@ -96,6 +117,10 @@ def parse_arguments(raw_arguments: str, argument_definition: list[str]):
                 break
             else:
                 raise CommandError("'%s' is not optional" % arg_name)
+        if "rest" in tags:
+            # takes every remaining argument
+            parsed_arguments[arg_name] = " ".join(arguments[position:])
+            break
         parsed_arguments[arg_name] = arg_value
 
     return parsed_arguments
@@ -130,6 +155,68 @@ def command_new_collection(args: dict[str, str], app: App):
     app.create_collection(name, True)
 
 
+@register("bench", ["count:optional", "concurrency:optional", "rate:optional"])
+def command_bench(args: dict[str, str], app: App):
+    if args.get("count") == "stop":
+        app.stop_benchmark()
+        return
+
+    try:
+        count = int(args.get("count", 100))
+        concurrency = int(args.get("concurrency", 10))
+        rate = float(args["rate"]) if "rate" in args else None
+        if count < 1 or concurrency < 1 or (rate is not None and rate <= 0):
+            raise ValueError()
+    except ValueError:
+        raise CommandError("usage: bench [count] [concurrency] [rate] | bench stop")
+    app.start_benchmark(count, concurrency, rate)
+
+
+@register("run", ["concurrency:optional"])
+def command_run(args: dict[str, str], app: App):
+    if args.get("concurrency") == "stop":
+        app.stop_run()
+        return
+
+    try:
+        concurrency = int(args.get("concurrency", 10))
+        if concurrency < 1:
+            raise ValueError()
+    except ValueError:
+        raise CommandError("usage: run [concurrency] | run stop")
+    app.start_run(concurrency)
+
+
+@register("depend", ["names:optional"])
+def command_depend(args: dict[str, str], app: App):
+    request = app.context.active_request
+    collection = app.context.active_collection
+    if request is None or collection is None:
+        raise CommandError("No active request.")
+
+    names = tuple(name for name in args.get("names", "").split(",") if name)
+    if not app.has_request(collection, request.name):
+        raise CommandError("The active request is not part of a collection.")
+    for name in names:
+        if name == request.name or not app.has_request(collection, name):
+            raise CommandError("'%s' is not another request in this collection" % name)
+
+    request.depends_on = names
+    app.save_request(request)
+
+
+@register("find", ["query:rest"])
+def command_find(args: dict[str, str], app: App):
+    app.find(args["query"])
+
+
+@register("stats", [])
+def command_stats(_, app: App):
+    if app.profiler is None:
+        raise CommandError("Profiling is off; start with --profile.")
+    app.response_pane.set_report("stats", app.profiler.report())
+
+
 @register("q", [])
 def command_exit(_, app: App):
     app.quit()
@@ -0,0 +1,170 @@
+"""
+Tab completion of the command bar.
+"""
+
+
+class TrieNode:
+    edge: str  # lower case characters leading here from the parent
+    children: dict[str, "TrieNode"]  # by the first character of their edge
+    words: list[str]  # that end here, in their original case
+    count: int  # words at or below this node
+
+    def __init__(self, edge: str = ""):
+        self.edge = edge
+        self.children = {}
+        self.words = []
+        self.count = 0
+
+
+class PrefixTrie:
+    """
+    Words keyed case-insensitively, in a radix tree: each edge holds the
+    run of characters its words share, so there are at most two nodes per
+    word. Finding the words with a prefix costs the length of the prefix
+    plus the part of the trie below it, however many other words there are.
+    """
+    __root: TrieNode
+
+    def __init__(self, words: list[str] | None = None):
+        self.__root = TrieNode()
+        for word in words or []:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self.__root.count
+
+    def __contains__(self, word: str) -> bool:
+        path = self.__path(word.lower())
+        return path is not None and word in path[-1].words
+
+    def add(self, word: str):
+        if word in self:
+            return
+        key = word.lower()
+        node = self.__root
+        node.count += 1
+        while key:
+            child = node.children.get(key[0])
+            if child is None:
+                child = node.children[key[0]] = TrieNode(key)
+            else:
+                common = 0
+                while common < min(len(key), len(child.edge)) and key[common] == child.edge[common]:
+                    common += 1
+                if common < len(child.edge):
+                    # split the edge where the word leaves it
+                    middle = TrieNode(child.edge[:common])
+                    middle.count = child.count
+                    child.edge = child.edge[common:]
+                    middle.children[child.edge[0]] = child
+                    child = node.children[key[0]] = middle
+            child.count += 1
+            key = key[len(child.edge):]
+            node = child
+        node.words.append(word)
+
+    def remove(self, word: str):
+        path = self.__path(word.lower())
+        if path is None or word not in path[-1].words:
+            return
+        path[-1].words.remove(word)
+        for parent, node in zip(path, path[1:]):
+            node.count -= 1
+            if node.count == 0:
+                # nothing else below, drop the branch
+                del parent.children[node.edge[0]]
+                break
+        self.__root.count -= 1
+
+    def completions(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        Words starting with `prefix`, ignoring case, in alphabetical order.
+        """
+        key = prefix.lower()
+        node = self.__root
+        while key:
+            child = node.children.get(key[0])
+            if child is None or not (key.startswith(child.edge) or child.edge.startswith(key)):
+                return []
+            key = key[len(child.edge):]
+            node = child
+
+        found: list[str] = []
+        # depth first through the children in order, so words come out sorted
+        pending = [node]
+        while pending and (limit is None or len(found) < limit):
+            node = pending.pop()
+            found.extend(sorted(node.words))
+            pending.extend(node.children[ch] for ch in sorted(node.children, reverse=True))
+        return found[:limit]
+
+    def __path(self, key: str) -> list[TrieNode] | None:
+        """
+        The nodes from the root to the one `key` ends at exactly.
+        """
+        path = [self.__root]
+        while key:
+            child = path[-1].children.get(key[0])
+            if child is None or not key.startswith(child.edge):
+                return None
+            key = key[len(child.edge):]
+            path.append(child)
+        return path
+
+
+class Completion:
+    """
+    The candidates for the word at the end of a command, which Tab steps
+    through without looking them up again.
+    """
+    head: str  # the command before the word
+    candidates: list[str]
+    index: int
+    text: str  # the command as last completed
+
+    def __init__(self, head: str, candidates: list[str]):
+        self.head = head
+        self.candidates = candidates
+        self.index = -1
+        self.text = ""
+
+    def next(self) -> str:
+        self.index = (self.index + 1) % len(self.candidates)
+        candidate = self.candidates[self.index]
+        if any(ch.isspace() for ch in candidate):
+            candidate = f'"{candidate}"'
+        self.text = self.head + candidate
+        return self.text
+
+
+def split_word(command: str, rest: int | None = None) -> tuple[str, str]:
+    """
+    Split a command into what precedes the word being typed and the word.
+    Words are separated by spaces or commas outside of quotes; the opening
+    quote of a word is not part of it, so an unclosed quote completes from
+    its start. From word number `rest` on, the remainder of the command is
+    a single word.
+    """
+    starts: list[int] = []
+    quote: str | None = None
+    in_word = False
+    for index, ch in enumerate(command):
+        if quote is not None:
+            if ch == quote:
+                quote = None
+        elif ch in " ,":
+            in_word = False
+        else:
+            if not in_word:
+                in_word = True
+                starts.append(index)
+            if ch in "\"'":
+                quote = ch
+
+    start = starts[-1] if in_word else len(command)
+    if rest is not None and len(starts) > rest:
+        start = starts[rest]
+    word = command[start:]
+    if word[:1] in ("\"", "'"):
+        word = word[1:].removesuffix(word[0])
+    return command[:start], word
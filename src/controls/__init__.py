@@ -1,10 +1,16 @@
 from .button import Button
+from .compositor import Compositor
 from .control import CannotFocus, Control
 from .label import Label
 from .lineedit import LineEdit
 from .listbox import ListBox
 from .optionbox import OptionBox
 from .panel import Panel
+from .sources import ItemSource, ListItems, PagedItems
+from .window import Window
 
-__all__ = ['Button', 'CannotFocus', 'Control', 'Label', 'LineEdit', 'ListBox', 'OptionBox', 'Panel']
+__all__ = [
+    'Button', 'CannotFocus', 'Compositor', 'Control', 'ItemSource', 'Label', 'LineEdit', 'ListBox', 'ListItems',
+    'OptionBox', 'PagedItems', 'Panel', 'Window',
+]
 
@@ -3,6 +3,7 @@ import typing
 
 import colors
 from .control import Control
+from .window import Window
 
 
 class Button(Control):
@@ -12,7 +13,7 @@ class Button(Control):
     _focus_color: int
     _click: typing.Callable[[], typing.Any] | None
 
-    def __init__(self, parent: curses.window, pos: tuple[int, int], width: int, text: str, handler: typing.Callable[[], typing.Any] | None = None):
+    def __init__(self, parent: Window, pos: tuple[int, int], width: int, text: str, handler: typing.Callable[[], typing.Any] | None = None):
         super().__init__()
         self._create_window(parent, (3, width), pos)
         self._text = text
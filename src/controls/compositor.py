@@ -0,0 +1,60 @@
+from __future__ import annotations
+import curses
+import typing
+
+from .window import Window
+
+if typing.TYPE_CHECKING:
+    from .control import Control
+
+
+class Compositor:
+    """
+    Batches screen updates into frames. During a frame, controls mark
+    themselves dirty instead of painting and flushing immediately; flush()
+    then repaints each dirty control once, copies every changed window to
+    the virtual screen with noutrefresh() and writes to the terminal with a
+    single doupdate().
+    """
+    __dirty: dict[Control, None]
+    __touched: dict[Window, None]
+
+    def __init__(self):
+        self.__dirty = {}
+        self.__touched = {}
+
+    def invalidate(self, control: Control):
+        self.__dirty[control] = None
+
+    def touch(self, window: Window):
+        """
+        Schedule a window that was drawn into directly for the next frame.
+        """
+        self.__touched[window] = None
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.__dirty or self.__touched)
+
+    def flush(self, cursor: Control | None = None):
+        """
+        Paint the frame. The terminal cursor is left wherever `cursor` last
+        placed it in its window.
+        """
+        if not self.pending:
+            return
+
+        # parents are created before, and overdraw, their children
+        dirty = sorted(self.__dirty, key=lambda control: control.sequence)
+        self.__dirty.clear()
+        for control in dirty:
+            control.paint()
+            self.__touched[control.window] = None
+
+        touched = self.__touched
+        self.__touched = {}
+        for window in touched:
+            window.noutrefresh()
+        if cursor is not None:
+            cursor.window.noutrefresh()
+        curses.doupdate()
@@ -1,9 +1,11 @@
 from abc import ABCMeta, abstractmethod
 import contextlib
-import curses
+import itertools
 import typing
 
 import colors
+from .compositor import Compositor
+from .window import Window
 
 
 class CannotFocus(NotImplementedError):
@@ -14,23 +16,29 @@ class Control(metaclass=ABCMeta):
     CTRL_B: typing.ClassVar[int] = 2
     CTRL_C: typing.ClassVar[int] = 3
     CTRL_E: typing.ClassVar[int] = 5
+    CTRL_N: typing.ClassVar[int] = 14
+    CTRL_P: typing.ClassVar[int] = 16
 
     ESC = 27
     RETURN = ord('\n')
 
     __focused: bool
-    _win: curses.window
+    _win: Window
 
     _foreground: int
     _background: int
 
     __pause_repaint: bool
     __need_repaint: bool
+    __sequence: int
 
     focus_greedy: bool  # Refuses attempts to wrest focus.
 
+    __counter: typing.ClassVar[typing.Iterator[int]] = itertools.count()
+
     def __init__(self, focus_greedy: bool = False):
         self.__focused = False
+        self.__sequence = next(Control.__counter)
         self._foreground = Control.g_foreground
         self._background = Control.g_background
 
@@ -38,11 +46,11 @@ class Control(metaclass=ABCMeta):
         self.__need_repaint = False
         self.focus_greedy = focus_greedy
 
-    def _create_window(self, parent: curses.window, size: tuple[int, int], pos: tuple[int, int]):
+    def _create_window(self, parent: Window, size: tuple[int, int], pos: tuple[int, int]):
         win = parent.derwin(*size, *pos)
         win.bkgd(colors.color_pair(self.foreground, self.background))
-        win.refresh()
         self._win = win
+        self._refresh()
 
     def try_focus(self):
         """
@@ -107,25 +115,56 @@ class Control(metaclass=ABCMeta):
             self.__need_repaint = True
             return
 
+        if Control.g_compositor is not None:
+            Control.g_compositor.invalidate(self)
+            return
+
+        self.paint()
+        self._win.refresh()
+
+    def paint(self):
+        """
+        Redraw the window contents without flushing them to the terminal.
+        """
         self._win.erase()
         self.render()
-        self._win.refresh()
+
+    def _refresh(self):
+        """
+        Flush direct drawing on this control's window, or leave it to the
+        next frame when a compositor is in use.
+        """
+        if Control.g_compositor is not None:
+            Control.g_compositor.touch(self._win)
+        else:
+            self._win.refresh()
 
     @property
     def focused(self) -> bool:
         return self.__focused
 
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def window(self) -> Window:
+        return self._win
+
     g_foreground: typing.ClassVar[int] = -1
     g_background: typing.ClassVar[int] = -1
+    g_compositor: typing.ClassVar[Compositor | None] = None
 
     @classmethod
     def configure(
         cls,
         foreground: int,
         background: int,
+        compositor: Compositor | None = None,
     ):
         cls.g_foreground = foreground
         cls.g_background = background
+        cls.g_compositor = compositor
 
     @property
     def foreground(self):
@@ -148,7 +187,7 @@ class Control(metaclass=ABCMeta):
         self.repaint()
 
     @contextlib.contextmanager
-    def usecolor(self, window: curses.window, color_pair: int | None = None):
+    def usecolor(self, window: Window, color_pair: int | None = None):
         base = colors.color_pair(self.foreground, self.background)
         attr = color_pair if color_pair is not None else base
         try:
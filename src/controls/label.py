@@ -2,6 +2,7 @@ import curses
 import io
 
 from .control import Control
+from .window import Window
 
 
 class Label(Control):
@@ -14,7 +15,7 @@ class Label(Control):
     _italic: int
     _underline: int
 
-    def __init__(self, parent: curses.window, pos: tuple[int, int], size: tuple[int, int], text: str = ""):
+    def __init__(self, parent: Window, pos: tuple[int, int], size: tuple[int, int], text: str = ""):
         super().__init__()
         self._create_window(parent, size, pos)
         self._text = text
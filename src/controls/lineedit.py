@@ -4,10 +4,11 @@ import typing
 import logging
 
 from .control import Control
+from .window import Window
 
 
 class LineEdit(Control):
-    _win: curses.window
+    _win: Window
 
     _width: int
     _location: tuple[int, int]
@@ -17,7 +18,7 @@ class LineEdit(Control):
     _change: typing.Callable[[str], typing.Any] | None
     _buffer: str
 
-    def __init__(self, stdscr: curses.window, location: tuple[int, int], width: int):
+    def __init__(self, stdscr: Window, location: tuple[int, int], width: int):
         super().__init__(focus_greedy=True)
         self._create_window(stdscr, (1, width), location)
         self._width = width
@@ -31,7 +32,7 @@ class LineEdit(Control):
     def on_focus(self):
         self._buffer = self._text
         self._win.move(0, self._cursor - self._offset)
-        self._win.refresh()
+        self._refresh()
         curses.curs_set(2)
 
     def on_unfocus(self):
@@ -40,7 +41,7 @@ class LineEdit(Control):
     def set_text(self, text: str):
         self._text = text
         self._cursor = len(self._text)
-        self._offset = max(self._cursor, self._width) - self._width
+        self.__pull_offset()
         self.repaint()
 
     def get_text(self) -> str:
@@ -48,7 +49,6 @@ class LineEdit(Control):
 
     def render(self):
         portion = self._text[self._offset:self._offset+self._width]
-        self._win.clear()
         try:
             with self.usecolor(self._win):
                 self._win.addstr(0, 0, portion)
@@ -1,4 +1,3 @@
-import bisect
 import curses
 import typing
 
@@ -6,30 +5,45 @@ import colors
 import util
 
 from .control import Control
+from .sources import ItemSource, ListItems
+from .window import Window
 
 
 class ListBox(Control):
-    _win: curses.window
+    _win: Window
 
-    _items: list[str]
+    _items: ItemSource
     _location: tuple[int, int]
     _size: tuple[int, int]
     _scroll: int
     _selection: int
+    _activate: typing.Callable[[str], typing.Any] | None
 
-    def __init__(self, parent: curses.window, location: tuple[int, int], size: tuple[int, int]):
+    def __init__(self, parent: Window, location: tuple[int, int], size: tuple[int, int]):
         super().__init__()
         self._create_window(parent, size, location)
-        self._items = []
+        self._items = ListItems()
         self._location = location
         self._size = size
         self._selection = -1
         self._scroll = 0
+        self._activate = None
 
     def clear(self):
-        self._items = []
+        self._items = ListItems()
         self._win.erase()
-        self._win.refresh()
+        self._refresh()
+
+    def set_items(self, items: list[str] | ItemSource):
+        """
+        Show a list of items, or the items of a source, which are only read
+        as they are displayed.
+        """
+        self._items = items if isinstance(items, ItemSource) else ListItems(items)
+        self._selection = -1
+        self._scroll = 0
+        self._update_focused()
+        self.repaint()
 
     def try_focus(self):
         if self._selection == -1 and self._items:
@@ -48,49 +62,62 @@ class ListBox(Control):
             self._selection = min(len(self._items) - 1, self._selection + 1)
         elif ch == curses.KEY_UP or ch == ord('k'):
             self._selection = max(0, self._selection - 1)
+        elif ch == Control.RETURN:
+            if self._activate and 0 <= self._selection < len(self._items):
+                self._activate(self._items[self._selection])
+            return
+        elif ch == Control.ESC:
+            self.unfocus()
+            return
 
         if self._selection >= 0 and not self._items:
             self._selection = -1
 
-        redrawn = self.__adjust_offset()
-        if not redrawn:
-            # redraw only relevant rows
-            self.__draw_row(initial_selection)
-            self.__draw_row(self._selection, True)
+        # redraw only relevant rows
+        self.__adjust_offset()
+        self.__draw_row(initial_selection)
+        self.__draw_row(self._selection, True)
 
     def _update_focused(self):
         if self.focused and self._selection == -1:
             self._selection = 0
 
     def add_item(self, item: str):
-        self._items.append(item)
-
-        self._update_focused()
-
-        # check if new item is in visible range
-        if len(self._items) <= self._scroll + self._size[0]:
-            self.__draw_row(len(self._items)-1, True)
+        self.insert_item(item, len(self._items))
 
     def insert_item(self, item: str, at: int):
         self._items.insert(at, item)
+        self.__inserted(at)
+
+    def insort_item(self, item: str, key: typing.Callable[[str], typing.Any] | None = None):
+        self.__inserted(self._items.insort(item, key))
+
+    def __inserted(self, at: int):
         if at <= self._selection:
             self._selection += 1
         self._update_focused()
-        if self._scroll <= at <= self._scroll + self._size[0]:
+        if at < self._scroll:
+            # keep showing the same items
+            self._scroll += 1
+        elif at < self._scroll + self._size[0]:
+            # only the rows from the new item down move
             for row in range(at, self._scroll + self._size[0]):
                 self.__draw_row(row)
-            self._win.refresh()
+            self._refresh()
 
-    def insort_item(self, item: str, key: typing.Callable[[str], typing.Any] | None = None):
-        index = bisect.bisect(self._items, key(item) if key else item, key=key)
-        self._items.insert(index, item)
-        if index <= self._selection:
-            self._selection += 1
-        self._update_focused()
+    def resort(self, key: typing.Callable[[str], typing.Any]):
+        self._items.resort(key)
         self.repaint()
 
-    def resort(self, key: typing.Callable[[str], typing.Any]):
-        self._items.sort(key=key)
+    def select_item(self, item: str):
+        """
+        Select an item and scroll it into view.
+        """
+        try:
+            self._selection = self._items.index(item)
+        except ValueError:
+            return
+        self.__adjust_offset()
         self.repaint()
 
     def render(self):
@@ -101,7 +128,7 @@ class ListBox(Control):
             self._win.move(self._selection - self._scroll, 0)
 
     def __draw_row(self, row: int, refresh: bool = False):
-        if row > len(self._items) - 1 or row == -1:
+        if row > len(self._items) - 1 or not self._scroll <= row < self._scroll + self._size[0]:
             return
 
         render_row = row - self._scroll
@@ -109,23 +136,47 @@ class ListBox(Control):
         usecolor = row == self._selection
         attr = colors.color_pair(self.background, self.foreground)
         back_attr = colors.color_pair(self.foreground, self.background)
-        self._win.addstr(util.ellipsize(self._items[row], self._size[1]).ljust(self._size[1], " "), attr if usecolor else back_attr)
+        try:
+            self._win.addstr(util.ellipsize(self._items[row], self._size[1]).ljust(self._size[1], " "), attr if usecolor else back_attr)
+        except curses.error:
+            # filling the last row moves the cursor past the window's corner
+            pass
 
         self._win.move(render_row, 0)
         if refresh:
-            self._win.refresh()
+            self._refresh()
 
-    def __adjust_offset(self) -> bool:
-        repaint = True
+    def __adjust_offset(self):
+        rows = self._size[0]
         if self._selection < self._scroll:
-            self._scroll = self._selection
-        elif self._selection >= self._scroll + self._size[0]:
-            self._scroll = self._selection - self._size[0] + 1
+            scroll = self._selection
+        elif self._selection >= self._scroll + rows:
+            scroll = self._selection - rows + 1
         else:
-            repaint = False
+            return
 
-        if repaint:
+        shift = scroll - self._scroll
+        self._scroll = scroll
+        if abs(shift) >= rows:
             self.repaint()
+            return
 
-        return repaint
-
+        # move the rows still visible and draw only the ones scrolled in
+        self._win.scrollok(True)
+        self._win.scroll(shift)
+        self._win.scrollok(False)
+        exposed = range(scroll + rows - shift, scroll + rows) if shift > 0 else range(scroll, scroll - shift)
+        for row in exposed:
+            self.__draw_row(row)
+        self._refresh()
+
+    @property
+    def activate(self) -> typing.Callable[[str], typing.Any] | None:
+        """
+        Called with the selected item when Return is pressed.
+        """
+        return self._activate
+
+    @activate.setter
+    def activate(self, value: typing.Callable[[str], typing.Any] | None):
+        self._activate = value
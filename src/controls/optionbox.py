@@ -2,6 +2,7 @@ import curses
 import typing
 
 from .control import Control
+from .window import Window
 
 
 type ChangeHandler = typing.Callable[[str], typing.Any]
@@ -15,7 +16,7 @@ class OptionBox(Control):
     __width: int
     __change: ChangeHandler | None
 
-    def __init__(self, parent: curses.window, pos: tuple[int, int], width: int):
+    def __init__(self, parent: Window, pos: tuple[int, int], width: int):
         super().__init__()
         self._create_window(parent, (1, width), pos)
         self.__options = []
@@ -1,19 +1,18 @@
-import curses
-
 from .control import CannotFocus, Control
+from .window import Window
 
 
 class Panel(Control):
-    _win: curses.window
+    _win: Window
 
     _location: tuple[int, int]
     _size: tuple[int, int]
 
-    def __init__(self, parent: curses.window, location: tuple[int, int], size: tuple[int, int]):
+    def __init__(self, parent: Window, location: tuple[int, int], size: tuple[int, int]):
         super().__init__()
         self._win = parent.derwin(*size, *location)
         self._win.border()
-        self._win.refresh()
+        self._refresh()
         self._location = location
         self._size = size
 
@@ -34,7 +33,3 @@ class Panel(Control):
     def handle_input(self, ch: int):
         pass
 
-    @property
-    def window(self) -> curses.window:
-        return self._win
-
@@ -0,0 +1,185 @@
+import bisect
+import collections
+import typing
+from abc import ABCMeta, abstractmethod
+
+
+type SortKey = typing.Callable[[str], typing.Any]
+
+
+class ItemSource(metaclass=ABCMeta):
+    """
+    The items shown by a ListBox. The list box only asks for the rows it
+    displays, so a source need not hold all of its items in memory.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def __getitem__(self, index: int) -> str:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def index(self, item: str) -> int:
+        """
+        Position of an item; raises ValueError when it is not there.
+        """
+        raise NotImplementedError()
+
+    def insert(self, index: int, item: str):
+        raise NotImplementedError(f"{type(self).__name__} does not support insert")
+
+    @abstractmethod
+    def insort(self, item: str, key: SortKey | None = None) -> int:
+        """
+        Insert an item into its place in the sorted items and return its
+        position.
+        """
+        raise NotImplementedError()
+
+    def resort(self, key: SortKey):
+        raise NotImplementedError(f"{type(self).__name__} does not support resort")
+
+
+class ListItems(ItemSource):
+    """
+    Items held in a list. The sort keys of the items are computed once,
+    the first time they are needed, and kept up to date from then on.
+    """
+    __items: list[str]
+    __key: SortKey | None
+    __keys: list[typing.Any] | None  # of __items under __key
+
+    def __init__(self, items: list[str] | None = None, key: SortKey | None = None):
+        """
+        `key` is the order `items` are already sorted in, if any.
+        """
+        self.__items = items if items is not None else []
+        self.__key = key
+        self.__keys = None
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __getitem__(self, index: int) -> str:
+        return self.__items[index]
+
+    def index(self, item: str) -> int:
+        return self.__items.index(item)
+
+    def insert(self, index: int, item: str):
+        self.__items.insert(index, item)
+        if self.__keys is not None:
+            self.__keys.insert(index, self.__key(item) if self.__key else item)
+
+    def insort(self, item: str, key: SortKey | None = None) -> int:
+        if key is not self.__key:
+            self.__key = key
+            self.__keys = None
+        keys = self.__sort_keys()
+        value = key(item) if key else item
+        index = bisect.bisect(keys, value)
+        keys.insert(index, value)
+        self.__items.insert(index, item)
+        return index
+
+    def resort(self, key: SortKey):
+        keys = [key(item) for item in self.__items]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.__items = [self.__items[index] for index in order]
+        self.__keys = [keys[index] for index in order]
+        self.__key = key
+
+    def __sort_keys(self) -> list[typing.Any]:
+        if self.__keys is None:
+            self.__keys = [self.__key(item) for item in self.__items] if self.__key else list(self.__items)
+        return self.__keys
+
+
+class PagedItems(ItemSource):
+    """
+    Sorted items read a page at a time from elsewhere, such as the request
+    names of a WorkspaceStore. Only the pages that are displayed or
+    searched are fetched, and the most recent of them are kept.
+    """
+    PAGE: typing.ClassVar[int] = 256
+    PAGES_KEPT: typing.ClassVar[int] = 64
+
+    __fetch: typing.Callable[[int, int], list[str]]  # offset, limit
+    __count: typing.Callable[[], int]
+    __key: SortKey
+    __length: int | None
+    __pages: collections.OrderedDict[int, list[str]]
+
+    def __init__(self, fetch: typing.Callable[[int, int], list[str]], count: typing.Callable[[], int], key: SortKey):
+        """
+        `fetch` returns items in the order given by `key`.
+        """
+        self.__fetch = fetch
+        self.__count = count
+        self.__key = key
+        self.__length = None
+        self.__pages = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        if self.__length is None:
+            self.__length = self.__count()
+        return self.__length
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("item index out of range")
+        number, offset = divmod(index, self.PAGE)
+        page = self.__pages.get(number)
+        if page is None:
+            page = self.__pages[number] = self.__fetch(number * self.PAGE, self.PAGE)
+            if len(self.__pages) > self.PAGES_KEPT:
+                self.__pages.popitem(last=False)
+        else:
+            self.__pages.move_to_end(number)
+        return page[offset]
+
+    def index(self, item: str) -> int:
+        # items are sorted, so this reads only the pages a binary search visits
+        index = bisect.bisect_left(self, self.__key(item), key=self.__key)
+        while index < len(self) and self.__key(self[index]) == self.__key(item):
+            if self[index] == item:
+                return index
+            index += 1
+        raise ValueError(f"{item!r} is not in the list")
+
+    def insort(self, item: str, key: SortKey | None = None) -> int:
+        """
+        The source the pages come from already has the item, so this only
+        finds where the item went and shifts the pages read since. `key` is
+        ignored; the order is that of the source.
+        """
+        if self.__length is None:
+            # nothing was read yet
+            return self.index(item)
+
+        index = bisect.bisect_right(self, self.__key(item), key=self.__key)
+        self.__length += 1
+        number, offset = divmod(index, self.PAGE)
+        carry: str | None = None  # pushed out of the end of the previous page
+        for page_number in sorted(page_number for page_number in self.__pages if page_number >= number):
+            page = self.__pages[page_number]
+            if page_number == number:
+                page.insert(offset, item)
+            elif carry is not None and page_number - 1 in self.__pages:
+                page.insert(0, carry)
+            else:
+                # its first item is on a page that was not read
+                del self.__pages[page_number]
+                carry = None
+                continue
+            carry = page.pop() if len(page) > self.PAGE else None
+        return index
+
+    def refresh(self):
+        self.__length = None
+        self.__pages.clear()
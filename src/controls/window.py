@@ -0,0 +1,42 @@
+import typing
+
+
+class Window(typing.Protocol):
+    """
+    The part of the curses window API the controls draw with. curses windows
+    and fakecurses.FakeWindow both provide it.
+    """
+    def derwin(self, nlines: int, ncols: int, begin_y: int, begin_x: int, /) -> "Window": ...
+    def getmaxyx(self) -> tuple[int, int]: ...
+    def getbegyx(self) -> tuple[int, int]: ...
+    def getyx(self) -> tuple[int, int]: ...
+    def move(self, y: int, x: int, /) -> None: ...
+
+    @typing.overload
+    def addstr(self, text: str, attr: int = ..., /) -> None: ...
+    @typing.overload
+    def addstr(self, y: int, x: int, text: str, attr: int = ..., /) -> None: ...
+
+    @typing.overload
+    def addnstr(self, text: str, n: int, attr: int = ..., /) -> None: ...
+    @typing.overload
+    def addnstr(self, y: int, x: int, text: str, n: int, attr: int = ..., /) -> None: ...
+
+    @typing.overload
+    def addch(self, ch: str | int, attr: int = ..., /) -> None: ...
+    @typing.overload
+    def addch(self, y: int, x: int, ch: str | int, attr: int = ..., /) -> None: ...
+
+    def erase(self) -> None: ...
+    def clear(self) -> None: ...
+    def border(self) -> None: ...
+    def refresh(self) -> None: ...
+    def noutrefresh(self) -> None: ...
+    def bkgd(self, ch: str | int, attr: int = ..., /) -> None: ...
+    def attron(self, attr: int, /) -> None: ...
+    def attroff(self, attr: int, /) -> None: ...
+    def scrollok(self, flag: bool, /) -> None: ...
+    def scroll(self, lines: int = 1) -> None: ...
+    def nodelay(self, flag: bool, /) -> None: ...
+    def keypad(self, flag: bool, /) -> None: ...
+    def getch(self) -> int: ...
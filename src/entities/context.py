@@ -1,7 +1,12 @@
+import os
+
 from .entity import Entity
 from .request import *
 from .response import *
 from .settings import Settings
+from storage.factory import create_store
+from storage.responses import ResponseStore
+from storage.workspace import WorkspaceStore
 
 
 class AppContext(Entity):
@@ -14,9 +19,26 @@ class AppContext(Entity):
     # app state
     active_collection: Collection | None
     active_request: Request | None
-    responses: dict[str, Response]
+    responses: ResponseStore
+
+    # persistence; None keeps the workspace in memory only
+    workspace: WorkspaceStore | None
 
     @staticmethod
-    def create():
-        return AppContext(settings=Settings(), collections=[], active_collection=None, active_request=None, responses={})
+    def create(settings: Settings | None = None, workspace: str | None = None):
+        settings = settings or Settings()
+        store = None
+        collections = []
+        if workspace is not None:
+            store = create_store(os.path.expanduser(workspace), settings.workspace)
+            collections = store.load()
+
+        return AppContext(
+            settings=settings,
+            collections=collections,
+            active_collection=None,
+            active_request=None,
+            responses=ResponseStore(settings.responses),
+            workspace=store,
+        )
 
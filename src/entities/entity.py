@@ -3,32 +3,56 @@ import collections.abc
 import copy
 import enum
 import json
+import mmap
+import re
 import types
 import typing
 
 
 T = typing.TypeVar("T")
 
+# anything but the whitespace json allows between values
+NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
 
 NONE_TYPE = type(None)
 NULL = object()
 
 
+type Validator = typing.Callable[[typing.Any], typing.Any]
+
+
 class FieldInfo:
     name: str
     types: tuple[type, ...]
     optional: bool
     default: tuple[bool, typing.Any]
-
-    def __init__(self, name: str, optional: bool = False, default: typing.Any = NULL):
+    default_factory: typing.Callable[[], typing.Any] | None
+    compiled: Validator
+
+    def __init__(
+        self,
+        name: str,
+        optional: bool = False,
+        default: typing.Any = NULL,
+        default_factory: typing.Callable[[], typing.Any] | None = None,
+    ):
         self.name = name
         self.optional = optional
+        self.default_factory = default_factory
 
-        if default is not NULL:
-            self.default = True, default
+        if default is not NULL and default_factory is not None:
+            raise ValueError("a field cannot have both a default and a default_factory")
+        if default is not NULL or default_factory is not None:
+            self.default = True, default if default is not NULL else None
         else:
             self.default = False, None
 
+    def get_default(self) -> typing.Any:
+        if self.default_factory is not None:
+            return self.default_factory()
+        return self.default[1]
+
     def validate(self, value: typing.Any):
         exact_type = type(value)
         if exact_type in self.types:
@@ -92,18 +116,335 @@ class FieldInfo:
             return mapping_type(value)
 
 
+def compile_type(single_type: type) -> Validator:
+    """
+    Build a validator for one (possibly generic) type. Decisions that
+    FieldInfo.validate_single makes on every call, such as resolving
+    __origin__ or walking the issubclass chain, are made once here, and
+    containers get element validators specialized for their arguments.
+    The returned function yields NULL when a dict cannot build the entity
+    type in question, and raises for any other mismatch.
+    """
+    origin_type = getattr(single_type, "__origin__", single_type)
+    args = getattr(single_type, "__args__", None)
+
+    if issubclass(origin_type, Entity):
+        def validate_entity(value):
+            if isinstance(value, origin_type):
+                return value
+            if isinstance(value, dict):
+                try:
+                    return origin_type(**value)
+                except (TypeError, ValueError):
+                    return NULL
+            raise TypeError("'%s' does not validly belong to type %s" % (value, single_type))
+        return validate_entity
+    elif issubclass(origin_type, enum.Enum):
+        members = origin_type._value2member_map_
+        def validate_enum(value):
+            if type(value) is origin_type:
+                return value
+            try:
+                # skips EnumType.__call__ for the usual by-value lookup
+                return members[value]
+            except (KeyError, TypeError):
+                return origin_type(value)
+        return validate_enum
+    elif issubclass(origin_type, (str, bytes)) or not issubclass(origin_type, (collections.abc.Sequence, collections.abc.Mapping)):
+        def validate_instance(value):
+            if isinstance(value, origin_type):
+                return value
+            raise TypeError("'%s' does not validly belong to type %s" % (value, single_type))
+        return validate_instance
+    elif issubclass(origin_type, collections.abc.Sequence):
+        # a concrete sequence type, built from an iterable
+        build_sequence = typing.cast(typing.Callable[[typing.Iterable[typing.Any]], typing.Any], origin_type)
+        if not args:
+            def validate_plain_sequence(value):
+                if not isinstance(value, collections.abc.Iterable):
+                    raise TypeError("A Sequence type requires an Iterable value!")
+                return build_sequence(value)
+            return validate_plain_sequence
+
+        element_type = args[0]
+        validate_element = compile_element(element_type)
+        fast_types = leaf_types(element_type)
+        def validate_sequence(value):
+            value_type = type(value)
+            if value_type is not list and not isinstance(value, collections.abc.Iterable):
+                raise TypeError("A Sequence type requires an Iterable value!")
+            if fast_types and (value_type is list or value_type is tuple) and fast_types.issuperset(map(type, value)):
+                return build_sequence(value)
+            return build_sequence([validate_element(element) for element in value])
+        return validate_sequence
+    else:
+        build_mapping = typing.cast(typing.Callable[[typing.Mapping[typing.Any, typing.Any]], typing.Any], origin_type)
+        if not args:
+            def validate_plain_mapping(value):
+                if not isinstance(value, collections.abc.Mapping):
+                    raise TypeError("A Mapping type requires a Mapping value!")
+                return build_mapping(value)
+            return validate_plain_mapping
+
+        key_type, value_type = args
+        validate_key = compile_element(key_type)
+        validate_value = compile_element(value_type)
+        fast_keys = leaf_types(key_type)
+        fast_values = leaf_types(value_type)
+        def validate_mapping(value):
+            if type(value) is not dict and not isinstance(value, collections.abc.Mapping):
+                raise TypeError("A Mapping type requires a Mapping value!")
+            if (
+                fast_keys and fast_values
+                and fast_keys.issuperset(map(type, value))
+                and fast_values.issuperset(map(type, value.values()))
+            ):
+                return build_mapping(value)
+            return build_mapping({ validate_key(key): validate_value(item) for key, item in value.items() })
+        return validate_mapping
+
+
+def leaf_types(single_type: type) -> frozenset[type]:
+    """
+    Exact types that are valid for `single_type` as they are, letting
+    containers of them be accepted with one C-level pass over the elements.
+    """
+    if isinstance(single_type, type) and not hasattr(single_type, "__origin__"):
+        if issubclass(single_type, (str, bytes, Entity, enum.Enum)):
+            return frozenset((single_type,))
+        if not issubclass(single_type, (collections.abc.Sequence, collections.abc.Mapping)):
+            return frozenset((single_type,))
+    return frozenset()
+
+
+def compile_element(single_type: type) -> Validator:
+    validate = compile_type(single_type)
+    def validate_element(value):
+        result = validate(value)
+        if result is NULL:
+            raise TypeError("value '%s' does not match type %s" % (value, single_type))
+        return result
+    return validate_element
+
+
+def compile_field(field: FieldInfo) -> Validator:
+    field_types = getattr(field, "types", None)
+    if field_types is None:
+        # declared through Field() without an annotation
+        return lambda value: value
+
+    optional = field.optional
+    if len(field_types) == 1 and not optional:
+        exact_type = field_types[0]
+        validate_single = compile_type(exact_type)
+        def validate(value):
+            if type(value) is exact_type:
+                return value
+            validated = validate_single(value)
+            if validated is NULL:
+                raise TypeError("value '%s' does not match field type %s" % (str(value), str(field)))
+            return validated
+        return validate
+
+    exact_types = frozenset(field_types)
+    validators = tuple(compile_type(tp) for tp in field_types)
+    def validate_union(value):
+        if type(value) in exact_types:
+            return value
+        if optional and value is None:
+            return None
+        for validate_single in validators:
+            try:
+                validated = validate_single(value)
+            except TypeError:
+                continue
+            if validated is not NULL:
+                return validated
+        raise TypeError("value '%s' does not match field type %s" % (str(value), str(field)))
+    return validate_union
+
+
+def compile_init(fields: dict[str, FieldInfo]) -> typing.Callable[..., None]:
+    """
+    Generate an __init__ that assigns each field straight from kwargs.
+    Plain single-type fields are checked inline with an exact type test and
+    only fall back to their compiled validator on a mismatch.
+    """
+    namespace: dict[str, typing.Any] = {"NULL": NULL}
+    lines = ["def __init__(self, **kwargs):", "    pop = kwargs.pop"]
+    for index, (key, field) in enumerate(fields.items()):
+        namespace[f"validate_{index}"] = field.compiled
+        namespace[f"default_{index}"] = field.default_factory or field.default[1]
+        lines.append(f"    value = pop({key!r}, NULL)")
+        lines.append("    if value is NULL:")
+        if field.default_factory is not None:
+            lines.append(f"        self.{key} = default_{index}()")
+        elif field.default[0]:
+            lines.append(f"        self.{key} = default_{index}")
+        else:
+            lines.append(f"        raise ValueError(\"missing value for field '{key}'\")")
+
+        field_types = getattr(field, "types", ())
+        if len(field_types) == 1 and not field.optional and leaf_types(field_types[0]):
+            namespace[f"type_{index}"] = field_types[0]
+            lines.append(f"    elif type(value) is type_{index}:")
+            lines.append(f"        self.{key} = value")
+        lines.append("    else:")
+        lines.append(f"        self.{key} = validate_{index}(value)")
+
+    lines.append("    if kwargs:")
+    lines.append("        raise ValueError(f\"entity {type(self).__name__} has no field {next(iter(kwargs))}\")")
+
+    exec("\n".join(lines), namespace)
+    return namespace["__init__"]
+
+
+# values of these types are never mutated in place, so copies can share them;
+# entities only ever hold read-only memory maps
+IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, NONE_TYPE, enum.Enum, frozenset, mmap.mmap)
+
+
+def share(value: typing.Any) -> typing.Any:
+    return value
+
+
+def copy_value(value: typing.Any) -> typing.Any:
+    """
+    Copy a value whose type is not known ahead of time.
+    """
+    value_type = type(value)
+    if isinstance(value, IMMUTABLE_TYPES):
+        return value
+    elif isinstance(value, Entity):
+        return value.copy()
+    elif value_type is list:
+        return [copy_value(element) for element in value]
+    elif value_type is dict:
+        return {key: copy_value(item) for key, item in value.items()}
+    elif value_type is tuple:
+        return tuple(copy_value(element) for element in value)
+    return copy.deepcopy(value)
+
+
+def compile_copier(single_type: typing.Any) -> typing.Callable[[typing.Any], typing.Any]:
+    """
+    Build a copier for values of a field type: immutable values are shared,
+    containers are rebuilt and only copy their elements where those are
+    mutable themselves.
+    """
+    origin_type = getattr(single_type, "__origin__", single_type)
+    args = getattr(single_type, "__args__", None)
+
+    if isinstance(origin_type, types.UnionType) or origin_type is typing.Union:
+        copiers = [compile_copier(tp) for tp in args or ()]
+        if all(copier is share for copier in copiers):
+            return share
+        return copy_value
+    elif not isinstance(origin_type, type):
+        return copy_value
+    elif issubclass(origin_type, IMMUTABLE_TYPES):
+        return share
+    elif issubclass(origin_type, Entity):
+        return lambda value: value.copy()
+    elif origin_type is list and args:
+        copy_element = compile_copier(args[0])
+        if copy_element is share:
+            return list
+        return lambda value: [copy_element(element) for element in value]
+    elif origin_type is tuple and args:
+        if len(args) == 2 and args[1] is Ellipsis:
+            # tuple[X, ...]
+            copy_element = compile_copier(args[0])
+            if copy_element is share:
+                return share
+            return lambda value: tuple([copy_element(element) for element in value])
+        # a fixed-length tuple has a type per position
+        copiers = [compile_copier(tp) for tp in args]
+        if all(copier is share for copier in copiers):
+            return share
+        return lambda value: tuple(
+            [copier(element) for copier, element in zip(copiers, value)]
+            if len(value) == len(copiers) else copy_value(value)
+        )
+    elif origin_type is dict and args:
+        copy_item = compile_copier(args[1])
+        if copy_item is share:
+            return dict.copy
+        return lambda value: {key: copy_item(item) for key, item in value.items()}
+    return copy_value
+
+
+def compile_copy(fields: dict[str, FieldInfo], hints: dict[str, typing.Any]) -> typing.Callable[[Entity], Entity]:
+    """
+    Generate a copy() that rebuilds an entity field by field (see
+    compile_copier) rather than going through copy.deepcopy.
+    """
+    namespace: dict[str, typing.Any] = {"share": share}
+    lines = ["def copy(self):", "    new = type(self).__new__(type(self))"]
+    for index, key in enumerate(fields):
+        copier = compile_copier(hints[key]) if key in hints else copy_value
+        if copier is share:
+            lines.append(f"    new.{key} = self.{key}")
+        else:
+            namespace[f"copy_{index}"] = copier
+            lines.append(f"    new.{key} = copy_{index}(self.{key})")
+    lines.append("    return new")
+
+    exec("\n".join(lines), namespace)
+    return namespace["copy"]
+
+
+def is_class_var(annotation: typing.Any) -> bool:
+    if isinstance(annotation, str):
+        return annotation.startswith(("ClassVar", "typing.ClassVar"))
+    return typing.get_origin(annotation) is typing.ClassVar
+
+
 class EntityMeta(type):
-    def __new__(cls, *args):
-        new_type = super().__new__(cls, *args)
+    """
+    Collects the annotated fields of an entity class into __fields__ and
+    compiles its validators. Pass `slots=True` in the class statement to
+    store the fields declared by that class in __slots__ instead of a
+    per-instance __dict__.
+    """
+    __fields__: dict[str, FieldInfo]
+
+    def __new__(cls, name: str, bases: tuple[type, ...], namespace: dict[str, typing.Any], slots: bool = False):
+        # Field() declarations, which would clash with slot descriptors if left as class attributes
+        declared = {key: value for key, value in namespace.items() if isinstance(value, FieldInfo)}
+        if slots:
+            inherited = {
+                slot
+                for base in bases for klass in base.__mro__
+                for slot in getattr(klass, "__slots__", ())
+            }
+            annotations = namespace.get("__annotations__", {})
+            field_names = [
+                key for key, annotation in annotations.items()
+                if not (key.startswith("__") and key.endswith("__")) and not is_class_var(annotation)
+            ]
+            field_names += [key for key in declared if key not in annotations]
+            namespace = {key: value for key, value in namespace.items() if key not in declared}
+            namespace["__slots__"] = tuple(key for key in field_names if key not in inherited)
+
+        new_type = super().__new__(cls, name, bases, namespace)
         new_type.__fields__ = {}
 
+        base_fields: dict[str, FieldInfo] = {}
+        for base in reversed(new_type.__mro__[1:]):
+            base_fields.update(getattr(base, "__fields__", {}))
+
         hints = typing.get_type_hints(new_type)
         for name, field_type in hints.items():
             if (name.startswith("__") and name.endswith("__")):
                 continue
 
             # check if user has manually defined this
-            if hasattr(new_type, name):
+            if name in declared:
+                new_type.__fields__[name] = declared[name]
+            elif name in base_fields:
+                new_type.__fields__[name] = base_fields[name]
+            elif hasattr(new_type, name) and not isinstance(getattr(new_type, name), types.MemberDescriptorType):
                 field = getattr(new_type, name)
                 if not isinstance(field, FieldInfo):
                     raise TypeError("Expected a Field instance, got %s" % field)
@@ -124,7 +465,7 @@ class EntityMeta(type):
             else:
                 new_type.__fields__[name].types = (field_type,)
 
-        for name, value in args[2].items():
+        for name, value in namespace.items():
             if name.startswith("__") and name.endswith("__"):
                 continue
 
@@ -134,33 +475,60 @@ class EntityMeta(type):
             if not isinstance(value, FieldInfo):
                 raise TypeError("Expected a Field instance, got %s (%s)" % (value, name))
 
+        for name, value in declared.items():
             if name not in new_type.__fields__:
                 new_type.__fields__[name] = value
 
+        for field in new_type.__fields__.values():
+            field.compiled = compile_field(field)
+        if "__init__" not in namespace:
+            new_type.__init__ = compile_init(new_type.__fields__)
+        if "copy" not in namespace:
+            setattr(new_type, "copy", compile_copy(new_type.__fields__, hints))
+
         return new_type
 
 
 class Entity(metaclass=EntityMeta):
     __fields__: typing.ClassVar[dict[str, FieldInfo]]
+    __slots__ = ()
 
     def __init__(self, **kwargs):
+        # subclasses get a specialized __init__ from EntityMeta; this generic
+        # version serves subclasses that define their own and call up to it
         for key, field in self.__fields__.items():
             if key not in kwargs:
                 if field.default[0]:
-                    setattr(self, key, field.default[1])
+                    setattr(self, key, field.get_default())
                     continue
                 raise ValueError(f"missing value for field '{key}'")
 
-            setattr(self, key, field.validate(kwargs[key]))
+            setattr(self, key, field.compiled(kwargs[key]))
             kwargs.pop(key)
             
         if kwargs:
             keys = list(kwargs.keys())
-            raise ValueError(f"entity {self.__name__} has no field {keys[0]}")
+            raise ValueError(f"entity {type(self).__name__} has no field {keys[0]}")
 
     def copy(self):
+        """
+        Deep copy of this entity's fields. Subclasses get a specialized
+        version from EntityMeta that shares immutable values.
+        """
         return copy.deepcopy(self)
 
+    def snapshot(self):
+        """
+        Copy-on-write snapshot: a new entity sharing every field value with
+        this one. Only safe to take when fields are changed by assigning new
+        values, never by mutating containers in place, which holds for
+        the UI's edits to requests.
+        """
+        new = type(self).__new__(type(self))
+        for key in self.__fields__:
+            setattr(new, key, getattr(self, key))
+        return new
+
 
 class EntityEncoder(json.JSONEncoder):
     def default(self, o):
@@ -176,25 +544,183 @@ class EntityEncoder(json.JSONEncoder):
 EntityType = typing.TypeVar("EntityType", bound=Entity)
 
 
-class EntityDecoder(json.JSONDecoder, typing.Generic[EntityType]):
-    __args__: typing.ClassVar[tuple[type]]
+def entity_types(root: type[Entity]) -> list[type[Entity]]:
+    """
+    Entity classes whose instances can appear in a `root` graph, root first.
+    """
+    found = [root]
+    pending = [root]
+    while pending:
+        entity_type = pending.pop()
+        for field in entity_type.__fields__.values():
+            arguments = list(getattr(field, "types", ()))
+            while arguments:
+                argument = arguments.pop()
+                arguments.extend(getattr(argument, "__args__", ()))
+                origin_type = getattr(argument, "__origin__", argument)
+                if isinstance(origin_type, type) and issubclass(origin_type, Entity) and origin_type not in found:
+                    found.append(origin_type)
+                    pending.append(origin_type)
+    return found
 
-    def __init__(self, *args, **kwargs):
-        kwargs["object_pairs_hook"] = self.__object_pairs_hook
-        super().__init__(*args, **kwargs)
 
-    def __object_pairs_hook(self, pairs: list[tuple[str, EntityType]]):
-        entity_type = self.__args__[0]
-        values = dict(pairs)
-        for key, field in entity_type.items():
-            values[key] = field.validate(values[key])
-        return values
+class EntityDecoder(json.JSONDecoder, typing.Generic[EntityType]):
+    """
+    Decodes JSON written by EntityEncoder into entities of one type, given
+    either as `EntityDecoder[Collection]` or with `entity_type=Collection`.
+    Objects are turned into entities as the parser finishes them whenever
+    their keys identify exactly one entity class of the graph, so nested
+    values arrive at their parent's __init__ already built. Objects that
+    cannot be told apart this way stay dicts for the field validators.
+    """
+    __orig_class__: typing.Any
+
+    def __init__(self, *args, entity_type: type[EntityType] | None = None, **kwargs):
+        kwargs["object_hook"] = self.__object_hook
+        super().__init__(*args, **kwargs)
+        self.__entity_type = entity_type
+        self.__candidates: list[tuple[type[Entity], frozenset[str], frozenset[str], dict[str, str] | None]] | None = None
+        self.__signatures: dict[tuple[str, ...], tuple[type[Entity], dict[str, str] | None] | None] = {}
+
+    @property
+    def entity_type(self) -> type[EntityType]:
+        if self.__entity_type is None:
+            # only known once typing has set __orig_class__, after __init__
+            orig_class = getattr(self, "__orig_class__", None)
+            if orig_class is None:
+                raise TypeError("EntityDecoder needs an entity type, e.g. EntityDecoder[Collection]")
+            self.__entity_type = typing.get_args(orig_class)[0]
+        return self.__entity_type
+
+    def decode(self, s: str, *args, **kwargs) -> EntityType | list[EntityType]:
+        value = super().decode(s, *args, **kwargs)
+        if isinstance(value, list):
+            return [self.finish(element) for element in value]
+        return self.finish(value)
+
+    def finish(self, value: typing.Any) -> EntityType:
+        """
+        Build the decoder's entity type from a decoded top-level value.
+        """
+        entity_type = self.entity_type
+        if isinstance(value, entity_type):
+            return value
+        if not isinstance(value, dict):
+            raise TypeError("expected an object for %s, got %r" % (entity_type.__name__, value))
+        names = {field.name: key for key, field in entity_type.__fields__.items()}
+        items: dict[str, typing.Any] = value
+        return entity_type(**{names.get(name, name): item for name, item in items.items()})
+
+    def __match(self, keys: tuple[str, ...]) -> tuple[type[Entity], dict[str, str] | None] | None:
+        if self.__candidates is None:
+            self.__candidates = []
+            for entity_type in entity_types(self.entity_type):
+                fields = entity_type.__fields__
+                names = {field.name: key for key, field in fields.items()}
+                required = frozenset(field.name for field in fields.values() if not field.default[0])
+                renames = names if any(name != key for name, key in names.items()) else None
+                self.__candidates.append((entity_type, required, frozenset(names), renames))
+
+        key_set = frozenset(keys)
+        matches = [
+            (entity_type, renames)
+            for entity_type, required, names, renames in self.__candidates
+            if required <= key_set <= names
+        ]
+        # an empty object fits every class without required fields
+        return matches[0] if len(matches) == 1 and keys else None
+
+    def __object_hook(self, values: dict[str, typing.Any]) -> typing.Any:
+        keys = tuple(values)
+        try:
+            match = self.__signatures[keys]
+        except KeyError:
+            match = self.__signatures[keys] = self.__match(keys)
+        if match is None:
+            return values
+
+        entity_type, renames = match
+        try:
+            if renames is not None:
+                return entity_type(**{renames[name]: item for name, item in values.items()})
+            return entity_type(**values)
+        except (TypeError, ValueError):
+            # leave it to the parent's validators, which report the error in context
+            return values
+
+
+def iterload(fp: typing.TextIO, entity_type: type[EntityType], chunk_size: int = 1024 * 1024) -> typing.Iterator[EntityType]:
+    """
+    Stream the entities of a top-level JSON array from `fp`, reading it in
+    chunks and yielding each element as soon as it has been parsed.
+    """
+    decoder = EntityDecoder(entity_type=entity_type)
+    buffer = ""
+    position = 0
+    at_eof = False
+
+    def fill(size: int) -> bool:
+        nonlocal buffer, position, at_eof
+        data = fp.read(size)
+        if not data:
+            at_eof = True
+            return False
+        buffer = buffer[position:] + data
+        position = 0
+        return True
+
+    def next_token() -> str:
+        nonlocal position
+        while True:
+            token = NON_WHITESPACE.search(buffer, position)
+            position = token.start() if token is not None else len(buffer)
+            if position < len(buffer):
+                return buffer[position]
+            if not fill(chunk_size):
+                raise json.JSONDecodeError("unexpected end of data", buffer, position)
+
+    if next_token() != "[":
+        raise json.JSONDecodeError("expected a top-level array", buffer, position)
+    position += 1
+    if next_token() == "]":
+        return
+
+    while True:
+        next_token()
+        read_size = chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError:
+                # most likely an element cut off at the end of the buffer;
+                # read ahead in growing steps so large elements are not reparsed often
+                if at_eof or not fill(read_size):
+                    raise
+                read_size *= 2
+        position = end
+        yield decoder.finish(value)
+
+        token = next_token()
+        position += 1
+        if token == "]":
+            return
+        if token != ",":
+            raise json.JSONDecodeError("expected ',' or ']'", buffer, position - 1)
+
+
+def load(fp: typing.TextIO, entity_type: type[EntityType]) -> EntityType | list[EntityType]:
+    """
+    Load one entity, or a list of them, from a JSON file.
+    """
+    return EntityDecoder(entity_type=entity_type).decode(fp.read())
 
 
 def Field(
     name: str | None = None,
     optional: bool = False,
     default: typing.Any = NULL,
+    default_factory: typing.Callable[[], typing.Any] | None = None,
 ) -> typing.Any:
-    return FieldInfo(name or "", optional, default)
+    return FieldInfo(name or "", optional, default, default_factory)
 
@@ -2,7 +2,7 @@ import curses
 import enum
 
 import colors
-from .entity import Entity
+from .entity import Entity, Field
 
 
 class Method(enum.StrEnum):
@@ -33,15 +33,18 @@ class Method(enum.StrEnum):
                 return colors.COLOR_ORANGE
 
 
-class Request(Entity):
+class Request(Entity, slots=True):
     name: str
 
     method: Method
     url: str
     headers: dict[str, str]
 
+    # names of requests in the same collection that a run executes first
+    depends_on: tuple[str, ...] = Field(default=())
 
-class Collection(Entity):
+
+class Collection(Entity, slots=True):
     name: str
     requests: list[Request]
 
@@ -1,8 +1,31 @@
-from .entity import Entity
+import mmap
 
+from .entity import Entity, Field
 
-class Response(Entity):
+
+class ResponseTiming(Entity, slots=True):
+    """
+    Seconds spent in each phase of an exchange, in order. Name resolution
+    happens inside the TCP connect, so it is part of `connect`; `connect`
+    and `tls` are zero when a kept-alive connection was `reused`.
+    """
+    queued: float    # waiting for a connection from the pool
+    connect: float
+    tls: float
+    send: float      # writing the request
+    wait: float      # until the response head arrived
+    download: float  # reading the body
+    total: float
+    reused: bool
+
+
+class Response(Entity, slots=True):
     status: int
     headers: dict[str, str]
-    data: bytes
 
+    # large bodies may be backed by a read-only memory map, see storage.ResponseStore
+    data: bytes | mmap.mmap
+
+    # hit, miss or revalidated when the response went through executor.ResponseCache
+    cache_status: str | None = Field(default=None)
+    timing: ResponseTiming | None = Field(default=None)
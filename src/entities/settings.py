@@ -1,3 +1,5 @@
+import enum
+
 from .entity import Entity, Field
 
 
@@ -9,6 +11,82 @@ class TerminalColors(Entity):
     error: str    = Field(default="#FF746C")
 
 
+class Engine(enum.StrEnum):
+    thread = "thread"
+    asyncio = "asyncio"
+
+
+class DuplicatePolicy(enum.StrEnum):
+    # sending a request again while its previous send is in flight...
+    coalesce = "coalesce"  # ...delivers the results of that send, if the request is unchanged
+    cancel = "cancel"      # ...cancels it
+
+
+class PoolSettings(Entity):
+    # per origin
+    max_connections: int            = Field(default=100)
+    max_keepalive_connections: int  = Field(default=20)
+    keepalive_expiry: float         = Field(default=30.0)
+
+    # requires the optional 'h2' package
+    http2: bool = Field(default=False)
+
+
+class ResponseStoreSettings(Entity):
+    # bytes of response bodies kept in memory before spilling to disk
+    memory_budget: int      = Field(default=256 * 1024 * 1024)
+    max_resident_size: int  = Field(default=16 * 1024 * 1024)
+
+    # spilled bodies are appended to shared files of about spill_file_size bytes; every
+    # spilled body is a memory map of its own, so at most max_spilled are kept
+    spill_directory: str | None = Field(default=None)
+    spill_file_size: int        = Field(default=256 * 1024 * 1024)
+    max_spilled: int            = Field(default=256)
+
+
+class CacheSettings(Entity):
+    # HTTP caching of responses, following Cache-Control, Expires and validators
+    enabled: bool     = Field(default=True)
+    max_entries: int  = Field(default=1024)
+
+    store: ResponseStoreSettings = Field(default=ResponseStoreSettings(memory_budget=64 * 1024 * 1024))
+
+
+class ExecutorSettings(Entity):
+    engine: Engine   = Field(default=Engine.thread)
+
+    # thread engine
+    workers: int     = Field(default=8)
+
+    # asyncio engine
+    max_concurrency: int = Field(default=256)
+
+    queue_size: int  = Field(default=64)
+    duplicates: DuplicatePolicy = Field(default=DuplicatePolicy.cancel)
+
+    # deliver response bodies incrementally as StreamChunks
+    stream: bool     = Field(default=True)
+    chunk_size: int  = Field(default=64 * 1024)
+
+    pool: PoolSettings = Field(default=PoolSettings())
+    cache: CacheSettings = Field(default=CacheSettings())
+
+
+class StorageBackend(enum.StrEnum):
+    journal = "journal"
+    sqlite = "sqlite"
+
+
+class WorkspaceSettings(Entity):
+    directory: str  = Field(default="~/.httpmagic")
+    backend: StorageBackend = Field(default=StorageBackend.journal)
+
+    # journal backend: entries written before they are compacted into a snapshot
+    compact_after: int = Field(default=1000)
+
+
 class Settings(Entity):
     colors: TerminalColors = Field(default=TerminalColors())
-
+    executor: ExecutorSettings = Field(default=ExecutorSettings())
+    responses: ResponseStoreSettings = Field(default=ResponseStoreSettings())
+    workspace: WorkspaceSettings = Field(default=WorkspaceSettings())
@@ -0,0 +1,11 @@
+from .base import ExecutorBusy, RequestExecutor, Result, StreamChunk, StreamStart
+from .cache import CacheStatus, ResponseCache, cache_status
+from .timing import TimingTrace, response_timing
+from .asynchronous import AsyncExecutor
+from .threaded import ThreadExecutor
+from .factory import create_executor
+
+__all__ = [
+    'AsyncExecutor', 'CacheStatus', 'ExecutorBusy', 'RequestExecutor', 'ResponseCache', 'Result', 'StreamChunk',
+    'StreamStart', 'ThreadExecutor', 'TimingTrace', 'cache_status', 'create_executor', 'response_timing',
+]
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+from entities.settings import ExecutorSettings
+from .base import ExecutorBusy, Job, RequestExecutor, StreamChunk, StreamStart, content_length
+from .cache import Lookup, ResponseCache
+from .timing import EXTENSION as TIMING, TimingTrace
+from .pool import AsyncClientPool
+
+
+class AsyncExecutor(RequestExecutor):
+    """
+    Runs every request as a coroutine on a single event loop hosted in a
+    dedicated thread, so in-flight requests cost tasks rather than threads.
+    Cancelling a job cancels its task wherever it is waiting.
+    """
+    _loop: asyncio.AbstractEventLoop
+    _thread: threading.Thread
+    _clients: AsyncClientPool
+    _concurrency: asyncio.Semaphore
+    _slots: threading.BoundedSemaphore
+    _chunk_size: int
+    _cache: ResponseCache | None
+
+    def __init__(self, settings: ExecutorSettings | None = None):
+        settings = settings or ExecutorSettings()
+        super().__init__(settings)
+        if settings.max_concurrency < 1:
+            raise ValueError("executor requires a concurrency of at least one")
+
+        self._loop = asyncio.new_event_loop()
+        self._concurrency = asyncio.Semaphore(settings.max_concurrency)
+        # requests either running or waiting for a concurrency slot
+        self._slots = threading.BoundedSemaphore(settings.max_concurrency + max(settings.queue_size, 0))
+        self._clients = AsyncClientPool(settings.pool)
+        self._chunk_size = settings.chunk_size
+        self._cache = ResponseCache(settings.cache) if settings.cache.enabled else None
+
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _execute(self, job: Job):
+        request = job.request
+        try:
+            lookup = self._cache.lookup(request) if self._cache is not None and job.cache else None
+            if lookup is not None and lookup.response is not None:
+                self._publish(job, lookup.response)
+                return
+
+            async with self._concurrency:
+                if job.stream:
+                    await self._stream_response(job, lookup)
+                else:
+                    trace = TimingTrace()
+                    result = await self._clients.get(request.url).request(
+                        method=request.method,
+                        url=request.url,
+                        headers=request.headers if lookup is None else lookup.headers,
+                        extensions=trace.async_extensions,
+                    )
+                    timing = trace.finish()
+                    if lookup is not None and self._cache is not None:
+                        result = self._cache.complete(request, lookup, result, result.content)
+                    result.extensions[TIMING] = timing
+                    self._publish(job, result)
+        except Exception as err:
+            self._publish(job, err)
+
+    async def _stream_response(self, job: Job, lookup: Lookup | None):
+        # lookup is only given when the job uses the cache
+        request = job.request
+        client = self._clients.get(request.url)
+        headers = request.headers if lookup is None else lookup.headers
+        trace = TimingTrace()
+        async with client.stream(method=request.method, url=request.url, headers=headers, extensions=trace.async_extensions) as response:
+            if lookup is not None and self._cache is not None and lookup.entry is not None and response.status_code == 304:
+                # not modified: deliver the stored response whole
+                timing = trace.finish()
+                response = self._cache.complete(request, lookup, response, b"")
+                response.extensions[TIMING] = timing
+                self._publish(job, response)
+                return
+
+            # keep a copy of the body only when the cache will store it
+            body = bytearray() if lookup is not None and self._cache is not None and self._cache.storable(lookup, response) else None
+            total = content_length(response)
+            self._publish(job, StreamStart(response.status_code, dict(response.headers), total))
+            async for chunk in response.aiter_bytes(self._chunk_size):
+                if body is not None:
+                    body += chunk
+                self._publish(job, StreamChunk(chunk, response.num_bytes_downloaded, total))
+        timing = trace.finish()
+        if lookup is not None and self._cache is not None:
+            response = self._cache.complete(request, lookup, response, bytes(body or b""))
+        response.extensions[TIMING] = timing
+        self._publish(job, response)
+
+    def _submit(self, job: Job, timeout: float | None):
+        if not self._slots.acquire(blocking=timeout is not None, timeout=timeout):
+            raise ExecutorBusy("too many pending requests")
+
+        future = asyncio.run_coroutine_threadsafe(self._execute(job), self._loop)
+        # a task cancelled before it started never runs its own cleanup
+        future.add_done_callback(lambda _: self._slots.release())
+        job.on_cancel = future.cancel
+
+    def shutdown(self, wait: bool = False):
+        async def close():
+            await self._clients.close()
+            self._loop.stop()
+
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(close(), self._loop)
+        if wait:
+            self._thread.join()
+            self._close_wakeup()
@@ -0,0 +1,229 @@
+from abc import ABCMeta, abstractmethod
+import os
+import queue
+import threading
+import typing
+
+import httpx
+
+from entities.request import Request
+from entities.settings import DuplicatePolicy, ExecutorSettings
+
+
+class StreamStart:
+    """
+    Published when the response head of a streamed request arrives.
+    """
+    status: int
+    headers: dict[str, str]
+    total: int | None
+
+    def __init__(self, status: int, headers: dict[str, str], total: int | None):
+        self.status = status
+        self.headers = headers
+        self.total = total
+
+
+class StreamChunk:
+    """
+    A piece of a streamed response body. `received` counts bytes read off
+    the wire so far, which is comparable to `total` (the Content-Length).
+    """
+    data: bytes
+    received: int
+    total: int | None
+
+    def __init__(self, data: bytes, received: int, total: int | None):
+        self.data = data
+        self.received = received
+        self.total = total
+
+
+# A streamed request publishes StreamStart, any number of StreamChunks and
+# finally its (already consumed) httpx.Response, or an Exception at any point.
+type Result = httpx.Response | Exception | StreamStart | StreamChunk
+
+
+def content_length(response: httpx.Response) -> int | None:
+    try:
+        return int(response.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+def same_request(a: Request, b: Request) -> bool:
+    return a.method == b.method and a.url == b.url and a.headers == b.headers
+
+
+class Job:
+    """
+    One execution of a request. Once cancelled, nothing more it produces is
+    published and engines stop reading its response, which closes the
+    connection it was using.
+    """
+    request: Request
+    id: str
+    stream: bool
+    cache: bool  # whether the response cache may answer or store it
+    __cancelled: threading.Event
+    __on_cancel: typing.Callable[[], typing.Any] | None
+
+    def __init__(self, request: Request, id: str, stream: bool, cache: bool = True):
+        self.request = request
+        self.id = id
+        self.stream = stream
+        self.cache = cache
+        self.__cancelled = threading.Event()
+        self.__on_cancel = None
+
+    def cancel(self):
+        self.__cancelled.set()
+        if self.__on_cancel is not None:
+            self.__on_cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__cancelled.is_set()
+
+    @property
+    def on_cancel(self) -> typing.Callable[[], typing.Any] | None:
+        return self.__on_cancel
+
+    @on_cancel.setter
+    def on_cancel(self, value: typing.Callable[[], typing.Any] | None):
+        self.__on_cancel = value
+
+
+class RequestExecutor(metaclass=ABCMeta):
+    _responses: queue.Queue[tuple[Job, Result]]
+    _wakeup: tuple[int, int]
+    _stream: bool
+    _duplicates: DuplicatePolicy
+    _inflight: dict[str, Job]
+    _lock: threading.Lock
+
+    def __init__(self, settings: ExecutorSettings):
+        self._responses = queue.Queue()
+        self._stream = settings.stream
+        self._duplicates = settings.duplicates
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        # readable whenever results are waiting, so callers can select() on the executor
+        self._wakeup = os.pipe()
+        for fd in self._wakeup:
+            os.set_blocking(fd, False)
+
+    def dispatch(self, request: Request, id: str, timeout: float | None = None, stream: bool | None = None, cache: bool = True) -> bool:
+        """
+        Queue a request for execution. When the executor is saturated,
+        waits up to `timeout` seconds (or not at all if `timeout` is None)
+        before raising ExecutorBusy. `stream` overrides the configured
+        streaming mode for this request; without `cache`, the response
+        cache neither answers nor stores it.
+
+        If an execution with the same id is still in flight, it is either
+        cancelled or, for an identical request under the coalesce policy,
+        left to deliver its results in place of a new one. Returns whether
+        a new execution was started.
+        """
+        stream = self._stream if stream is None else stream
+        with self._lock:
+            current = self._inflight.get(id)
+        if (
+            current is not None
+            and self._duplicates == DuplicatePolicy.coalesce
+            and current.stream == stream
+            and current.cache == cache
+            and same_request(current.request, request)
+        ):
+            return False
+
+        job = Job(request.copy(), id, stream, cache)
+        # registered first, since a fast result may be published before _submit returns
+        with self._lock:
+            previous = self._inflight.get(id)
+            self._inflight[id] = job
+        try:
+            self._submit(job, timeout)
+        except ExecutorBusy:
+            with self._lock:
+                if self._inflight.get(id) is job:
+                    if previous is None:
+                        del self._inflight[id]
+                    else:
+                        self._inflight[id] = previous
+            raise
+        if previous is not None:
+            previous.cancel()
+        return True
+
+    def cancel(self, id: str) -> bool:
+        """
+        Cancel the execution in flight under `id`, if any.
+        """
+        with self._lock:
+            job = self._inflight.pop(id, None)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def in_flight(self, id: str) -> bool:
+        with self._lock:
+            return id in self._inflight
+
+    @abstractmethod
+    def _submit(self, job: Job, timeout: float | None):
+        """
+        Hand a job to the engine, raising ExecutorBusy as described for
+        dispatch.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def shutdown(self, wait: bool = False):
+        raise NotImplementedError()
+
+    def fileno(self) -> int:
+        return self._wakeup[0]
+
+    def _publish(self, job: Job, result: Result):
+        if job.cancelled:
+            return
+        if not isinstance(result, (StreamStart, StreamChunk)):
+            with self._lock:
+                if self._inflight.get(job.id) is job:
+                    del self._inflight[job.id]
+
+        self._responses.put((job, result))
+        try:
+            os.write(self._wakeup[1], b"\0")
+        except BlockingIOError:
+            # the pipe is full, so a wakeup is already pending
+            pass
+
+    def _close_wakeup(self):
+        for fd in self._wakeup:
+            os.close(fd)
+
+    def collect(self) -> typing.Generator[tuple[str, Result], None, None]:
+        # drain wakeups before the queue so a result published meanwhile still wakes us
+        try:
+            while os.read(self._wakeup[0], 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                job, result = self._responses.get_nowait()
+            except queue.Empty:
+                return
+            # results of a superseded execution may still have been queued
+            if not job.cancelled:
+                yield job.id, result
@@ -0,0 +1,303 @@
+"""
+A private HTTP cache (RFC 9111) shared by the workers of an executor.
+"""
+import collections
+import email.utils
+import enum
+import itertools
+import threading
+import time
+
+import httpx
+
+from entities.request import Request
+from entities.response import Response
+from entities.settings import CacheSettings
+from storage.responses import ResponseStore
+
+
+class CacheStatus(enum.StrEnum):
+    hit = "hit"
+    miss = "miss"
+    revalidated = "revalidated"
+
+
+# key of the CacheStatus in httpx.Response.extensions
+EXTENSION = "cache_status"
+
+def cache_status(response: httpx.Response) -> CacheStatus | None:
+    return response.extensions.get(EXTENSION)
+
+
+CACHEABLE_METHODS = {"GET", "HEAD"}
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# statuses that may be stored, and given a heuristic lifetime from Last-Modified
+CACHEABLE_STATUSES = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+
+# bodies are stored decoded, so these no longer describe them
+STRIPPED_HEADERS = {"content-encoding", "transfer-encoding"}
+
+
+def parse_cache_control(value: str) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def parse_date(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def delta_seconds(value: str | None) -> int | None:
+    try:
+        return max(int(value), 0)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(status: int, headers: httpx.Headers) -> float:
+    """
+    Seconds a response stays fresh: max-age, else Expires relative to Date,
+    else a tenth of the time since Last-Modified.
+    """
+    max_age = delta_seconds(parse_cache_control(headers.get("cache-control", "")).get("max-age"))
+    if max_age is not None:
+        return max_age
+
+    date = parse_date(headers.get("date")) or time.time()
+    if "expires" in headers:
+        # an invalid Expires means the response is already stale
+        expires = parse_date(headers["expires"])
+        return max(expires - date, 0.0) if expires is not None else 0.0
+
+    last_modified = parse_date(headers.get("last-modified"))
+    if last_modified is not None and status in CACHEABLE_STATUSES:
+        return max(date - last_modified, 0.0) / 10
+    return 0.0
+
+
+class CacheEntry:
+    key: str  # in the response store
+    vary: dict[str, str | None]  # request headers named by Vary and their values
+    stored: float  # time.monotonic() when received or last revalidated
+    age: float  # Age of the response when it was received
+    lifetime: float
+    no_cache: bool  # must be revalidated before every use
+
+    def __init__(self, key: str, vary: dict[str, str | None]):
+        self.key = key
+        self.vary = vary
+        self.stored = 0.0
+        self.age = 0.0
+        self.lifetime = 0.0
+        self.no_cache = False
+
+    def refresh(self, status: int, headers: httpx.Headers):
+        self.stored = time.monotonic()
+        self.age = float(delta_seconds(headers.get("age")) or 0)
+        self.lifetime = freshness_lifetime(status, headers)
+        self.no_cache = "no-cache" in parse_cache_control(headers.get("cache-control", ""))
+
+    def fresh(self) -> bool:
+        return not self.no_cache and self.age + time.monotonic() - self.stored < self.lifetime
+
+
+class Lookup:
+    """
+    Outcome of ResponseCache.lookup: a fresh `response` to use as is, or the
+    `headers` to send, including validators of a stale `entry`.
+    """
+    cacheable: bool
+    entry: CacheEntry | None
+    response: httpx.Response | None
+    headers: dict[str, str]
+
+    def __init__(self, cacheable: bool, headers: dict[str, str], entry: CacheEntry | None = None, response: httpx.Response | None = None):
+        self.cacheable = cacheable
+        self.headers = headers
+        self.entry = entry
+        self.response = response
+
+
+class ResponseCache:
+    """
+    Responses keyed on method and URL, with a variant per combination of
+    the request header values named in Vary. Bodies are kept in a
+    ResponseStore; the least recently used entries beyond `max_entries`
+    are dropped. Safe to use from several worker threads.
+    """
+    __store: ResponseStore
+    __entries: collections.OrderedDict[tuple[str, str], list[CacheEntry]]
+    __count: int
+    __max_entries: int
+    __keys: itertools.count
+    __lock: threading.Lock
+
+    def __init__(self, settings: CacheSettings | None = None):
+        settings = settings or CacheSettings()
+        self.__store = ResponseStore(settings.store)
+        self.__entries = collections.OrderedDict()
+        self.__count = 0
+        self.__max_entries = max(settings.max_entries, 1)
+        self.__keys = itertools.count()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def lookup(self, request: Request) -> Lookup:
+        headers = {name.lower(): value for name, value in request.headers.items()}
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        conditional = "if-none-match" in headers or "if-modified-since" in headers
+        if request.method not in CACHEABLE_METHODS or "no-store" in directives or conditional:
+            # conditional requests of the user's own get the server's answer untouched
+            return Lookup(False, request.headers)
+
+        with self.__lock:
+            entry = self.__find(request, headers)
+            if entry is None:
+                return Lookup(True, request.headers)
+
+            stored = self.__store.get(entry.key)
+            if stored is None:
+                # the store dropped its body to stay within max_spilled
+                variants = self.__entries[request.method, request.url]
+                variants.remove(entry)
+                if not variants:
+                    del self.__entries[request.method, request.url]
+                self.__count -= 1
+                return Lookup(True, request.headers)
+
+            no_cache = "no-cache" in directives or directives.get("max-age") == "0" or headers.get("pragma") == "no-cache"
+            if entry.fresh() and not no_cache:
+                origin = httpx.Request(request.method, request.url, headers=request.headers)
+                return Lookup(True, request.headers, entry, self.__response(stored, CacheStatus.hit, origin))
+
+            validators = dict(request.headers)
+            if "etag" in stored.headers:
+                validators["If-None-Match"] = stored.headers["etag"]
+            if "last-modified" in stored.headers:
+                validators["If-Modified-Since"] = stored.headers["last-modified"]
+            return Lookup(True, validators, entry)
+
+    def storable(self, lookup: Lookup, response: httpx.Response) -> bool:
+        if not lookup.cacheable or response.status_code not in CACHEABLE_STATUSES:
+            return False
+        if "no-store" in parse_cache_control(response.headers.get("cache-control", "")):
+            return False
+        if response.headers.get("vary", "").strip() == "*":
+            return False
+        # without a lifetime or validators the entry could never be used
+        return (
+            freshness_lifetime(response.status_code, response.headers) > 0
+            or "etag" in response.headers
+            or "last-modified" in response.headers
+        )
+
+    def complete(self, request: Request, lookup: Lookup, response: httpx.Response, body: bytes) -> httpx.Response:
+        """
+        Update the cache with the response to a request made after `lookup`,
+        and return the response to deliver in its place. `body` is the
+        decoded body of `response`.
+        """
+        if response.status_code == 304 and lookup.entry is not None:
+            return self.__revalidate(request, lookup.entry, response)
+
+        if self.storable(lookup, response):
+            self.__put(request, response, body)
+        elif request.method in UNSAFE_METHODS and response.status_code < 400:
+            self.invalidate(request.url)
+
+        if lookup.cacheable:
+            response.extensions[EXTENSION] = CacheStatus.miss
+        return response
+
+    def invalidate(self, url: str):
+        with self.__lock:
+            for method in CACHEABLE_METHODS:
+                for entry in self.__entries.pop((method, url), []):
+                    self.__drop(entry)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__store.clear()
+            self.__count = 0
+
+    def __find(self, request: Request, headers: dict[str, str]) -> CacheEntry | None:
+        variants = self.__entries.get((request.method, request.url))
+        if not variants:
+            return None
+        self.__entries.move_to_end((request.method, request.url))
+        for entry in variants:
+            if all(headers.get(name) == value for name, value in entry.vary.items()):
+                return entry
+        return None
+
+    def __put(self, request: Request, response: httpx.Response, body: bytes):
+        headers = {name.lower(): value for name, value in request.headers.items()}
+        vary = {
+            name.strip().lower(): None
+            for name in response.headers.get("vary", "").split(",")
+            if name.strip()
+        }
+        entry = CacheEntry(f"cache:{next(self.__keys)}", {name: headers.get(name) for name in vary})
+        entry.refresh(response.status_code, response.headers)
+        stored = Response(
+            status=response.status_code,
+            headers={name: value for name, value in response.headers.items() if name not in STRIPPED_HEADERS},
+            data=body,
+        )
+
+        with self.__lock:
+            self.__store[entry.key] = stored
+            variants = self.__entries.setdefault((request.method, request.url), [])
+            self.__entries.move_to_end((request.method, request.url))
+            for existing in [variant for variant in variants if variant.vary == entry.vary]:
+                variants.remove(existing)
+                self.__drop(existing)
+            variants.append(entry)
+            self.__count += 1
+
+            while self.__count > self.__max_entries:
+                _, oldest = self.__entries.popitem(last=False)
+                for variant in oldest:
+                    self.__drop(variant)
+
+    def __revalidate(self, request: Request, entry: CacheEntry, response: httpx.Response) -> httpx.Response:
+        with self.__lock:
+            stored = self.__store.get(entry.key)
+            if stored is None:
+                # evicted while the request was in flight
+                return response
+
+            headers = httpx.Headers(stored.headers)
+            for name, value in response.headers.items():
+                if name not in STRIPPED_HEADERS and name != "content-length":
+                    headers[name] = value
+            stored.headers = dict(headers.items())
+            entry.refresh(stored.status, headers)
+            return self.__response(stored, CacheStatus.revalidated, response.request)
+
+    def __drop(self, entry: CacheEntry):
+        if entry.key in self.__store:
+            del self.__store[entry.key]
+        self.__count -= 1
+
+    @staticmethod
+    def __response(stored: Response, status: CacheStatus, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            stored.status,
+            headers=stored.headers,
+            content=bytes(stored.data),
+            request=request,
+            extensions={EXTENSION: status},
+        )
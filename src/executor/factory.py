@@ -0,0 +1,14 @@
+from entities.settings import Engine, ExecutorSettings
+from .asynchronous import AsyncExecutor
+from .base import RequestExecutor
+from .threaded import ThreadExecutor
+
+
+def create_executor(settings: ExecutorSettings) -> RequestExecutor:
+    match settings.engine:
+        case Engine.thread:
+            return ThreadExecutor(settings)
+        case Engine.asyncio:
+            return AsyncExecutor(settings)
+
+    raise ValueError("unknown executor engine '%s'" % settings.engine)
@@ -0,0 +1,101 @@
+import importlib.util
+import logging
+import threading
+
+import httpx
+
+from entities.settings import PoolSettings
+
+
+type Origin = tuple[str, str, int]
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def origin_of(url: str | httpx.URL) -> Origin:
+    url = httpx.URL(url)
+    scheme = url.scheme.lower()
+    port = url.port or DEFAULT_PORTS.get(scheme, 0)
+    return scheme, url.host.lower(), port
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def client_options(settings: PoolSettings) -> dict:
+    http2 = settings.http2
+    if http2 and not http2_available():
+        logging.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        "http2": http2,
+    }
+
+
+class ClientPool:
+    """
+    Long-lived clients keyed by origin, so that repeated requests to the
+    same host reuse kept-alive connections instead of reconnecting.
+    Safe to share between worker threads.
+    """
+    _settings: PoolSettings
+    _clients: dict[Origin, httpx.Client]
+    _lock: threading.Lock
+
+    def __init__(self, settings: PoolSettings | None = None):
+        self._settings = settings or PoolSettings()
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str | httpx.URL) -> httpx.Client:
+        origin = origin_of(url)
+        client = self._clients.get(origin)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(origin)
+                if client is None:
+                    client = httpx.Client(**client_options(self._settings))
+                    self._clients[origin] = client
+        return client
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+class AsyncClientPool:
+    """
+    Asynchronous counterpart to ClientPool. Must only be used from the
+    event loop that owns it.
+    """
+    _settings: PoolSettings
+    _clients: dict[Origin, httpx.AsyncClient]
+
+    def __init__(self, settings: PoolSettings | None = None):
+        self._settings = settings or PoolSettings()
+        self._clients = {}
+
+    def get(self, url: str | httpx.URL) -> httpx.AsyncClient:
+        origin = origin_of(url)
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(**client_options(self._settings))
+            self._clients[origin] = client
+        return client
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
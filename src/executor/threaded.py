@@ -0,0 +1,156 @@
+import threading
+import queue
+import typing
+
+import httpx
+
+from entities.settings import ExecutorSettings
+from .base import ExecutorBusy, Job, RequestExecutor, Result, StreamChunk, StreamStart, content_length
+from .cache import STRIPPED_HEADERS, Lookup, ResponseCache
+from .timing import EXTENSION as TIMING, TimingTrace
+from .pool import ClientPool
+
+
+class RequestThread(threading.Thread):
+    _jobs: queue.Queue[Job | None]
+    _target: typing.Callable[[Job, Result], None]
+    _clients: ClientPool
+    _chunk_size: int
+    _cache: ResponseCache | None
+
+    def __init__(self, jobs: queue.Queue[Job | None], target: typing.Callable[[Job, Result], None], clients: ClientPool, chunk_size: int, cache: ResponseCache | None = None):
+        super().__init__(daemon=True)
+        self._jobs = jobs
+        self._target = target
+        self._clients = clients
+        self._chunk_size = chunk_size
+        self._cache = cache
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                # shutdown sentinel
+                return
+            if job.cancelled:
+                continue
+
+            try:
+                lookup = self._cache.lookup(job.request) if self._cache is not None and job.cache else None
+                if lookup is not None and lookup.response is not None:
+                    self._target(job, lookup.response)
+                elif job.stream:
+                    self._stream(job, lookup)
+                else:
+                    self._fetch(job, lookup)
+            except Exception as err:
+                self._target(job, err)
+
+    # A cancelled job is noticed when its response head arrives and between
+    # chunks; leaving the stream early then closes the connection.
+
+    def _fetch(self, job: Job, lookup: Lookup | None):
+        request = job.request
+        client = self._clients.get(request.url)
+        headers = request.headers if lookup is None else lookup.headers
+        trace = TimingTrace()
+        with client.stream(method=request.method, url=request.url, headers=headers, extensions=trace.extensions) as response:
+            if job.cancelled:
+                return
+            body = bytearray()
+            for chunk in response.iter_bytes(self._chunk_size):
+                if job.cancelled:
+                    return
+                body += chunk
+        # the body is already decoded, so it must not be described as encoded
+        response = httpx.Response(
+            response.status_code,
+            headers=[(name, value) for name, value in response.headers.multi_items() if name not in STRIPPED_HEADERS and name != "content-length"],
+            content=bytes(body),
+            request=response.request,
+            extensions=response.extensions,
+        )
+        timing = trace.finish()
+        if lookup is not None and self._cache is not None:
+            response = self._cache.complete(request, lookup, response, response.content)
+        response.extensions[TIMING] = timing
+        self._target(job, response)
+
+    def _stream(self, job: Job, lookup: Lookup | None):
+        # lookup is only given when the job uses the cache
+        request = job.request
+        client = self._clients.get(request.url)
+        headers = request.headers if lookup is None else lookup.headers
+        trace = TimingTrace()
+        with client.stream(method=request.method, url=request.url, headers=headers, extensions=trace.extensions) as response:
+            if job.cancelled:
+                return
+            if lookup is not None and self._cache is not None and lookup.entry is not None and response.status_code == 304:
+                # not modified: deliver the stored response whole
+                timing = trace.finish()
+                response = self._cache.complete(request, lookup, response, b"")
+                response.extensions[TIMING] = timing
+                self._target(job, response)
+                return
+
+            # keep a copy of the body only when the cache will store it
+            body = bytearray() if lookup is not None and self._cache is not None and self._cache.storable(lookup, response) else None
+            total = content_length(response)
+            self._target(job, StreamStart(response.status_code, dict(response.headers), total))
+            for chunk in response.iter_bytes(self._chunk_size):
+                if job.cancelled:
+                    return
+                if body is not None:
+                    body += chunk
+                self._target(job, StreamChunk(chunk, response.num_bytes_downloaded, total))
+        timing = trace.finish()
+        if lookup is not None and self._cache is not None:
+            response = self._cache.complete(request, lookup, response, bytes(body or b""))
+        response.extensions[TIMING] = timing
+        self._target(job, response)
+
+
+class ThreadExecutor(RequestExecutor):
+    _jobs: queue.Queue[Job | None]
+    _workers: list[RequestThread]
+    _clients: ClientPool
+    _cache: ResponseCache | None
+
+    def __init__(self, settings: ExecutorSettings | None = None):
+        settings = settings or ExecutorSettings()
+        super().__init__(settings)
+        if settings.workers < 1:
+            raise ValueError("executor requires at least one worker")
+
+        self._jobs = queue.Queue(maxsize=max(settings.queue_size, 0))
+        self._clients = ClientPool(settings.pool)
+        self._cache = ResponseCache(settings.cache) if settings.cache.enabled else None
+        self._workers = [
+            RequestThread(self._jobs, self._publish, self._clients, settings.chunk_size, self._cache)
+            for _ in range(settings.workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _submit(self, job: Job, timeout: float | None):
+        try:
+            self._jobs.put(job, block=timeout is not None, timeout=timeout)
+        except queue.Full:
+            raise ExecutorBusy("too many pending requests")
+
+    def shutdown(self, wait: bool = False):
+        # drop queued work so the sentinels are not stuck behind it
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                break
+
+        for _ in self._workers:
+            self._jobs.put(None)
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+            self._clients.close()
+            self._close_wakeup()
@@ -0,0 +1,71 @@
+import time
+import typing
+
+import httpx
+
+from entities.response import ResponseTiming
+
+
+# key of the ResponseTiming in httpx.Response.extensions
+EXTENSION = "timing"
+
+
+def response_timing(response: httpx.Response) -> ResponseTiming | None:
+    return response.extensions.get(EXTENSION)
+
+
+class TimingTrace:
+    """
+    Timestamps the httpcore trace events of one request, passed in as its
+    "trace" extension, and turns them into a ResponseTiming once the body
+    has been read.
+    """
+    __begin: float
+    __marks: dict[str, float]
+
+    def __init__(self):
+        self.__begin = time.perf_counter()
+        self.__marks = {}
+
+    def trace(self, name: str, info: dict[str, typing.Any]):
+        # "connection.connect_tcp.started", "http11.send_request_headers.complete", ...
+        self.__marks[name.partition(".")[2]] = time.perf_counter()
+
+    async def atrace(self, name: str, info: dict[str, typing.Any]):
+        self.trace(name, info)
+
+    @property
+    def extensions(self) -> dict[str, typing.Any]:
+        return {"trace": self.trace}
+
+    @property
+    def async_extensions(self) -> dict[str, typing.Any]:
+        return {"trace": self.atrace}
+
+    def __span(self, start: str, end: str) -> float:
+        if start in self.__marks and end in self.__marks:
+            return max(self.__marks[end] - self.__marks[start], 0.0)
+        return 0.0
+
+    def finish(self) -> ResponseTiming:
+        """
+        Call once the body has been read.
+        """
+        end = time.perf_counter()
+        marks = self.__marks
+        connect = self.__span("connect_tcp.started", "connect_tcp.complete") + self.__span("connect_unix_socket.started", "connect_unix_socket.complete")
+        first = min(
+            (marks[name] for name in ("connect_tcp.started", "connect_unix_socket.started", "send_request_headers.started") if name in marks),
+            default=end,
+        )
+        head = marks.get("receive_response_headers.complete", end)
+        return ResponseTiming(
+            queued=first - self.__begin,
+            connect=connect,
+            tls=self.__span("start_tls.started", "start_tls.complete"),
+            send=self.__span("send_request_headers.started", "send_request_body.complete"),
+            wait=self.__span("send_request_body.complete", "receive_response_headers.complete"),
+            download=end - head,
+            total=end - self.__begin,
+            reused="connect_tcp.started" not in marks and "connect_unix_socket.started" not in marks,
+        )
@@ -0,0 +1,211 @@
+"""
+In-memory stand-in for curses windows, so controls can be rendered, tested
+and benchmarked without a terminal. Only the part of the window API the
+controls use is implemented, with the same bounds errors as curses.
+"""
+import collections
+import contextlib
+import curses
+import typing
+
+
+class FakeWindow:
+    """
+    A window over a character grid. Windows made with derwin() share the
+    grid of the window they were derived from, as in curses. Attributes are
+    accepted and ignored.
+    """
+    __screen: list[list[str]]
+    __origin: tuple[int, int]  # top left corner on the screen
+    __size: tuple[int, int]
+    __cursor: tuple[int, int]
+    __keys: collections.deque[int]
+    __scrollok: bool
+
+    refreshes: int
+    noutrefreshes: int
+
+    def __init__(self, rows: int, columns: int, screen: list[list[str]] | None = None, origin: tuple[int, int] = (0, 0)):
+        self.__screen = screen if screen is not None else [[" "] * columns for _ in range(rows)]
+        self.__origin = origin
+        self.__size = rows, columns
+        self.__cursor = 0, 0
+        self.__keys = collections.deque()
+        self.__scrollok = False
+        self.refreshes = 0
+        self.noutrefreshes = 0
+
+    def derwin(self, rows: int, columns: int, y: int, x: int) -> "FakeWindow":
+        if y < 0 or x < 0 or y + rows > self.__size[0] or x + columns > self.__size[1]:
+            raise curses.error("derwin() returned NULL")
+        return FakeWindow(rows, columns, self.__screen, (self.__origin[0] + y, self.__origin[1] + x))
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return self.__size
+
+    def getbegyx(self) -> tuple[int, int]:
+        return self.__origin
+
+    def getyx(self) -> tuple[int, int]:
+        return self.__cursor
+
+    def move(self, y: int, x: int):
+        if not (0 <= y < self.__size[0] and 0 <= x < self.__size[1]):
+            raise curses.error("wmove() returned ERR")
+        self.__cursor = y, x
+
+    @typing.overload
+    def addstr(self, text: str, attr: int = 0, /): ...
+    @typing.overload
+    def addstr(self, y: int, x: int, text: str, attr: int = 0, /): ...
+
+    def addstr(self, *args: typing.Any):
+        match args:
+            case (int(y), int(x), str(text), *_):
+                self.move(y, x)
+            case (str(text), *_):
+                pass
+            case _:
+                raise TypeError(f"addstr() got unexpected arguments {args!r}")
+        self.__write(text)
+
+    @typing.overload
+    def addnstr(self, text: str, n: int, attr: int = 0, /): ...
+    @typing.overload
+    def addnstr(self, y: int, x: int, text: str, n: int, attr: int = 0, /): ...
+
+    def addnstr(self, *args: typing.Any):
+        match args:
+            case (int(y), int(x), str(text), int(n), *_):
+                self.move(y, x)
+            case (str(text), int(n), *_):
+                pass
+            case _:
+                raise TypeError(f"addnstr() got unexpected arguments {args!r}")
+        self.__write(text if n < 0 else text[:n])
+
+    @typing.overload
+    def addch(self, ch: str | int, attr: int = 0, /): ...
+    @typing.overload
+    def addch(self, y: int, x: int, ch: str | int, attr: int = 0, /): ...
+
+    def addch(self, *args: typing.Any):
+        match args:
+            case (int(y), int(x), str() | int() as ch, *_):
+                self.move(y, x)
+            case (str() | int() as ch, *_):
+                pass
+            case _:
+                raise TypeError(f"addch() got unexpected arguments {args!r}")
+        self.__write(chr(ch & 0xFF) if isinstance(ch, int) else ch)
+
+    def __write(self, text: str):
+        rows, columns = self.__size
+        top, left = self.__origin
+        y, x = self.__cursor
+        for ch in text:
+            if ch == "\n":
+                # clears the rest of the line, like curses
+                self.__screen[top + y][left + x:left + columns] = [" "] * (columns - x)
+                y, x = y + 1, 0
+            else:
+                self.__screen[top + y][left + x] = ch
+                x += 1
+                if x == columns:
+                    y, x = y + 1, 0
+            if y == rows:
+                # written past the bottom right corner
+                self.__cursor = rows - 1, columns - 1
+                raise curses.error("addwstr() returned ERR")
+        self.__cursor = y, x
+
+    def erase(self):
+        top, left = self.__origin
+        rows, columns = self.__size
+        for y in range(top, top + rows):
+            self.__screen[y][left:left + columns] = [" "] * columns
+        self.__cursor = 0, 0
+
+    clear = erase
+
+    def border(self, *_):
+        rows, columns = self.__size
+        top, left = self.__origin
+        for x in range(columns):
+            self.__screen[top][left + x] = self.__screen[top + rows - 1][left + x] = "-"
+        for y in range(rows):
+            self.__screen[top + y][left] = self.__screen[top + y][left + columns - 1] = "|"
+        for y, x in ((0, 0), (0, columns - 1), (rows - 1, 0), (rows - 1, columns - 1)):
+            self.__screen[top + y][left + x] = "+"
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def noutrefresh(self):
+        self.noutrefreshes += 1
+
+    def bkgd(self, *_):
+        pass
+
+    def attron(self, _):
+        pass
+
+    def attroff(self, _):
+        pass
+
+    def scrollok(self, flag: bool):
+        self.__scrollok = flag
+
+    def scroll(self, lines: int = 1):
+        if not self.__scrollok:
+            raise curses.error("scroll() returned ERR")
+        top, left = self.__origin
+        rows, columns = self.__size
+        region = [self.__screen[top + y][left:left + columns] for y in range(rows)]
+        blank = [[" "] * columns for _ in range(min(abs(lines), rows))]
+        region = region[lines:] + blank if lines >= 0 else blank + region[:lines]
+        for y in range(rows):
+            self.__screen[top + y][left:left + columns] = region[y]
+
+    def nodelay(self, _):
+        pass
+
+    def keypad(self, _):
+        pass
+
+    def push_keys(self, *keys: int | str):
+        self.__keys.extend(ord(key) if isinstance(key, str) else key for key in keys)
+
+    def getch(self) -> int:
+        return self.__keys.popleft() if self.__keys else -1
+
+    def row(self, y: int) -> str:
+        top, left = self.__origin
+        return "".join(self.__screen[top + y][left:left + self.__size[1]])
+
+    def lines(self) -> list[str]:
+        return [self.row(y) for y in range(self.__size[0])]
+
+
+@contextlib.contextmanager
+def install() -> typing.Iterator[None]:
+    """
+    Replace the module level curses functions the controls call, which
+    otherwise refuse to work before initscr().
+    """
+    replacements = {
+        "color_pair": lambda pair: pair << 8,
+        "init_pair": lambda *_: None,
+        "init_color": lambda *_: None,
+        "color_content": lambda _: (0, 0, 0),
+        "curs_set": lambda _: 1,
+        "doupdate": lambda: None,
+    }
+    originals = {name: getattr(curses, name) for name in replacements}
+    for name, replacement in replacements.items():
+        setattr(curses, name, replacement)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(curses, name, original)
@@ -0,0 +1,184 @@
+"""
+Fuzzy search over the requests of every collection, for :find.
+"""
+import bisect
+import collections
+import heapq
+import itertools
+import math
+import typing
+
+
+class Match:
+    collection: str
+    request: str | None  # None for the collection itself
+
+    def __init__(self, collection: str, request: str | None):
+        self.collection = collection
+        self.request = request
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Match) and (self.collection, self.request) == (other.collection, other.request)
+
+    def __repr__(self) -> str:
+        return f"Match({self.collection!r}, {self.request!r})"
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Collections and their requests, indexed by the trigrams of their names.
+    A query matches the requests whose name or collection name contains
+    each of its words, and the collections whose name does; only requests holding every trigram of a word are
+    checked for it. When nothing matches, requests sharing a third of the
+    query's trigrams are returned instead, so typos still find something.
+
+    Typing usually extends the previous query, which can only narrow its
+    matches, so those are filtered rather than searched for again.
+    """
+    __entries: list[tuple[str, str | None] | None]  # collection, request; None once removed
+    __names: list[str]  # lower case request or collection names, by entry
+    __texts: list[str]  # lower case request and collection names, by entry
+    __ids: dict[tuple[str, str | None], int]
+    __sorted: list[tuple[str, int]]  # names and entries, for prefixes
+    __trigrams: collections.defaultdict[str, set[int]]  # of names, with a leading space
+    __collections: collections.defaultdict[str, set[int]]  # entries by collection name
+    __last: tuple[str, list[int]] | None  # previous query and all of its matches
+
+    def __init__(self):
+        self.__entries = []
+        self.__names = []
+        self.__texts = []
+        self.__ids = {}
+        self.__sorted = []
+        self.__trigrams = collections.defaultdict(set)
+        self.__collections = collections.defaultdict(set)
+        self.__last = None
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def add(self, collection: str, request: str | None = None):
+        if self.__insert(collection, request):
+            bisect.insort(self.__sorted, (self.__names[-1], len(self.__names) - 1))
+
+    def extend(self, entries: typing.Iterable[tuple[str, str | None]]):
+        """
+        Add many (collection, request) pairs at once.
+        """
+        for collection, request in entries:
+            if self.__insert(collection, request):
+                self.__sorted.append((self.__names[-1], len(self.__names) - 1))
+        self.__sorted.sort()
+
+    def __insert(self, collection: str, request: str | None) -> bool:
+        if (collection, request) in self.__ids:
+            return False
+        entry_id = len(self.__entries)
+        name = (request if request is not None else collection).lower()
+        self.__entries.append((collection, request))
+        self.__names.append(name)
+        self.__texts.append(f"{name}\n{collection.lower()}")
+        self.__ids[collection, request] = entry_id
+        postings = self.__trigrams
+        for trigram in trigrams(" " + name):
+            postings[trigram].add(entry_id)
+        self.__collections[collection].add(entry_id)
+        self.__last = None
+        return True
+
+    def remove(self, collection: str, request: str | None = None):
+        entry_id = self.__ids.pop((collection, request), None)
+        if entry_id is None:
+            return
+        name = self.__names[entry_id]
+        for trigram in trigrams(" " + name):
+            self.__trigrams[trigram].discard(entry_id)
+        del self.__sorted[bisect.bisect_left(self.__sorted, (name, entry_id))]
+        self.__collections[collection].discard(entry_id)
+        self.__entries[entry_id] = None
+        self.__names[entry_id] = ""
+        self.__texts[entry_id] = ""
+        self.__last = None
+
+    def search(self, query: str, limit: int = 50) -> list[Match]:
+        """
+        The best `limit` matches: entries whose name starts with the first
+        word of the query, alphabetically, then those whose name contains
+        it, then requests matched through their collection.
+        """
+        query = query.lower()
+        terms = query.split()
+        if not terms:
+            return []
+
+        matches = self.__matches(query, terms)
+        best = self.__rank(matches, terms, limit) if matches else self.__similar(terms, limit)
+        return [Match(*self.__entries[entry_id]) for entry_id in best]  # type: ignore[misc]
+
+    def __matches(self, query: str, terms: list[str]) -> list[int]:
+        texts = self.__texts
+        longest = max(terms, key=len)
+        if self.__last is not None and query.startswith(self.__last[0]):
+            candidates: typing.Iterable[int] = self.__last[1]
+        elif len(longest) >= 3:
+            candidates = sorted(self.__in_names(longest).union(self.__in_collections(longest)))
+        else:
+            # too short for a trigram
+            candidates = range(len(texts))
+
+        for term in terms:
+            candidates = [entry_id for entry_id in candidates if term in texts[entry_id]]
+        self.__last = query, candidates  # type: ignore[assignment]
+        return candidates  # type: ignore[return-value]
+
+    def __in_names(self, term: str) -> set[int]:
+        # a name holding every trigram of a word does not necessarily contain it, which is checked later
+        postings = sorted((self.__trigrams.get(trigram, set()) for trigram in trigrams(term)), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def __in_collections(self, term: str) -> set[int]:
+        found: set[int] = set()
+        for collection, entry_ids in self.__collections.items():
+            if term in collection.lower():
+                found |= entry_ids
+        return found
+
+    def __rank(self, matches: list[int], terms: list[str], limit: int) -> list[int]:
+        texts, names = self.__texts, self.__names
+        term = terms[0]
+        best = []
+        index = bisect.bisect_left(self.__sorted, (term,))
+        while index < len(self.__sorted) and len(best) < limit:
+            name, entry_id = self.__sorted[index]
+            if not name.startswith(term):
+                break
+            if all(other in texts[entry_id] for other in terms):
+                best.append(entry_id)
+            index += 1
+
+        if len(best) < limit:
+            contained = (entry_id for entry_id in matches if term in names[entry_id] and not names[entry_id].startswith(term))
+            best += itertools.islice(contained, limit - len(best))
+        if len(best) < limit:
+            through_collection = (entry_id for entry_id in matches if term not in names[entry_id])
+            best += itertools.islice(through_collection, limit - len(best))
+        return best
+
+    def __similar(self, terms: list[str], limit: int) -> list[int]:
+        wanted = set().union(*(trigrams(" " + term) for term in terms))
+        if not wanted:
+            return []
+        shared: collections.Counter[int] = collections.Counter()
+        for trigram in wanted:
+            shared.update(self.__trigrams.get(trigram, ()))
+        threshold = math.ceil(len(wanted) / 3)
+        names = self.__names
+        return heapq.nsmallest(
+            limit,
+            (entry_id for entry_id, count in shared.items() if count >= threshold),
+            key=lambda entry_id: (-shared[entry_id], len(names[entry_id])),
+        )
@@ -0,0 +1,220 @@
+"""
+Batch mode: runs collections without curses and writes one NDJSON line
+per request to stdout.
+"""
+import json
+import multiprocessing
+import os
+import queue
+import selectors
+import sys
+import typing
+
+import httpx
+
+import executor
+from entities.entity import EntityDecoder, EntityEncoder
+from entities.request import Collection, Request
+from entities.settings import ExecutorSettings, Settings
+from runner import CollectionRunner, dependency_groups
+from storage import create_store
+
+
+class HeadlessHost:
+    """
+    Drives an executor for collection runners without a UI, sleeping in
+    select() until results arrive.
+    """
+    __executor: executor.RequestExecutor
+    __handlers: dict[str, typing.Callable[[str, executor.Result], typing.Any]]
+
+    def __init__(self, settings: ExecutorSettings):
+        self.__executor = executor.create_executor(settings)
+        self.__handlers = {}
+
+    def dispatch(self, request: Request, exec_id: str, handler: typing.Callable[[str, executor.Result], typing.Any], stream: bool | None = None, cache: bool = True):
+        self.__executor.dispatch(request, exec_id, stream=stream, cache=cache)
+        self.__handlers[exec_id] = handler
+
+    def cancel(self, exec_id: str):
+        self.__executor.cancel(exec_id)
+        self.__handlers.pop(exec_id, None)
+
+    def run(self, runner: CollectionRunner):
+        selector = selectors.DefaultSelector()
+        selector.register(self.__executor, selectors.EVENT_READ)
+        try:
+            runner.start()
+            while not runner.done:
+                selector.select()
+                for exec_id, result in self.__executor.collect():
+                    handler = self.__handlers.pop(exec_id, None)
+                    if handler is not None:
+                        handler(exec_id, result)
+        finally:
+            selector.close()
+
+    def close(self):
+        self.__executor.shutdown()
+
+
+def result_line(collection: str, request: Request, result: executor.Result, elapsed: float) -> dict[str, typing.Any]:
+    line: dict[str, typing.Any] = {
+        "collection": collection,
+        "request": request.name,
+        "method": request.method.value,
+        "url": request.url,
+        "elapsed": round(elapsed, 6),
+    }
+    if not isinstance(result, httpx.Response):
+        # runs are not streamed, so anything else is an Exception
+        line["error"] = f"{type(result).__name__}: {result}"
+    else:
+        line["status"] = result.status_code
+        line["size"] = len(result.content)
+        if executor.cache_status(result) is not None:
+            line["cache"] = executor.cache_status(result)
+    return line
+
+
+def run_requests(
+    host: HeadlessHost,
+    collection: str,
+    requests: list[Request],
+    concurrency: int,
+    emit: typing.Callable[[dict[str, typing.Any]], typing.Any],
+) -> bool:
+    """
+    Run requests of one collection, emitting a line per request. Returns
+    whether all of them succeeded.
+    """
+    try:
+        runner = CollectionRunner(host, Collection(name=collection, requests=[]), requests, concurrency)
+    except ValueError as err:
+        print(f"{collection}: {err}", file=sys.stderr)
+        return False
+    runner.result = lambda name, result, elapsed: emit(result_line(collection, runner.requests[name], result, elapsed))
+    host.run(runner)
+    for name, reason in runner.skipped.items():
+        emit({"collection": collection, "request": name, "skipped": reason})
+    return not runner.failed and not runner.skipped
+
+
+def work(
+    assignment: list[tuple[str, list[str]]],
+    settings: ExecutorSettings,
+    concurrency: int,
+    lines: multiprocessing.Queue,
+):
+    """
+    Worker process: runs its share of the requests, given as encoded JSON
+    per collection, and sends the output lines back to the parent.
+    """
+    decoder = EntityDecoder(entity_type=Request)
+    host = HeadlessHost(settings)
+    succeeded = True
+    try:
+        for collection, encoded in assignment:
+            # each one encodes a single request
+            requests = [typing.cast(Request, decoder.decode(request)) for request in encoded]
+            succeeded &= run_requests(host, collection, requests, concurrency, lambda line: lines.put(json.dumps(line)))
+    finally:
+        host.close()
+        lines.put(succeeded)
+
+
+def partition(collections: list[tuple[Collection, list[Request]]], processes: int) -> list[list[tuple[str, list[str]]]]:
+    """
+    Spread requests over processes without separating a request from those
+    it depends on: independent groups are assigned largest first, each to
+    the process with the fewest requests so far.
+    """
+    groups = [
+        (collection.name, group)
+        for collection, requests in collections
+        for group in dependency_groups(requests)
+    ]
+    groups.sort(key=lambda group: len(group[1]), reverse=True)
+
+    loads = [0] * processes
+    assignments: list[dict[str, list[str]]] = [{} for _ in range(processes)]
+    for collection, group in groups:
+        target = loads.index(min(loads))
+        loads[target] += len(group)
+        encoded = assignments[target].setdefault(collection, [])
+        encoded += [json.dumps(request, cls=EntityEncoder) for request in group]
+    return [list(assignment.items()) for assignment in assignments if assignment]
+
+
+def run(
+    workspace: str,
+    settings: Settings,
+    collection_names: list[str] | None = None,
+    processes: int = 1,
+    concurrency: int = 10,
+    output: typing.TextIO = sys.stdout,
+) -> int:
+    """
+    Run the named collections of a workspace, or all of them. Exits with 0
+    when every request succeeded, 1 when any failed or was skipped and 2
+    when a collection does not exist.
+    """
+    store = create_store(os.path.expanduser(workspace), settings.workspace)
+    try:
+        collections = {collection.name: collection for collection in store.load()}
+        selected = []
+        for name in collection_names or list(collections):
+            if name not in collections:
+                print(f"unknown collection '{name}'", file=sys.stderr)
+                return 2
+            requests = [store.get_request(collections[name], request) for request in store.request_names(collections[name])]
+            selected.append((collections[name], requests))
+    finally:
+        store.close()
+
+    def emit(line: dict[str, typing.Any]):
+        output.write(json.dumps(line))
+        output.write("\n")
+        output.flush()
+
+    succeeded = True
+    if processes <= 1:
+        host = HeadlessHost(settings.executor)
+        try:
+            for collection, requests in selected:
+                succeeded &= run_requests(host, collection.name, requests, concurrency, emit)
+        finally:
+            host.close()
+        return 0 if succeeded else 1
+
+    # spawn, so workers do not inherit threads or open files from this process
+    context = multiprocessing.get_context("spawn")
+    lines = context.Queue()
+    workers = [
+        context.Process(target=work, args=(assignment, settings.executor, concurrency, lines))
+        for assignment in partition(selected, processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    remaining = len(workers)
+    while remaining:
+        try:
+            line = lines.get(timeout=1)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                # a worker died without reporting back
+                break
+            continue
+        if isinstance(line, bool):
+            succeeded &= line
+            remaining -= 1
+        else:
+            output.write(line)
+            output.write("\n")
+            output.flush()
+
+    for worker in workers:
+        worker.join()
+        succeeded &= worker.exitcode == 0
+    return 0 if succeeded else 1
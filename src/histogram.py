@@ -0,0 +1,92 @@
+import math
+
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integer values, in the manner of
+    HdrHistogram: values below 2**bits are counted exactly, larger ones in
+    buckets whose width doubles with each power of two, so every recorded
+    value is kept to within `significant_figures` decimal digits while
+    memory grows only with the logarithm of the largest value.
+    """
+    __bits: int
+    __half: int
+    __counts: list[int]
+    __total: int
+    __sum: int
+    __min: int | None
+    __max: int
+
+    def __init__(self, significant_figures: int = 3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.__bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self.__half = 1 << (self.__bits - 1)
+        self.__counts = []
+        self.__total = 0
+        self.__sum = 0
+        self.__min = None
+        self.__max = 0
+
+    def record(self, value: int, count: int = 1):
+        if value < 0:
+            raise ValueError("cannot record negative value %d" % value)
+        index = self.__index_of(value)
+        if index >= len(self.__counts):
+            self.__counts.extend([0] * (index + 1 - len(self.__counts)))
+        self.__counts[index] += count
+        self.__total += count
+        self.__sum += value * count
+        if self.__min is None or value < self.__min:
+            self.__min = value
+        if value > self.__max:
+            self.__max = value
+
+    def merge(self, other: "Histogram"):
+        for index, count in enumerate(other.__counts):
+            if count:
+                self.record(other.__highest_equivalent(index), count)
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """
+        The largest value that `percentile` percent of the recorded values
+        are equivalent to or below, or 0 when nothing was recorded.
+        """
+        if self.__total == 0:
+            return 0
+        target = max(1, math.ceil(self.__total * min(percentile, 100.0) / 100))
+        seen = 0
+        for index, count in enumerate(self.__counts):
+            seen += count
+            if seen >= target:
+                return min(self.__highest_equivalent(index), self.__max)
+        return self.__max
+
+    @property
+    def count(self) -> int:
+        return self.__total
+
+    @property
+    def min(self) -> int:
+        return self.__min or 0
+
+    @property
+    def max(self) -> int:
+        return self.__max
+
+    @property
+    def mean(self) -> float:
+        return self.__sum / self.__total if self.__total else 0.0
+
+    def __index_of(self, value: int) -> int:
+        shift = value.bit_length() - self.__bits
+        if shift <= 0:
+            return value
+        return (1 << self.__bits) + (shift - 1) * self.__half + (value >> shift) - self.__half
+
+    def __highest_equivalent(self, index: int) -> int:
+        if index < 1 << self.__bits:
+            return index
+        shift, sub_bucket = divmod(index - (1 << self.__bits), self.__half)
+        shift += 1
+        return ((sub_bucket + self.__half + 1) << shift) - 1
@@ -6,15 +6,34 @@ import signal
 import app
 import colors
 from entities.context import AppContext
-from entities.settings import TerminalColors
+from entities.settings import Settings, StorageBackend, TerminalColors
+import profiling
 
 
 def load_options():
     parser = argparse.ArgumentParser()
     parser.add_argument("--debug", "-d", action="store_true")
+    parser.add_argument("--profile", nargs="?", const="/tmp/httpmagic-profile.json", metavar="FILE", help="time the UI's hot paths and write the results to FILE on exit")
+    parser.add_argument("--workspace", "-w", help="directory the workspace is saved in")
+    parser.add_argument("--storage", choices=[backend.value for backend in StorageBackend], help="workspace storage backend")
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--run", metavar="WORKSPACE", help="run collections of a workspace without the UI, writing NDJSON results to stdout")
+    batch.add_argument("--collection", "-c", action="append", help="collection to run (repeatable; default: all)")
+    batch.add_argument("--processes", "-p", type=int, default=1, help="worker processes to spread requests over")
+    batch.add_argument("--concurrency", type=int, default=10, help="requests in flight per process")
     return parser.parse_args()
 
 
+def load_settings(options: argparse.Namespace) -> Settings:
+    settings = Settings()
+    if options.storage:
+        # the default WorkspaceSettings instance is shared by every Settings
+        settings.workspace = settings.workspace.copy()
+        settings.workspace.backend = StorageBackend(options.storage)
+    return settings
+
+
 def begin_debug_mode():
     logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.DEBUG, handlers=[logging.FileHandler("/tmp/pylog")])
     logging.debug("DEBUG MODE STARTED")
@@ -38,7 +57,8 @@ def main(stdscr: curses.window) -> int:
 
     disable_ctrl_c()
 
-    context = AppContext.create()
+    settings = load_settings(options)
+    context = AppContext.create(settings, options.workspace or settings.workspace.directory)
     if colors.initialize():
         configure_colors(context.settings.colors)
     else:
@@ -51,15 +71,35 @@ def main(stdscr: curses.window) -> int:
 
     curses.set_escdelay(25)
 
-    instance = app.App(stdscr, context)
-    return instance.run()
+    profiler = None
+    if options.profile:
+        profiler = profiling.Profiler()
+        profiling.instrument_app(profiler)
+
+    instance = app.App(stdscr, context, profiler)
+    try:
+        return instance.run()
+    finally:
+        if profiler is not None:
+            profiler.dump(options.profile)
 
 
 if __name__ == '__main__':
     import sys
     exit_code = 0
     try:
-        exit_code = curses.wrapper(main)
+        options = load_options()
+        if options.run:
+            import headless
+            exit_code = headless.run(
+                options.run,
+                load_settings(options),
+                options.collection,
+                processes=options.processes,
+                concurrency=options.concurrency,
+            )
+        else:
+            exit_code = curses.wrapper(main)
     except KeyboardInterrupt:
         pass
     except:
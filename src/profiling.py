@@ -0,0 +1,166 @@
+"""
+Timing of the UI's hot paths for --profile. Durations are recorded in
+nanoseconds into a histogram per measured thing; :stats shows them and
+they are written out as JSON on exit.
+"""
+import functools
+import json
+import time
+import typing
+
+import controls
+from entities.entity import Entity
+import executor
+from histogram import Histogram
+
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+type Key = str | typing.Callable[[typing.Any], str]
+
+
+class Profiler:
+    """
+    Methods are instrumented by replacing them on their class, so nothing
+    is paid for profiling unless it was turned on.
+    """
+    __histograms: dict[str, Histogram]
+    __patches: list[tuple[type, str, typing.Any]]
+    __begin: float
+
+    def __init__(self):
+        self.__histograms = {}
+        self.__patches = []
+        self.__begin = time.perf_counter()
+
+    def record(self, name: str, nanoseconds: int):
+        histogram = self.__histograms.get(name)
+        if histogram is None:
+            histogram = self.__histograms[name] = Histogram()
+        histogram.record(max(nanoseconds, 0))
+
+    def instrument(self, owner: type, method: str, key: Key):
+        """
+        Time every call of `owner.method`, recorded under `key` or under
+        the name `key` returns for the instance called on.
+        """
+        original = owner.__dict__[method]
+        record = self.record
+
+        if isinstance(key, str):
+            @functools.wraps(original)
+            def timed(self, *args, **kwargs):
+                begin = time.perf_counter_ns()
+                try:
+                    return original(self, *args, **kwargs)
+                finally:
+                    record(key, time.perf_counter_ns() - begin)
+        else:
+            @functools.wraps(original)
+            def timed(self, *args, **kwargs):
+                begin = time.perf_counter_ns()
+                try:
+                    return original(self, *args, **kwargs)
+                finally:
+                    record(key(self), time.perf_counter_ns() - begin)
+
+        self.__patch(owner, method, original, timed)
+
+    def instrument_generator(self, owner: type, method: str, key: str):
+        """
+        Like instrument, for a generator method: only the time spent inside
+        the generator counts, not the time its consumer spends between items.
+        """
+        original = owner.__dict__[method]
+        record = self.record
+
+        @functools.wraps(original)
+        def timed(self, *args, **kwargs):
+            spent = 0
+            iterator = original(self, *args, **kwargs)
+            try:
+                while True:
+                    begin = time.perf_counter_ns()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        spent += time.perf_counter_ns() - begin
+                    yield item
+            finally:
+                record(key, spent)
+
+        self.__patch(owner, method, original, timed)
+
+    def __patch(self, owner: type, method: str, original: typing.Any, timed: typing.Any):
+        setattr(owner, method, timed)
+        self.__patches.append((owner, method, original))
+
+    def uninstrument(self):
+        for owner, method, original in reversed(self.__patches):
+            setattr(owner, method, original)
+        self.__patches.clear()
+
+    @property
+    def histograms(self) -> dict[str, Histogram]:
+        return self.__histograms
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Statistics per histogram, in microseconds.
+        """
+        summary = {}
+        for name, histogram in sorted(self.__histograms.items()):
+            stats = {
+                "count": histogram.count,
+                "min": histogram.min / 1e3,
+                "mean": histogram.mean / 1e3,
+                "max": histogram.max / 1e3,
+            }
+            for percentile in PERCENTILES:
+                stats[f"p{percentile:g}"] = histogram.value_at_percentile(percentile) / 1e3
+            summary[name] = stats
+        return summary
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.__begin
+        width = max((len(name) for name in self.__histograms), default=4)
+        lines = [
+            f"profiling for {elapsed:.1f} s, times in us",
+            "",
+            f"{'':<{width}} {'count':>7} {'p50':>8} {'p99':>8} {'max':>8}",
+        ]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<{width}} {stats['count']:>7} {stats['p50']:>8.1f} {stats['p99']:>8.1f} {stats['max']:>8.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+def subclasses(root: type) -> list[type]:
+    pending, found = [root], []
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass not in found:
+                found.append(subclass)
+                pending.append(subclass)
+    return found
+
+
+def instrument_app(profiler: Profiler):
+    """
+    Instrument the paths the UI spends its time on: painting controls,
+    handing requests to and collecting results from the executor, and
+    constructing entities. App records its own frame and keystroke
+    timings.
+    """
+    profiler.instrument(controls.Control, "paint", lambda control: f"paint {type(control).__name__}")
+    profiler.instrument(controls.Compositor, "flush", "compositor flush")
+    profiler.instrument(executor.RequestExecutor, "dispatch", "executor dispatch")
+    profiler.instrument_generator(executor.RequestExecutor, "collect", "executor collect")
+    for entity_type in subclasses(Entity):
+        if "__init__" in entity_type.__dict__:
+            profiler.instrument(entity_type, "__init__", f"new {entity_type.__name__}")
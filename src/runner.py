@@ -0,0 +1,246 @@
+from __future__ import annotations
+import collections
+import itertools
+import time
+import typing
+
+import httpx
+
+import executor
+from entities.request import Collection, Request
+
+
+type ResultHandler = typing.Callable[[str, executor.Result, float], typing.Any]
+
+
+class Host(typing.Protocol):
+    """
+    What a runner needs from whoever drives the executor: App in the UI,
+    headless.HeadlessHost in batch mode.
+    """
+    def dispatch(self, request: Request, exec_id: str, handler: typing.Callable[[str, executor.Result], typing.Any], stream: bool | None = None, cache: bool = True):
+        ...
+
+    def cancel(self, exec_id: str):
+        ...
+
+
+def dependency_groups(requests: list[Request]) -> list[list[Request]]:
+    """
+    Split requests into groups that share no dependencies with each other,
+    so each group can be run on its own. Groups keep the original order.
+    """
+    parent = {request.name: request.name for request in requests}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for request in requests:
+        for dependency in request.depends_on:
+            if dependency in parent:
+                parent[find(dependency)] = find(request.name)
+
+    groups: dict[str, list[Request]] = {}
+    for request in requests:
+        groups.setdefault(find(request.name), []).append(request)
+    return list(groups.values())
+
+
+class CollectionRunner:
+    """
+    Executes every request of a collection, keeping up to `concurrency` of
+    them in flight. A request starts only once all requests named in its
+    depends_on have completed successfully (Kahn's algorithm, advanced as
+    results come in); requests depending on one that failed are skipped,
+    as are requests caught in a dependency cycle. Each result is passed to
+    `result` along with the seconds since its request was dispatched, and
+    `finished` is called once nothing is left to run.
+    """
+    __host: Host
+    __collection: Collection
+    __requests: dict[str, Request]
+    __concurrency: int
+    __prefix: str
+
+    __dependents: dict[str, list[str]]
+    __waiting_on: dict[str, int]  # unfinished dependencies per request
+    __ready: collections.deque[str]
+    __running: dict[str, tuple[str, float]]  # exec id -> request name, dispatch time
+    __begin: float
+    __end: float | None
+    __result: ResultHandler | None
+    __finished: typing.Callable[[], typing.Any] | None
+
+    succeeded: list[str]
+    failed: dict[str, str]  # request name -> reason
+    skipped: dict[str, str]
+
+    __sequence = itertools.count()
+
+    def __init__(self, host: Host, collection: Collection, requests: list[Request], concurrency: int):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.__host = host
+        self.__collection = collection
+        self.__requests = {request.name: request for request in requests}
+        self.__concurrency = concurrency
+        self.__prefix = f"run:{next(CollectionRunner.__sequence)}:"
+
+        self.__dependents = {name: [] for name in self.__requests}
+        self.__waiting_on = {}
+        for request in requests:
+            for dependency in request.depends_on:
+                if dependency not in self.__requests:
+                    raise ValueError("'%s' depends on unknown request '%s'" % (request.name, dependency))
+                self.__dependents[dependency].append(request.name)
+            self.__waiting_on[request.name] = len(request.depends_on)
+
+        self.__ready = collections.deque(name for name, count in self.__waiting_on.items() if count == 0)
+        self.__running = {}
+        self.__begin = 0.0
+        self.__end = None
+        self.__result = None
+        self.__finished = None
+
+        self.succeeded = []
+        self.failed = {}
+        self.skipped = {}
+
+    def start(self):
+        self.__begin = time.perf_counter()
+        self.__fill()
+        self.__check_done()
+
+    def stop(self):
+        if self.__end is not None:
+            return
+        for exec_id in self.__running:
+            self.__host.cancel(exec_id)
+        running = (name for name, _ in self.__running.values())
+        for name in itertools.chain(self.__ready, running):
+            self.skipped.setdefault(name, "run stopped")
+        self.__ready.clear()
+        self.__running.clear()
+        self.__finish()
+
+    @property
+    def done(self) -> bool:
+        return self.__end is not None
+
+    @property
+    def collection(self) -> Collection:
+        return self.__collection
+
+    @property
+    def total(self) -> int:
+        return len(self.__requests)
+
+    @property
+    def requests(self) -> dict[str, Request]:
+        return self.__requests
+
+    @property
+    def result(self) -> ResultHandler | None:
+        return self.__result
+
+    @result.setter
+    def result(self, value: ResultHandler | None):
+        self.__result = value
+
+    @property
+    def finished(self) -> typing.Callable[[], typing.Any] | None:
+        return self.__finished
+
+    @finished.setter
+    def finished(self, value: typing.Callable[[], typing.Any] | None):
+        self.__finished = value
+
+    def __fill(self):
+        while self.__ready and len(self.__running) < self.__concurrency:
+            name = self.__ready[0]
+            exec_id = self.__prefix + name
+            try:
+                self.__host.dispatch(self.__requests[name], exec_id, self.__on_result, stream=False, cache=False)
+            except executor.ExecutorBusy:
+                # a completion will make room
+                return
+            self.__ready.popleft()
+            self.__running[exec_id] = name, time.perf_counter()
+
+    def __on_result(self, exec_id: str, result: executor.Result):
+        running = self.__running.pop(exec_id, None)
+        if running is None:
+            return
+
+        name, dispatched = running
+        if not isinstance(result, httpx.Response):
+            # runs are not streamed, so anything else is an Exception
+            self.failed[name] = f"{type(result).__name__}: {result}"
+        elif result.status_code >= 400:
+            self.failed[name] = f"HTTP {result.status_code}"
+        else:
+            self.succeeded.append(name)
+        if self.__result is not None:
+            self.__result(name, result, time.perf_counter() - dispatched)
+
+        if name in self.failed:
+            self.__skip_dependents(name)
+        else:
+            for dependent in self.__dependents[name]:
+                self.__waiting_on[dependent] -= 1
+                if self.__waiting_on[dependent] == 0 and dependent not in self.skipped:
+                    self.__ready.append(dependent)
+
+        self.__fill()
+        self.__check_done()
+
+    def __skip_dependents(self, name: str):
+        pending = list(self.__dependents[name])
+        while pending:
+            dependent = pending.pop()
+            if dependent not in self.skipped:
+                self.skipped[dependent] = f"depends on failed request '{name}'"
+                pending.extend(self.__dependents[dependent])
+
+    def __check_done(self):
+        if self.__ready or self.__running:
+            return
+        # nothing left can become ready; whatever is still waiting is in a cycle
+        for name, count in self.__waiting_on.items():
+            if count > 0 and name not in self.skipped:
+                self.skipped[name] = "dependency cycle"
+        self.__finish()
+
+    def __finish(self):
+        self.__end = time.perf_counter()
+        if self.__finished is not None:
+            self.__finished()
+
+    def summary(self) -> str:
+        total = len(self.__requests)
+        finished = len(self.succeeded) + len(self.failed)
+        summary = f"{self.__collection.name}: {finished}/{total} run, {len(self.failed)} failed"
+        if self.skipped:
+            summary += f", {len(self.skipped)} skipped"
+        return summary
+
+    def report(self) -> str:
+        elapsed = (self.__end or time.perf_counter()) - self.__begin
+        lines = [
+            f"{len(self.__requests)} requests, concurrency {self.__concurrency}, {elapsed:.3f} s",
+            "",
+            f"succeeded  {len(self.succeeded)}",
+            f"failed     {len(self.failed)}",
+            f"skipped    {len(self.skipped)}",
+        ]
+        if self.failed:
+            lines += ["", "failures"]
+            lines += [f"  {name}: {reason}" for name, reason in self.failed.items()]
+        if self.skipped:
+            lines += ["", "skipped"]
+            lines += [f"  {name}: {reason}" for name, reason in self.skipped.items()]
+        return "\n".join(lines)
@@ -0,0 +1,7 @@
+from .factory import create_store
+from .journal import Journal
+from .responses import ResponseStore
+from .sqlite import SqliteStore
+from .workspace import WorkspaceStore
+
+__all__ = ['Journal', 'ResponseStore', 'SqliteStore', 'WorkspaceStore', 'create_store']
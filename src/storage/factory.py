@@ -0,0 +1,14 @@
+from entities.settings import StorageBackend, WorkspaceSettings
+from .journal import Journal
+from .sqlite import SqliteStore
+from .workspace import WorkspaceStore
+
+
+def create_store(directory: str, settings: WorkspaceSettings) -> WorkspaceStore:
+    match settings.backend:
+        case StorageBackend.journal:
+            return Journal(directory, settings)
+        case StorageBackend.sqlite:
+            return SqliteStore(directory)
+
+    raise ValueError("unknown storage backend '%s'" % settings.backend)
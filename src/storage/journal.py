@@ -0,0 +1,277 @@
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import typing
+
+from entities.entity import EntityDecoder, EntityEncoder, iterload
+from entities.request import Collection, Request
+from entities.settings import WorkspaceSettings
+import util
+from .workspace import WorkspaceStore
+
+
+FILE_PATTERN = re.compile(r"^(snapshot|journal)\.(\d+)\.(json|ndjson)$")
+
+
+type Index = tuple[dict[str, Collection], dict[tuple[str, str], Request]]
+
+
+def index(collections: list[Collection]) -> Index:
+    """
+    Collections by name and requests by collection and request name.
+    """
+    return (
+        {collection.name: collection for collection in collections},
+        {(collection.name, request.name): request for collection in collections for request in collection.requests},
+    )
+
+
+def replay(file: typing.BinaryIO, collections: list[Collection], index: Index) -> tuple[int, int, bool]:
+    """
+    Apply the entries of a journal to `collections`, keeping `index` up to
+    date. Returns the number of entries, the offset just past the last
+    complete one and whether the last one was torn by a crash.
+    """
+    by_name, requests = index
+    collection_decoder = EntityDecoder(entity_type=Collection)
+    request_decoder = EntityDecoder(entity_type=Request)
+    entries = 0
+    complete = 0
+    torn = False
+    for raw in file:
+        try:
+            # raw_decode leaves the entry itself a dict; only its payload becomes entities
+            entry, _ = collection_decoder.raw_decode(raw.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # an entry torn by a crash can only be the last one
+            logging.warning("ignoring incomplete journal entry in %s", file.name)
+            torn = True
+            break
+        complete += len(raw)
+        torn = not raw.endswith(b"\n")
+        entries += 1
+        match entry["op"]:
+            case "create_collection":
+                collection = collection_decoder.finish(entry["collection"])
+                collections.append(collection)
+                by_name[collection.name] = collection
+                for request in collection.requests:
+                    requests[collection.name, request.name] = request
+            case "create_request":
+                collection = by_name.get(entry["collection"])
+                if collection is not None:
+                    request = request_decoder.finish(entry["request"])
+                    collection.requests.append(request)
+                    requests[collection.name, request.name] = request
+            case "update_request":
+                updated = request_decoder.finish(entry["request"])
+                request = requests.get((entry["collection"], updated.name))
+                if request is not None:
+                    for key in Request.__fields__:
+                        setattr(request, key, getattr(updated, key))
+    return entries, complete, torn
+
+
+class Journal(WorkspaceStore):
+    """
+    Workspace persistence as an append-only journal of mutations on top of
+    a snapshot. Every edit appends one line to journal.<generation>.ndjson,
+    so its cost does not depend on the size of the workspace. Once
+    `compact_after` entries have been written, new entries go to the next
+    journal while a background thread replays the files written so far into
+    snapshot.<generation + 1>.json, and removes them afterwards. Loading reads the newest snapshot and replays the
+    journals from its generation on.
+    """
+    __directory: str
+    __compact_after: int
+    __generation: int
+    __entries: int
+    __file: typing.TextIO | None
+    __collections: dict[str, Collection]
+    __requests: dict[tuple[str, str], Request]
+    __names: dict[str, list[str]]  # sorted request names by collection, for paging through them
+    __compaction: threading.Thread | None
+
+    def __init__(self, directory: str, settings: WorkspaceSettings | None = None):
+        self.__directory = directory
+        self.__compact_after = (settings or WorkspaceSettings()).compact_after
+        self.__generation = 0
+        self.__entries = 0
+        self.__file = None
+        self.__collections = {}
+        self.__requests = {}
+        self.__names = {}
+        self.__compaction = None
+
+    def load(self) -> list[Collection]:
+        """
+        Restore the workspace and open the journal for appending.
+        """
+        os.makedirs(self.__directory, exist_ok=True)
+        snapshots, journals = self.__files()
+        generation = max(snapshots, default=0)
+        collections = self.__read_snapshot(generation) if snapshots else []
+        self.__collections, self.__requests = index(collections)
+
+        for journal in journals:
+            if journal < generation:
+                continue
+            self.__entries = self.__replay(journal, collections)
+            generation = journal
+
+        self.__generation = generation
+        self.__file = open(self.__path("journal", generation), "a", encoding="utf-8")
+        if self.__entries >= self.__compact_after:
+            self.__compact()
+        return collections
+
+    def create_collection(self, collection: Collection):
+        self.__collections[collection.name] = collection
+        for request in collection.requests:
+            self.__requests[collection.name, request.name] = request
+        self.__append({"op": "create_collection", "collection": collection})
+
+    def create_request(self, collection: Collection, request: Request):
+        if self.__collections.get(collection.name) is not collection:
+            return
+        self.__requests[collection.name, request.name] = request
+        names = self.__names.get(collection.name)
+        if names is not None:
+            bisect.insort(names, request.name, key=util.name_key)
+        self.__append({"op": "create_request", "collection": collection.name, "request": request})
+
+    def update_request(self, collection: Collection, request: Request):
+        # requests that were never saved, like the scratch request, are not journaled
+        if self.__requests.get((collection.name, request.name)) is not request:
+            return
+        self.__append({"op": "update_request", "collection": collection.name, "request": request})
+
+    def has_request(self, collection: Collection, name: str) -> bool:
+        return (collection.name, name) in self.__requests
+
+    def get_request(self, collection: Collection, name: str) -> Request | None:
+        return self.__requests.get((collection.name, name))
+
+    def request_count(self, collection: Collection) -> int:
+        return len(collection.requests)
+
+    def request_names(self, collection: Collection, offset: int = 0, limit: int | None = None) -> list[str]:
+        names = self.__names.get(collection.name)
+        if names is None or len(names) != len(collection.requests):
+            # requests are only ever added, so a changed count means the names are stale
+            names = self.__names[collection.name] = sorted((request.name for request in collection.requests), key=util.name_key)
+        return names[offset:None if limit is None else offset + limit]
+
+    def close(self):
+        if self.__compaction is not None:
+            self.__compaction.join()
+            self.__compaction = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    @property
+    def generation(self) -> int:
+        return self.__generation
+
+    def __path(self, kind: str, generation: int) -> str:
+        extension = "json" if kind == "snapshot" else "ndjson"
+        return os.path.join(self.__directory, f"{kind}.{generation}.{extension}")
+
+    def __files(self) -> tuple[list[int], list[int]]:
+        """
+        Generations of the snapshots and of the journals on disk, in order.
+        """
+        snapshots: list[int] = []
+        journals: list[int] = []
+        for filename in os.listdir(self.__directory):
+            match = FILE_PATTERN.match(filename)
+            if match:
+                (snapshots if match.group(1) == "snapshot" else journals).append(int(match.group(2)))
+        return sorted(snapshots), sorted(journals)
+
+    def __read_snapshot(self, generation: int) -> list[Collection]:
+        with open(self.__path("snapshot", generation), encoding="utf-8") as file:
+            return list(iterload(file, Collection))
+
+    def __replay(self, generation: int, collections: list[Collection]) -> int:
+        with open(self.__path("journal", generation), "rb") as file:
+            entries, complete, torn = replay(file, collections, (self.__collections, self.__requests))
+
+        if torn:
+            # new entries are appended to this file, so they must start on a line of their own
+            with open(self.__path("journal", generation), "r+b") as file:
+                file.truncate(complete)
+                file.seek(complete)
+                if complete and not self.__ends_with_newline(file, complete):
+                    file.write(b"\n")
+        return entries
+
+    @staticmethod
+    def __ends_with_newline(file: typing.BinaryIO, size: int) -> bool:
+        file.seek(size - 1)
+        ends = file.read(1) == b"\n"
+        file.seek(size)
+        return ends
+
+    def __append(self, entry: dict[str, typing.Any]):
+        if self.__file is None:
+            return
+        self.__file.write(json.dumps(entry, cls=EntityEncoder, separators=(",", ":")))
+        self.__file.write("\n")
+        self.__file.flush()
+        self.__entries += 1
+        if self.__entries >= self.__compact_after:
+            self.__compact()
+
+    def __compact(self):
+        if self.__compaction is not None:
+            if self.__compaction.is_alive():
+                return
+            self.__compaction.join()
+
+        self.__generation += 1
+        self.__entries = 0
+        if self.__file is not None:
+            self.__file.close()
+        self.__file = open(self.__path("journal", self.__generation), "a", encoding="utf-8")
+
+        self.__compaction = threading.Thread(
+            target=self.__write_snapshot,
+            args=(self.__generation,),
+            name="journal-compaction",
+        )
+        self.__compaction.start()
+
+    def __rebuild(self, generation: int) -> list[Collection]:
+        """
+        The workspace as of the start of journal `generation`, read back from
+        the files before it rather than copied from the live workspace.
+        """
+        snapshots, journals = self.__files()
+        base = max((snapshot for snapshot in snapshots if snapshot < generation), default=0)
+        collections = self.__read_snapshot(base) if base in snapshots else []
+        collections_index = index(collections)
+        for journal in journals:
+            if base <= journal < generation:
+                with open(self.__path("journal", journal), "rb") as file:
+                    replay(file, collections, collections_index)
+        return collections
+
+    def __write_snapshot(self, generation: int):
+        collections = self.__rebuild(generation)
+        path = self.__path("snapshot", generation)
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(collections, file, cls=EntityEncoder, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+        for filename in os.listdir(self.__directory):
+            match = FILE_PATTERN.match(filename)
+            if match and int(match.group(2)) < generation:
+                os.remove(os.path.join(self.__directory, filename))
@@ -0,0 +1,127 @@
+import collections
+import mmap
+import sys
+import tempfile
+import typing
+
+from entities.response import Response
+from entities.settings import ResponseStoreSettings
+
+
+# from 3.13 a map need not hold a duplicate of the file descriptor
+MAP_OPTIONS: dict[str, typing.Any] = {"trackfd": False} if sys.version_info >= (3, 13) else {}
+
+
+class ResponseStore:
+    """
+    Responses keyed by request key, holding at most `memory_budget` bytes of
+    bodies in memory. Least recently used bodies, and any body larger than
+    `max_resident_size`, are spilled to a temporary file and memory-mapped,
+    so they are only paged back in when actually read. Beyond `max_spilled`
+    spilled bodies, the least recently used responses are dropped.
+    """
+    __settings: ResponseStoreSettings
+    __entries: collections.OrderedDict[str, Response]
+    __sizes: dict[str, int]  # in-memory body size per key
+    __resident: int
+    __spilled: set[str]
+    __spill_file: typing.BinaryIO | None
+    __spill_end: int  # where the next body goes in __spill_file
+
+    def __init__(self, settings: ResponseStoreSettings | None = None):
+        self.__settings = settings or ResponseStoreSettings()
+        self.__entries = collections.OrderedDict()
+        self.__sizes = {}
+        self.__resident = 0
+        self.__spilled = set()
+        self.__spill_file = None
+        self.__spill_end = 0
+
+    def __getitem__(self, key: str) -> Response:
+        response = self.__entries[key]
+        self.__entries.move_to_end(key)
+        return response
+
+    def __setitem__(self, key: str, response: Response):
+        if key in self.__entries:
+            del self[key]
+
+        self.__entries[key] = response
+        if len(response.data) > self.__settings.max_resident_size:
+            self.__spill(key, response)
+        elif isinstance(response.data, bytes):
+            self.__sizes[key] = len(response.data)
+            self.__resident += len(response.data)
+        self.__evict()
+        self.__drop_spilled()
+
+    def __delitem__(self, key: str):
+        del self.__entries[key]
+        self.__resident -= self.__sizes.pop(key, 0)
+        self.__spilled.discard(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(list(self.__entries))
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: str, default: Response | None = None) -> Response | None:
+        if key in self.__entries:
+            return self[key]
+        return default
+
+    def items(self) -> typing.Iterator[tuple[str, Response]]:
+        return iter(list(self.__entries.items()))
+
+    def clear(self):
+        self.__entries.clear()
+        self.__sizes.clear()
+        self.__resident = 0
+        self.__spilled.clear()
+
+    @property
+    def resident_size(self) -> int:
+        """
+        Bytes of response bodies currently held in memory.
+        """
+        return self.__resident
+
+    def __evict(self):
+        for key, response in self.__entries.items():
+            if self.__resident <= self.__settings.memory_budget:
+                break
+            if self.__sizes.get(key):
+                self.__resident -= self.__sizes.pop(key)
+                self.__spill(key, response)
+
+    def __drop_spilled(self):
+        if len(self.__spilled) <= self.__settings.max_spilled:
+            return
+        for key in [key for key in self.__entries if key in self.__spilled]:
+            del self[key]
+            if len(self.__spilled) <= self.__settings.max_spilled:
+                break
+
+    def __spill(self, key: str, response: Response):
+        if not response.data or isinstance(response.data, mmap.mmap):
+            return
+
+        if self.__spill_file is None or self.__spill_end >= self.__settings.spill_file_size:
+            # a full file is closed and unlinked; the maps of its bodies keep them alive
+            if self.__spill_file is not None:
+                self.__spill_file.close()
+            self.__spill_file = tempfile.TemporaryFile(dir=self.__settings.spill_directory)
+            self.__spill_end = 0
+
+        offset, size = self.__spill_end, len(response.data)
+        self.__spill_file.seek(offset)
+        self.__spill_file.write(response.data)
+        self.__spill_file.flush()
+        response.data = mmap.mmap(self.__spill_file.fileno(), size, offset=offset, access=mmap.ACCESS_READ, **MAP_OPTIONS)
+        # maps must start on an allocation boundary
+        self.__spill_end = -(-(offset + size) // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+        self.__spilled.add(key)
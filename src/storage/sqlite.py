@@ -0,0 +1,158 @@
+import collections
+import json
+import os
+import sqlite3
+import typing
+
+from entities.entity import EntityDecoder, EntityEncoder
+from entities.request import Collection, Request
+from .workspace import WorkspaceStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    collection INTEGER NOT NULL REFERENCES collections (id),
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (collection, name)
+);
+CREATE INDEX IF NOT EXISTS requests_by_name ON requests (collection, name COLLATE NOCASE);
+"""
+
+
+class SqliteStore(WorkspaceStore):
+    """
+    Workspace stored in an SQLite database, for workspaces too large to
+    keep in memory. Only collections are loaded up front; requests stay in
+    the database until get_request asks for one, and listing, counting and
+    duplicate checks are answered from indexes. Each request is stored as
+    its EntityEncoder JSON next to the indexed name. The most recently
+    used LOADED_KEPT requests are kept decoded.
+    """
+    LOADED_KEPT: typing.ClassVar[int] = 4096
+
+    __path: str
+    __connection: sqlite3.Connection | None
+    __collections: dict[str, int]  # row id per collection name
+    __loaded: collections.OrderedDict[tuple[str, str], Request]
+    __decoder: EntityDecoder[Request]
+
+    def __init__(self, directory: str):
+        self.__path = os.path.join(directory, "workspace.sqlite3")
+        self.__connection = None
+        self.__collections = {}
+        self.__loaded = collections.OrderedDict()
+        self.__decoder = EntityDecoder(entity_type=Request)
+
+    def load(self) -> list[Collection]:
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        connection = self.__connection = sqlite3.connect(self.__path)
+        # one fsync per checkpoint rather than per edit
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.executescript(SCHEMA)
+
+        collections = []
+        for row_id, name in connection.execute("SELECT id, name FROM collections ORDER BY id"):
+            self.__collections[name] = row_id
+            collections.append(Collection(name=name, requests=[]))
+        return collections
+
+    def create_collection(self, collection: Collection):
+        connection = self.__open()
+        with connection:
+            cursor = connection.execute("INSERT INTO collections (name) VALUES (?)", (collection.name,))
+            self.__collections[collection.name] = typing.cast(int, cursor.lastrowid)
+            for request in collection.requests:
+                self.__insert(collection, request)
+
+    def create_request(self, collection: Collection, request: Request):
+        if collection.name not in self.__collections:
+            return
+        with self.__open():
+            self.__insert(collection, request)
+
+    def update_request(self, collection: Collection, request: Request):
+        key = collection.name, request.name
+        loaded = self.__loaded.get(key)
+        if loaded is not request and (loaded is not None or not self.has_request(collection, request.name)):
+            # never saved, or a stale copy; a request that was only evicted is still written
+            return
+        connection = self.__open()
+        with connection:
+            connection.execute(
+                "UPDATE requests SET data = ? WHERE collection = ? AND name = ?",
+                (self.__encode(request), self.__collections[collection.name], request.name),
+            )
+        self.__remember(key, request)
+
+    def has_request(self, collection: Collection, name: str) -> bool:
+        row = self.__open().execute(
+            "SELECT 1 FROM requests WHERE collection = ? AND name = ?",
+            (self.__collections.get(collection.name), name),
+        ).fetchone()
+        return row is not None
+
+    def get_request(self, collection: Collection, name: str) -> Request | None:
+        key = collection.name, name
+        request = self.__loaded.get(key)
+        if request is not None:
+            self.__loaded.move_to_end(key)
+            return request
+
+        row = self.__open().execute(
+            "SELECT data FROM requests WHERE collection = ? AND name = ?",
+            (self.__collections.get(collection.name), name),
+        ).fetchone()
+        if row is None:
+            return None
+        # each row holds a single request
+        request = typing.cast(Request, self.__decoder.decode(row[0]))
+        self.__remember(key, request)
+        return request
+
+    def request_count(self, collection: Collection) -> int:
+        row = self.__open().execute(
+            "SELECT COUNT(*) FROM requests WHERE collection = ?",
+            (self.__collections.get(collection.name),),
+        ).fetchone()
+        return row[0]
+
+    def request_names(self, collection: Collection, offset: int = 0, limit: int | None = None) -> list[str]:
+        rows = self.__open().execute(
+            "SELECT name FROM requests WHERE collection = ? ORDER BY name COLLATE NOCASE LIMIT ? OFFSET ?",
+            (self.__collections.get(collection.name), -1 if limit is None else limit, offset),
+        )
+        return [name for name, in rows]
+
+    def close(self):
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __open(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            raise RuntimeError("the store is not loaded")
+        return self.__connection
+
+    def __insert(self, collection: Collection, request: Request):
+        self.__open().execute(
+            "INSERT INTO requests (collection, name, data) VALUES (?, ?, ?)",
+            (self.__collections[collection.name], request.name, self.__encode(request)),
+        )
+        self.__remember((collection.name, request.name), request)
+
+    def __remember(self, key: tuple[str, str], request: Request):
+        self.__loaded[key] = request
+        self.__loaded.move_to_end(key)
+        if len(self.__loaded) > self.LOADED_KEPT:
+            self.__loaded.popitem(last=False)
+
+    @staticmethod
+    def __encode(request: Request) -> str:
+        return json.dumps(request, cls=EntityEncoder, separators=(",", ":"))
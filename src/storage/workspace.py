@@ -0,0 +1,59 @@
+from abc import ABCMeta, abstractmethod
+
+from entities.request import Collection, Request
+
+
+class WorkspaceStore(metaclass=ABCMeta):
+    """
+    Persistent storage for collections and their requests. Stores are told
+    about every mutation the app makes and answer the lookups the UI needs
+    without it having to walk Collection.requests.
+    """
+
+    @abstractmethod
+    def load(self) -> list[Collection]:
+        """
+        Open the store and return its collections. Stores that load
+        requests lazily leave Collection.requests empty; see get_request.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def create_collection(self, collection: Collection):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def create_request(self, collection: Collection, request: Request):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def update_request(self, collection: Collection, request: Request):
+        """
+        Save the current state of a request previously passed to
+        create_request or returned by get_request. Other requests are
+        ignored.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def has_request(self, collection: Collection, name: str) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_request(self, collection: Collection, name: str) -> Request | None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def request_count(self, collection: Collection) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def request_names(self, collection: Collection, offset: int = 0, limit: int | None = None) -> list[str]:
+        """
+        Names of the requests in a collection, sorted by util.name_key.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self):
+        raise NotImplementedError()
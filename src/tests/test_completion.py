@@ -0,0 +1,51 @@
+import pytest
+
+import commands
+from completion import Completion, PrefixTrie, split_word
+
+
+@pytest.mark.unit
+def test_prefix_trie():
+    trie = PrefixTrie(["get users", "Get user", "getter", "list users", "get users"])
+    assert len(trie) == 4
+    assert trie.completions("GET") == ["Get user", "get users", "getter"]
+    assert trie.completions("get", limit=2) == ["Get user", "get users"]
+    assert trie.completions("x") == []
+
+    trie.remove("getter")
+    trie.remove("list users")
+    trie.remove("missing")
+    assert len(trie) == 2
+    assert trie.completions("") == ["Get user", "get users"]
+    assert "getter" not in trie and "get users" in trie
+
+
+@pytest.mark.unit
+def test_completion_cycles_candidates():
+    head, word = split_word("depend a,ge")
+    assert (head, word) == ("depend a,", "ge")
+    completion = Completion(head, PrefixTrie(["get users", "getter"]).completions(word))
+    assert completion.next() == 'depend a,"get users"'
+    assert completion.next() == "depend a,getter"
+    assert completion.next() == 'depend a,"get users"'
+
+
+@pytest.mark.unit
+def test_registered_commands_complete():
+    assert commands.complete("f") == ["find"]
+    assert "stats" in commands.complete("")
+
+
+@pytest.mark.unit
+def test_split_word_handles_quotes():
+    assert split_word('nr "get us') == ("nr ", "get us")
+    assert split_word("nr 'get") == ("nr ", "get")
+    assert split_word('depend "get users",li') == ('depend "get users",', "li")
+    assert split_word("nr ") == ("nr ", "")
+
+    # find takes the rest of the command as its query
+    assert commands.split_command("find get us") == ("find ", "get us")
+    assert commands.split_command('find "get us') == ("find ", "get us")
+    assert commands.split_command("find") == ("", "find")
+    completion = Completion("find ", ["get users"])
+    assert completion.next() == 'find "get users"'
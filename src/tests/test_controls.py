@@ -0,0 +1,157 @@
+import bisect
+import curses
+import types
+import typing
+
+import pytest
+
+import controls
+import fakecurses
+from entities.response import Response
+from fakecurses import FakeWindow
+from views.response_view import ResponseView
+
+
+@pytest.fixture
+def screen():
+    controls.Control.configure(foreground=7, background=0)
+    with fakecurses.install():
+        yield FakeWindow(10, 40)
+
+
+@pytest.mark.unit
+def test_listbox_scrolls_to_selection(screen: FakeWindow):
+    listbox = controls.ListBox(screen, (1, 1), (3, 20))
+    listbox.set_items([f"item {index}" for index in range(10)])
+    listbox.focus()
+    for _ in range(4):
+        listbox.handle_input(ord('j'))
+
+    assert [line[1:21].rstrip() for line in screen.lines()[1:4]] == ["item 2", "item 3", "item 4"]
+    activated = []
+    listbox.activate = activated.append
+    listbox.handle_input(controls.Control.RETURN)
+    assert activated == ["item 4"]
+
+
+@pytest.mark.unit
+def test_label_wraps_text(screen: FakeWindow):
+    label = controls.Label(screen, (0, 0), (2, 10))
+    label.set_text("first line that wraps\nsecond")
+
+    assert screen.row(0)[:10] == "first line"
+    assert screen.row(1)[:10] == " that wrap"
+
+
+@pytest.mark.unit
+def test_listbox_pages_through_a_source(screen: FakeWindow):
+    names = sorted((f"Request {index}" for index in range(1000)), key=str.lower)
+    fetched = []
+
+    def fetch(offset: int, limit: int) -> list[str]:
+        fetched.append(offset)
+        return names[offset:offset + limit]
+
+    listbox = controls.ListBox(screen, (0, 0), (4, 20))
+    listbox.set_items(controls.PagedItems(fetch, lambda: len(names), key=str.lower))
+    listbox.focus()
+    for _ in range(5):
+        listbox.handle_input(ord('j'))
+    listbox.handle_input(ord('k'))
+    assert [line[:20].rstrip() for line in screen.lines()[:4]] == names[2:6]
+    assert fetched == [0]
+
+    names.insert(1, "request 0a")
+    listbox.insort_item("request 0a", key=str.lower)
+    assert [line[:20].rstrip() for line in screen.lines()[:4]] == names[3:7]
+    # the pages read are shifted rather than read again
+    assert fetched.count(0) == 1
+    listbox.select_item(names[900])
+    assert screen.row(3)[:20].rstrip() == names[900]
+
+
+class SmallPages(controls.PagedItems):
+    PAGE = 4
+
+
+@pytest.mark.unit
+def test_paged_items_insort_shifts_pages():
+    names = [f"{index:02}" for index in range(0, 40, 2)]
+    items = SmallPages(lambda offset, limit: names[offset:offset + limit], lambda: len(names), key=str)
+    for index in (0, 5, 9, 17):
+        items[index]
+
+    for name in ("05", "00a", "39", "17"):
+        names.insert(bisect.bisect_right(names, name), name)
+        assert items.insort(name) == names.index(name)
+        assert len(items) == len(names)
+        assert [items[index] for index in range(len(names))] == names
+
+
+@pytest.mark.unit
+def test_list_items_insort():
+    items = controls.ListItems(["b", "D"], key=str.lower)
+    assert items.insort("c", str.lower) == 1
+    assert items.insort("A", str.lower) == 0
+    assert items.insort("a", str.lower) == 1
+    items.resort(str.lower)
+    assert [items[index] for index in range(len(items))] == ["A", "a", "b", "c", "D"]
+
+
+@pytest.mark.unit
+def test_response_view_stops_repainting_once_full(screen: FakeWindow, monkeypatch):
+    # the view only needs the screen from its App
+    view = ResponseView(typing.cast(typing.Any, types.SimpleNamespace(stdscr=screen)), (0, 0), (10, 40))
+    renders = []
+    render = view.render
+    monkeypatch.setattr(view, "render", lambda: (renders.append(None), render()))
+    body = bytearray()
+    view.set_response(Response(status=200, headers={}, data=b""), body=body)
+    assert len(renders) == 1
+
+    body += b"line\n" * 4
+    view.set_progress(len(body), None)
+    assert len(renders) == 2
+
+    # once every row is drawn, more data only updates the counters
+    body += b"line\n" * 20
+    view.set_progress(len(body), None)
+    body += b"line\n" * 20
+    view.set_progress(len(body), 1000)
+    assert len(renders) == 3
+    assert "1000" in screen.row(0)
+
+
+def flushes(*shown: controls.Control) -> tuple[int, ...]:
+    # how often each control's window was copied to the virtual screen; the screen fixture only makes FakeWindows
+    return tuple(typing.cast(FakeWindow, control.window).noutrefreshes for control in shown)
+
+
+@pytest.mark.unit
+def test_compositor_flushes_dirty_windows_once_per_frame(screen: FakeWindow, monkeypatch):
+    updates = []
+    monkeypatch.setattr(curses, "doupdate", lambda: updates.append(None))
+    compositor = controls.Compositor()
+    controls.Control.configure(foreground=7, background=0, compositor=compositor)
+    first = controls.Label(screen, (0, 0), (2, 10))
+    second = controls.Label(screen, (2, 0), (2, 10))
+    compositor.flush()
+    assert (*flushes(first, second), len(updates)) == (1, 1, 1)
+
+    # repaints only mark the control dirty until the frame is flushed
+    first.set_text("one")
+    first.set_text("two")
+    assert screen.row(0)[:10].rstrip() == ""
+    compositor.flush()
+    assert screen.row(0)[:10].rstrip() == "two"
+    assert (*flushes(first, second), len(updates)) == (2, 1, 2)
+
+    # nothing pending, nothing written
+    compositor.flush()
+    assert len(updates) == 2
+
+    # the cursor's window is flushed last, after the dirty ones
+    second.set_text("three")
+    compositor.flush(cursor=first)
+    assert (*flushes(first, second), len(updates)) == (3, 2, 3)
+    assert screen.row(2)[:10].rstrip() == "three"
@@ -1,9 +1,14 @@
 import enum
+import io
+import json
 import typing
 
 import pytest
 
 from entities import Entity, Field
+from entities.entity import EntityDecoder, EntityEncoder, compile_copier, iterload, share
+from entities.request import Collection, Method, Request
+from entities.settings import Engine, Settings
 
 
 class SimpleTestEntity(Entity):
@@ -156,3 +161,150 @@ def test_enum_entity():
     with pytest.raises(ValueError):
         EnumEntity(int_enum=TestIntEnum.three, str_enum="blah")
 
+
+
+class UnionTestEntity(Entity):
+    value: int | str
+    entities: list[SimpleTestEntity]
+    default: int = Field(default=5)
+
+
+@pytest.mark.unit
+def test_compiled_init():
+    simple = SimpleTestEntity(a=1, b="asdf", c=1.4)
+    ent = UnionTestEntity(value="asdf", entities=[simple, {"a": 2, "b": "qwer", "c": 2.5}])
+    assert ent.value == "asdf"
+    assert ent.entities[0] is simple
+    assert ent.entities[1].a == 2
+    assert ent.default == 5
+
+    entities = [simple]
+    ent = UnionTestEntity(value=1, entities=entities, default=6)
+    assert ent.value == 1
+    assert ent.entities == entities and ent.entities is not entities
+    assert ent.default == 6
+
+    with pytest.raises(TypeError):
+        UnionTestEntity(value=1.5, entities=[])
+
+    with pytest.raises(TypeError):
+        UnionTestEntity(value=1, entities=[{"a": 1}])
+
+    with pytest.raises(ValueError):
+        UnionTestEntity(entities=[])
+
+    with pytest.raises(ValueError):
+        UnionTestEntity(value=1, entities=[], unknown=True)
+
+
+class SlottedTestEntity(Entity, slots=True):
+    a: int
+    b: list[int]
+    c: str = Field(default="default")
+
+
+class SlottedChildTestEntity(SlottedTestEntity, slots=True):
+    d: int
+
+
+@pytest.mark.unit
+def test_slotted_entity():
+    ent = SlottedTestEntity(a=1, b=[1, 2])
+    assert not hasattr(ent, "__dict__")
+    assert ent.c == "default"
+
+    with pytest.raises(AttributeError):
+        setattr(ent, "unknown", 1)
+
+    copied = ent.copy()
+    assert copied.b == [1, 2] and copied.b is not ent.b
+
+    assert json.loads(json.dumps(ent, cls=EntityEncoder)) == {"a": 1, "b": [1, 2], "c": "default"}
+
+    child = SlottedChildTestEntity(a=1, b=[], d=4)
+    assert not hasattr(child, "__dict__")
+    assert SlottedChildTestEntity.__slots__ == ("d",)
+    assert child.c == "default"
+    assert child.d == 4
+
+
+class CopyTestEntity(Entity, slots=True):
+    name: str
+    enum_value: TestStrEnum
+    headers: dict[str, str]
+    nested: list[dict[str, list[int]]]
+    child: SimpleTestEntity | None
+    children: tuple[SimpleTestEntity, ...]
+
+
+@pytest.mark.unit
+def test_entity_copy():
+    ent = CopyTestEntity(
+        name="name",
+        enum_value=TestStrEnum.asdf,
+        headers={"a": "b"},
+        nested=[{"a": [1, 2]}],
+        child=SimpleTestEntity(a=1, b="asdf", c=1.4),
+        children=(SimpleTestEntity(a=2, b="b", c=0.5),),
+    )
+    copied = ent.copy()
+    assert type(copied) is CopyTestEntity
+    assert copied.name is ent.name
+    assert copied.enum_value is ent.enum_value
+    assert copied.headers == ent.headers and copied.headers is not ent.headers
+    assert copied.nested == ent.nested
+    assert copied.nested[0]["a"] is not ent.nested[0]["a"]
+    assert copied.child is not None and copied.child is not ent.child and copied.child.b == "asdf"
+    assert copied.children[0] is not ent.children[0] and copied.children[0].a == 2
+
+    # each position of a fixed-length tuple is copied by its own type
+    pair = ("a", [1])
+    copied_pair = compile_copier(tuple[str, list[int]])(pair)
+    assert copied_pair == pair and copied_pair[1] is not pair[1]
+    assert compile_copier(tuple[str, int]) is share
+    assert compile_copier(tuple[int, ...]) is share
+
+    snapshot = ent.snapshot()
+    assert snapshot.headers is ent.headers
+    ent.name = "renamed"
+    assert snapshot.name == "name"
+
+
+class RenamedTestEntity(Entity):
+    content_type: str = Field(name="content-type")
+    simple: SimpleTestEntity | None = Field(default=None)
+
+
+@pytest.mark.unit
+def test_entity_decoder():
+    collections = [
+        Collection(name=f"collection {index}", requests=[
+            Request(name=f"request {index}", method=Method.POST, url="http://example.com", headers={"a": "b"}),
+        ])
+        for index in range(3)
+    ]
+    data = json.dumps(collections, cls=EntityEncoder)
+
+    decoded = json.loads(data, cls=EntityDecoder[Collection])
+    assert [collection.name for collection in decoded] == ["collection 0", "collection 1", "collection 2"]
+    assert decoded[0].requests[0].method is Method.POST
+    assert decoded[0].requests[0].headers == {"a": "b"}
+
+    streamed = list(iterload(io.StringIO(data), Collection, chunk_size=16))
+    assert [collection.name for collection in streamed] == [collection.name for collection in decoded]
+    assert list(iterload(io.StringIO(" [ ] "), Collection)) == []
+    with pytest.raises(json.JSONDecodeError):
+        list(iterload(io.StringIO(data[:-10]), Collection, chunk_size=16))
+
+    settings = json.loads('{"executor": {"engine": "asyncio", "pool": {}}}', cls=EntityDecoder[Settings])
+    assert settings.executor.engine is Engine.asyncio
+    assert settings.executor.pool.max_connections == 100
+    assert settings.colors.foreground == "white"
+
+    renamed = EntityDecoder(entity_type=RenamedTestEntity).decode('{"content-type": "text/plain", "simple": {"a": 1, "b": "x", "c": 1.0}}')
+    assert isinstance(renamed, RenamedTestEntity)
+    assert renamed.content_type == "text/plain"
+    assert renamed.simple is not None and renamed.simple.a == 1
+
+    with pytest.raises(TypeError):
+        json.loads('{"name": "c", "requests": [{"name": 1}]}', cls=EntityDecoder[Collection])
@@ -0,0 +1,498 @@
+import asyncio
+import queue
+import select
+import threading
+import time
+
+import httpx
+import pytest
+
+from entities.request import Method, Request
+from entities.settings import CacheSettings, DuplicatePolicy, ExecutorSettings, PoolSettings, ResponseStoreSettings
+from executor.asynchronous import AsyncExecutor
+from executor.base import ExecutorBusy, Job, RequestExecutor, Result, StreamChunk, StreamStart
+from executor.cache import CacheStatus, ResponseCache, cache_status
+from executor.pool import ClientPool, origin_of
+from executor.threaded import RequestThread, ThreadExecutor
+from executor.timing import TimingTrace
+
+
+@pytest.mark.unit
+def test_origin_of():
+    assert origin_of("http://Example.com/a?b=c") == ("http", "example.com", 80)
+    assert origin_of("https://example.com/") == ("https", "example.com", 443)
+    assert origin_of("https://example.com:8443/x") == ("https", "example.com", 8443)
+
+
+@pytest.mark.unit
+def test_client_pool_reuses_clients_per_origin():
+    pool = ClientPool(PoolSettings())
+    try:
+        first = pool.get("http://example.com/a")
+        assert pool.get("http://example.com/b") is first
+        assert pool.get("http://example.com:80/c") is first
+        assert pool.get("https://example.com/a") is not first
+        assert pool.get("http://other.example.com/a") is not first
+    finally:
+        pool.close()
+
+
+def cached_response(request: Request, status: int = 200, headers: dict[str, str] | None = None, body: bytes = b"body") -> httpx.Response:
+    return httpx.Response(status, headers=headers, content=body, request=httpx.Request(request.method, request.url))
+
+
+def cached_content(cache: ResponseCache, request: Request) -> bytes | None:
+    response = cache.lookup(request).response
+    return None if response is None else response.content
+
+
+@pytest.mark.unit
+def test_response_cache_serves_fresh_responses():
+    cache = ResponseCache()
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+
+    lookup = cache.lookup(request)
+    assert lookup.response is None
+    response = cache.complete(request, lookup, cached_response(request, headers={"Cache-Control": "max-age=60"}), b"body")
+    assert cache_status(response) == CacheStatus.miss
+
+    hit = cache.lookup(request).response
+    assert hit is not None
+    assert cache_status(hit) == CacheStatus.hit
+    assert hit.content == b"body"
+
+    # the request may insist on going to the server
+    request.headers["Cache-Control"] = "no-cache"
+    assert cache.lookup(request).response is None
+
+    # unsafe methods invalidate what is stored for the URL
+    post = Request(name="b", method=Method.POST, url="http://example.com/a", headers={})
+    cache.complete(post, cache.lookup(post), cached_response(post, 201), b"")
+    assert len(cache) == 0
+
+
+@pytest.mark.unit
+def test_response_cache_forgets_dropped_bodies(tmp_path):
+    store = ResponseStoreSettings(max_resident_size=1, max_spilled=1, spill_directory=str(tmp_path))
+    cache = ResponseCache(CacheSettings(store=store))
+    first = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    second = Request(name="b", method=Method.GET, url="http://example.com/b", headers={})
+    for request in (first, second):
+        cache.complete(request, cache.lookup(request), cached_response(request, headers={"Cache-Control": "max-age=60"}), b"body")
+
+    # spilling the second body dropped the first
+    lookup = cache.lookup(first)
+    assert lookup.response is None and lookup.entry is None
+    assert len(cache) == 1
+    assert cached_content(cache, second) == b"body"
+
+
+@pytest.mark.unit
+def test_response_cache_revalidates_stale_responses():
+    cache = ResponseCache()
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT", "Cache-Control": "no-cache"}
+    cache.complete(request, cache.lookup(request), cached_response(request, headers=headers), b"body")
+
+    lookup = cache.lookup(request)
+    assert lookup.response is None
+    assert lookup.headers["If-None-Match"] == '"v1"'
+    assert lookup.headers["If-Modified-Since"] == headers["Last-Modified"]
+    assert "If-None-Match" not in request.headers
+
+    revalidated = cache.complete(request, lookup, cached_response(request, 304, {"ETag": '"v1"'}, b""), b"")
+    assert cache_status(revalidated) == CacheStatus.revalidated
+    assert revalidated.status_code == 200
+    assert revalidated.content == b"body"
+
+    # a changed resource replaces the stored one
+    lookup = cache.lookup(request)
+    cache.complete(request, lookup, cached_response(request, headers={"ETag": '"v2"'}, body=b"new"), b"new")
+    assert cache.lookup(request).headers["If-None-Match"] == '"v2"'
+    assert len(cache) == 1
+
+
+@pytest.mark.unit
+def test_response_cache_storage_rules():
+    cache = ResponseCache(CacheSettings(max_entries=2))
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={"Accept": "text/plain"})
+
+    cache.complete(request, cache.lookup(request), cached_response(request, headers={"Cache-Control": "no-store, max-age=60"}), b"body")
+    cache.complete(request, cache.lookup(request), cached_response(request, headers={"Expires": "0"}), b"body")
+    assert len(cache) == 0
+
+    # one variant per value of the headers named in Vary
+    vary = {"Cache-Control": "max-age=60", "Vary": "Accept"}
+    cache.complete(request, cache.lookup(request), cached_response(request, headers=vary, body=b"text"), b"text")
+    json_request = Request(name="b", method=Method.GET, url=request.url, headers={"Accept": "application/json"})
+    assert cache.lookup(json_request).response is None
+    cache.complete(json_request, cache.lookup(json_request), cached_response(json_request, headers=vary, body=b"{}"), b"{}")
+    assert cached_content(cache, request) == b"text"
+    assert cached_content(cache, json_request) == b"{}"
+
+    # beyond max_entries the least recently used URL goes
+    other = Request(name="c", method=Method.GET, url="http://example.com/c", headers={})
+    cache.complete(other, cache.lookup(other), cached_response(other, headers={"Cache-Control": "max-age=60"}), b"c")
+    assert len(cache) == 1
+    assert cache.lookup(request).response is None
+    assert cache.lookup(other).response is not None
+
+
+class MockPool(ClientPool):
+    """
+    A ClientPool with a single client, answering every request with `handler`.
+    """
+    def __init__(self, handler):
+        super().__init__()
+        self.client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    def get(self, url: str | httpx.URL) -> httpx.Client:
+        return self.client
+
+
+def run_jobs(thread: RequestThread, jobs: queue.Queue, *queued: Job):
+    # run the worker on this thread until it has taken every job
+    for job in queued:
+        jobs.put(job)
+    jobs.put(None)
+    thread.run()
+
+
+@pytest.mark.unit
+def test_request_thread_bypasses_cache_on_request():
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200, headers={"Cache-Control": "max-age=60"}, content=b"body")
+
+    results = []
+    jobs = queue.Queue()
+    thread = RequestThread(jobs, lambda job, result: results.append(result), MockPool(handler), 1024, ResponseCache())
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    run_jobs(thread, jobs, Job(request, "a", stream=False), Job(request, "a", stream=False))
+    assert len(sent) == 1
+    assert cache_status(results[1]) == CacheStatus.hit
+
+    run_jobs(thread, jobs, Job(request, "a", stream=False, cache=False), Job(request, "a", stream=True, cache=False))
+    assert len(sent) == 3
+    assert cache_status(results[2]) is None
+    assert results[-1].content == b"body"
+
+
+@pytest.mark.unit
+def test_request_thread_stops_reading_cancelled_body():
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    cancelled = Job(request, "a", stream=False)
+    produced = []
+
+    def body():
+        for index in range(10):
+            produced.append(index)
+            if index == 2:
+                cancelled.cancel()
+            yield b"x" * 16
+
+    results = []
+    jobs = queue.Queue()
+    thread = RequestThread(jobs, lambda job, result: results.append(result), MockPool(lambda request: httpx.Response(200, content=body())), 16)
+    run_jobs(thread, jobs, cancelled)
+    assert produced == [0, 1, 2]
+    assert results == []
+
+    # a job left alone reads the whole body
+    produced.clear()
+    run_jobs(thread, jobs, Job(request, "a", stream=False))
+    assert len(produced) == 10
+    assert results[0].content == b"x" * 160
+
+
+class ManualExecutor(RequestExecutor):
+    """
+    Keeps submitted jobs so the test publishes their results itself.
+    """
+    def __init__(self, duplicates: DuplicatePolicy):
+        super().__init__(ExecutorSettings(duplicates=duplicates, stream=False))
+        self.jobs: list[Job] = []
+        self.busy = False
+
+    def _submit(self, job, timeout):
+        if self.busy:
+            raise ExecutorBusy("busy")
+        self.jobs.append(job)
+
+    def shutdown(self, wait=False):
+        self._close_wakeup()
+
+
+class ImmediateExecutor(ManualExecutor):
+    """
+    Publishes a result before _submit returns, like a cache hit does.
+    """
+    def _submit(self, job, timeout):
+        super()._submit(job, timeout)
+        self._publish(job, cached_response(job.request))
+
+
+@pytest.mark.unit
+def test_executor_registers_jobs_before_submitting():
+    executor = ImmediateExecutor(DuplicatePolicy.coalesce)
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    try:
+        assert executor.dispatch(request, "c/a")
+        assert not executor.in_flight("c/a")
+        assert executor.dispatch(request, "c/a")
+        assert collect_statuses(executor) == [("c/a", 200), ("c/a", 200)]
+
+    finally:
+        executor.shutdown()
+
+    # a send the executor refuses leaves the one in flight alone
+    executor = ManualExecutor(DuplicatePolicy.cancel)
+    try:
+        executor.dispatch(request, "c/a")
+        executor.busy = True
+        with pytest.raises(ExecutorBusy):
+            executor.dispatch(request, "c/a")
+        assert executor.in_flight("c/a") and not executor.jobs[0].cancelled
+        executor._publish(executor.jobs[0], cached_response(request))
+        assert collect_statuses(executor) == [("c/a", 200)]
+    finally:
+        executor.shutdown()
+
+
+def as_response(result: Result) -> httpx.Response:
+    assert isinstance(result, httpx.Response), result
+    return result
+
+
+def collect_statuses(executor: RequestExecutor) -> list[tuple[str, int]]:
+    return [(exec_id, as_response(result).status_code) for exec_id, result in executor.collect()]
+
+
+@pytest.mark.unit
+def test_executor_cancels_superseded_sends():
+    executor = ManualExecutor(DuplicatePolicy.cancel)
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    try:
+        assert executor.dispatch(request, "c/a")
+        first = executor.jobs[0]
+        executor._publish(first, StreamStart(200, {}, None))
+        assert executor.dispatch(request, "c/a")
+        second = executor.jobs[1]
+        assert first.cancelled and not second.cancelled
+
+        # queued and later results of the superseded send are dropped
+        executor._publish(first, cached_response(request, 201))
+        executor._publish(second, cached_response(request, 202))
+        assert collect_statuses(executor) == [("c/a", 202)]
+        assert not executor.in_flight("c/a")
+
+        executor.dispatch(request, "c/a")
+        assert executor.cancel("c/a")
+        assert not executor.cancel("c/a")
+        assert executor.jobs[2].cancelled
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.unit
+def test_executor_coalesces_identical_sends():
+    executor = ManualExecutor(DuplicatePolicy.coalesce)
+    request = Request(name="a", method=Method.GET, url="http://example.com/a", headers={})
+    try:
+        assert executor.dispatch(request, "c/a")
+        assert not executor.dispatch(request, "c/a")
+        assert len(executor.jobs) == 1
+
+        # an edited request is not a duplicate
+        request.url = "http://example.com/b"
+        assert executor.dispatch(request, "c/a")
+        assert executor.jobs[0].cancelled
+        executor._publish(executor.jobs[1], cached_response(request))
+        assert collect_statuses(executor) == [("c/a", 200)]
+    finally:
+        executor.shutdown()
+
+
+def mock_transport(monkeypatch, handler) -> list[httpx.MockTransport]:
+    """
+    Makes the client pools answer every request with `handler`. Returns the
+    transports created so far, one per pooled client.
+    """
+    transports = []
+
+    def client_options(settings):
+        transports.append(httpx.MockTransport(handler))
+        return {"transport": transports[-1]}
+
+    monkeypatch.setattr("executor.pool.client_options", client_options)
+    return transports
+
+
+def wait_for_results(executor: RequestExecutor, count: int, timeout: float = 5.0) -> list[tuple[str, Result]]:
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < count:
+        remaining = deadline - time.monotonic()
+        assert remaining > 0, f"only {len(results)} of {count} results arrived"
+        select.select([executor], [], [], remaining)
+        results.extend(executor.collect())
+    return results
+
+
+@pytest.mark.unit
+def test_thread_executor_end_to_end(monkeypatch):
+    # both slow requests must be in flight at once to get past the barrier
+    barrier = threading.Barrier(2)
+    workers = set()
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url)
+        workers.add(threading.current_thread())
+        if request.url.path == "/slow":
+            barrier.wait(5)
+        return httpx.Response(200, headers={"Cache-Control": "max-age=60"}, content=request.url.host.encode() * 1000)
+
+    transports = mock_transport(monkeypatch, handler)
+    executor = ThreadExecutor(ExecutorSettings(workers=2, stream=False, chunk_size=4096))
+    a = Request(name="a", method=Method.GET, url="http://a.example.com/slow", headers={})
+    b = Request(name="b", method=Method.GET, url="http://b.example.com/slow", headers={})
+    streamed = Request(name="s", method=Method.GET, url="http://a.example.com/stream", headers={})
+    try:
+        executor.dispatch(a, "c/a")
+        executor.dispatch(b, "c/b")
+        responses = {exec_id: as_response(result) for exec_id, result in wait_for_results(executor, 2)}
+        assert len(workers) == 2
+        assert responses["c/a"].content == b"a.example.com" * 1000
+        assert responses["c/b"].content == b"b.example.com" * 1000
+
+        executor.dispatch(streamed, "c/s", stream=True)
+        results = [result for _, result in wait_for_results(executor, 6)]
+        assert isinstance(results[0], StreamStart) and results[0].total == 13000
+        assert [len(result.data) for result in results[1:-1] if isinstance(result, StreamChunk)] == [4096, 4096, 4096, 712]
+        assert as_response(results[-1]).content == b"a.example.com" * 1000
+
+        # answered from the cache without another request
+        executor.dispatch(a, "c/a")
+        [(_, result)] = wait_for_results(executor, 1)
+        assert cache_status(as_response(result)) == CacheStatus.hit
+        assert len(sent) == 3
+        # one pooled client per origin, shared by the workers
+        assert len(transports) == 2
+        assert not any(executor.in_flight(exec_id) for exec_id in ("c/a", "c/b", "c/s"))
+    finally:
+        executor.shutdown(wait=True)
+    assert not any(worker.is_alive() for worker in workers)
+
+
+@pytest.mark.unit
+def test_async_executor_dispatch_and_cancel(monkeypatch):
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return httpx.Response(200, content=request.url.path.encode())
+
+    mock_transport(monkeypatch, handler)
+    executor = AsyncExecutor(ExecutorSettings(stream=False))
+    fast = Request(name="fast", method=Method.GET, url="http://example.com/fast", headers={})
+    slow = Request(name="slow", method=Method.GET, url="http://example.com/slow", headers={})
+    try:
+        assert executor.dispatch(fast, "c/fast")
+        [(exec_id, result)] = wait_for_results(executor, 1)
+        assert exec_id == "c/fast" and isinstance(result, httpx.Response) and result.content == b"/fast"
+
+        executor.dispatch(slow, "c/slow")
+        assert started.wait(5)
+        assert executor.cancel("c/slow")
+        assert cancelled.wait(5)
+
+        # streamed results arrive in order, ending with the response
+        executor.dispatch(fast, "c/fast", stream=True)
+        results = [result for _, result in wait_for_results(executor, 3)]
+        assert isinstance(results[0], StreamStart) and results[0].status == 200
+        assert isinstance(results[-1], httpx.Response) and results[-1].content == b"/fast"
+    finally:
+        executor.shutdown(wait=True)
+
+
+@pytest.mark.unit
+def test_async_executor_waits_for_a_slot(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            started.set()
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+        return httpx.Response(200, content=request.url.path.encode())
+
+    mock_transport(monkeypatch, handler)
+    executor = AsyncExecutor(ExecutorSettings(max_concurrency=1, queue_size=0, stream=False))
+    fast = Request(name="fast", method=Method.GET, url="http://example.com/fast", headers={})
+    slow = Request(name="slow", method=Method.GET, url="http://example.com/slow", headers={})
+    try:
+        executor.dispatch(slow, "c/slow")
+        assert started.wait(5)
+
+        # the only slot is taken: refused at once without a timeout, after it with one
+        with pytest.raises(ExecutorBusy):
+            executor.dispatch(fast, "c/fast")
+        start = time.monotonic()
+        with pytest.raises(ExecutorBusy):
+            executor.dispatch(fast, "c/fast", timeout=0.1)
+        assert time.monotonic() - start >= 0.1
+        assert not executor.in_flight("c/fast")
+
+        threading.Timer(0.1, release.set).start()
+        assert executor.dispatch(fast, "c/fast", timeout=5)
+        assert sorted(exec_id for exec_id, _ in wait_for_results(executor, 2)) == ["c/fast", "c/slow"]
+    finally:
+        executor.shutdown(wait=True)
+
+    # the loop stopped and closed its clients
+    assert not executor._thread.is_alive()
+    assert executor._loop.is_closed()
+    assert executor._clients._clients == {}
+
+
+@pytest.mark.unit
+def test_timing_trace_phases(monkeypatch):
+    clock = iter([0.0, 1.0, 3.0, 4.0, 4.5, 5.0, 5.5, 9.0, 12.0])
+    monkeypatch.setattr(time, "perf_counter", lambda: next(clock))
+
+    trace = TimingTrace()
+    for event in (
+        "connection.connect_tcp.started",
+        "connection.connect_tcp.complete",
+        "connection.start_tls.started",
+        "connection.start_tls.complete",
+        "http11.send_request_headers.started",
+        "http11.send_request_body.complete",
+        "http11.receive_response_headers.complete",
+    ):
+        trace.trace(event, {})
+    timing = trace.finish()
+
+    assert (timing.queued, timing.connect, timing.tls) == (1.0, 2.0, 0.5)
+    assert (timing.send, timing.wait, timing.download, timing.total) == (0.5, 3.5, 3.0, 12.0)
+    assert not timing.reused
+
+    # a kept-alive connection skips straight to sending
+    clock = iter([0.0, 1.0, 2.0, 3.0, 4.0])
+    trace = TimingTrace()
+    for event in ("http11.send_request_headers.started", "http11.send_request_body.complete", "http11.receive_response_headers.complete"):
+        trace.trace(event, {})
+    timing = trace.finish()
+    assert timing.reused
+    assert (timing.queued, timing.connect, timing.wait, timing.total) == (1.0, 0.0, 1.0, 4.0)
@@ -0,0 +1,47 @@
+import pytest
+
+from finder import FuzzyIndex, Match
+
+
+@pytest.fixture
+def index() -> FuzzyIndex:
+    index = FuzzyIndex()
+    index.extend([
+        ("users", None),
+        ("users", "list users"),
+        ("users", "get user"),
+        ("users", "delete user"),
+        ("orders", None),
+        ("orders", "list orders"),
+        ("orders", "refund payment"),
+    ])
+    return index
+
+
+@pytest.mark.unit
+def test_search_ranks_prefixes_first(index: FuzzyIndex):
+    assert index.search("list") == [Match("orders", "list orders"), Match("users", "list users")]
+    assert index.search("user")[:4] == [
+        Match("users", None),
+        Match("users", "list users"),
+        Match("users", "get user"),
+        Match("users", "delete user"),
+    ]
+    assert index.search("ord list") == [Match("orders", "list orders")]
+    assert index.search("LIST U") == [Match("users", "list users")]
+
+
+@pytest.mark.unit
+def test_search_narrows_and_updates(index: FuzzyIndex):
+    assert len(index.search("l")) == 3
+    assert index.search("li") == [Match("orders", "list orders"), Match("users", "list users")]
+    index.add("orders", "list returns")
+    assert index.search("list ret") == [Match("orders", "list returns")]
+    index.remove("orders", "list orders")
+    assert index.search("list o") == [Match("orders", "list returns")]
+
+
+@pytest.mark.unit
+def test_search_tolerates_typos(index: FuzzyIndex):
+    assert index.search("pamyent")[:1] == [Match("orders", "refund payment")]
+    assert index.search("xyzzy") == []
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from entities.request import Collection, Method, Request
+from headless import partition
+
+
+def make_request(name: str, *depends_on: str) -> Request:
+    return Request(name=name, method=Method.GET, url="http://example.com", headers={}, depends_on=list(depends_on))
+
+
+@pytest.mark.unit
+def test_partition_keeps_dependencies_together():
+    first = [make_request("login"), make_request("a", "login"), make_request("b", "login"), make_request("c")]
+    second = [make_request("x"), make_request("y")]
+    collections = [(Collection(name="first", requests=[]), first), (Collection(name="second", requests=[]), second)]
+
+    assignments = partition(collections, 2)
+    assert len(assignments) == 2
+
+    placed = {}
+    for index, assignment in enumerate(assignments):
+        for collection, encoded in assignment:
+            for request in encoded:
+                placed[collection, json.loads(request)["name"]] = index
+
+    assert len(placed) == 6
+    assert placed["first", "login"] == placed["first", "a"] == placed["first", "b"]
+    # the three-request group fills one process, the singles the other
+    assert sum(1 for index in placed.values() if index == placed["first", "login"]) == 3
+
+    assert len(partition(collections, 8)) == 4
@@ -0,0 +1,34 @@
+import pytest
+
+from histogram import Histogram
+
+
+@pytest.mark.unit
+def test_histogram_percentiles():
+    histogram = Histogram(significant_figures=3)
+    assert histogram.value_at_percentile(99) == 0
+
+    for value in range(1, 100001):
+        histogram.record(value)
+
+    assert histogram.count == 100000
+    assert histogram.min == 1 and histogram.max == 100000
+    assert histogram.mean == pytest.approx(50000.5)
+    for percentile, exact in ((50, 50000), (90, 90000), (99, 99000), (99.9, 99900)):
+        # within the configured precision, and never below the exact value
+        assert exact <= histogram.value_at_percentile(percentile) <= exact * 1.001
+    assert histogram.value_at_percentile(100) == 100000
+
+    # small values are exact
+    small = Histogram()
+    small.record(7, count=3)
+    small.record(2)
+    assert small.value_at_percentile(25) == 2
+    assert small.value_at_percentile(50) == 7
+
+    merged = Histogram()
+    merged.merge(small)
+    assert merged.count == 4 and merged.value_at_percentile(50) == 7
+
+    with pytest.raises(ValueError):
+        histogram.record(-1)
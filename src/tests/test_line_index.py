@@ -0,0 +1,31 @@
+import pytest
+
+from views.line_index import LineIndex
+
+
+def lines_of(index: LineIndex, body: bytes) -> list[bytes]:
+    return [body[slice(*index.span(line))] for line in range(len(index))]
+
+
+@pytest.mark.unit
+def test_line_index():
+    for body in [b"", b"a", b"a\n", b"a\nb", b"\n\n", b"ab\ncd\n\nef"]:
+        index = LineIndex()
+        index.update(body)
+        expected = body.split(b"\n")
+        if expected[-1] == b"":
+            expected.pop()
+        assert lines_of(index, body) == expected
+
+
+@pytest.mark.unit
+def test_line_index_incremental():
+    body = b"first\nsecond line\n\nthird\nlast"
+    buffer = bytearray()
+    index = LineIndex()
+    for offset in range(0, len(body), 3):
+        buffer.extend(body[offset:offset + 3])
+        index.update(buffer)
+
+    assert index.size == len(body)
+    assert lines_of(index, body) == body.split(b"\n")
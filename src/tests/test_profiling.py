@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from profiling import Profiler
+
+
+class Widget:
+    def paint(self, times: int) -> int:
+        return times * 2
+
+    def items(self):
+        yield from range(3)
+
+
+class Button(Widget):
+    pass
+
+
+@pytest.mark.unit
+def test_profiler_instruments_and_restores_methods(tmp_path):
+    original = Widget.__dict__["paint"]
+    profiler = Profiler()
+    profiler.instrument(Widget, "paint", lambda widget: f"paint {type(widget).__name__}")
+    profiler.instrument_generator(Widget, "items", "items")
+
+    assert Widget().paint(2) == 4
+    assert Button().paint(1) == 2
+    assert Button().paint(3) == 6
+    assert list(Widget().items()) == [0, 1, 2]
+
+    assert profiler.histograms["paint Widget"].count == 1
+    assert profiler.histograms["paint Button"].count == 2
+    assert profiler.histograms["items"].count == 1
+
+    profiler.uninstrument()
+    assert Widget.__dict__["paint"] is original
+    Widget().paint(1)
+    assert profiler.histograms["paint Widget"].count == 1
+
+    path = tmp_path / "profile.json"
+    profiler.dump(str(path))
+    summary = json.loads(path.read_text())
+    assert summary["paint Button"]["count"] == 2
+    assert "p99" in summary["items"]
+    assert "paint Button" in profiler.report()
@@ -0,0 +1,116 @@
+import typing
+
+import httpx
+import pytest
+
+import executor
+from entities.request import Collection, Method, Request
+from runner import CollectionRunner, dependency_groups
+
+
+class FakeHost:
+    """
+    Records dispatched requests so the test decides when each completes.
+    """
+    def __init__(self, capacity: int | None = None):
+        self.capacity = capacity
+        self.in_flight: dict[str, tuple[Request, typing.Callable[[str, executor.Result], typing.Any]]] = {}
+        self.order: list[str] = []
+        self.cached: list[bool] = []
+
+    def dispatch(self, request, exec_id, handler, stream=None, cache=True):
+        if self.capacity is not None and len(self.in_flight) >= self.capacity:
+            raise executor.ExecutorBusy("busy")
+        self.in_flight[exec_id] = request, handler
+        self.order.append(request.name)
+        self.cached.append(cache)
+
+    def cancel(self, exec_id):
+        self.in_flight.pop(exec_id, None)
+
+    def complete(self, name: str, status: int = 200):
+        exec_id = next(key for key, (request, _) in self.in_flight.items() if request.name == name)
+        request, handler = self.in_flight.pop(exec_id)
+        handler(exec_id, httpx.Response(status, request=httpx.Request("GET", "http://example.com")))
+
+
+def make_request(name: str, *depends_on: str) -> Request:
+    return Request(name=name, method=Method.GET, url="http://example.com", headers={}, depends_on=list(depends_on))
+
+
+@pytest.mark.unit
+def test_runner_respects_dependencies():
+    app = FakeHost()
+    requests = [
+        make_request("login"),
+        make_request("profile", "login"),
+        make_request("orders", "login"),
+        make_request("checkout", "profile", "orders"),
+        make_request("health"),
+    ]
+    runner = CollectionRunner(app, Collection(name="shop", requests=[]), requests, concurrency=10)
+    results = {}
+    runner.result = lambda name, result, elapsed: results.setdefault(name, getattr(result, "status_code", None))
+    runner.start()
+    assert sorted(app.order) == ["health", "login"]
+
+    app.complete("login")
+    assert sorted(app.order[2:]) == ["orders", "profile"]
+    app.complete("profile")
+    assert "checkout" not in app.order
+    app.complete("orders")
+    assert app.order[-1] == "checkout"
+    # runs measure the server, not the response cache
+    assert not any(app.cached)
+
+    app.complete("checkout")
+    app.complete("health")
+    assert runner.done
+    assert sorted(runner.succeeded) == ["checkout", "health", "login", "orders", "profile"]
+    assert results["checkout"] == 200
+
+    groups = dependency_groups(requests)
+    assert [[request.name for request in group] for group in groups] == [["login", "profile", "orders", "checkout"], ["health"]]
+
+
+@pytest.mark.unit
+def test_runner_concurrency_and_failures():
+    app = FakeHost(capacity=1)
+    requests = [
+        make_request("a"),
+        make_request("b", "a"),
+        make_request("c", "b"),
+        make_request("d"),
+        make_request("x", "y"),
+        make_request("y", "x"),
+    ]
+    runner = CollectionRunner(app, Collection(name="c", requests=[]), requests, concurrency=2)
+    runner.start()
+    # the executor only has room for one
+    assert app.order == ["a"]
+
+    app.complete("a", status=500)
+    assert app.order == ["a", "d"]
+    app.complete("d")
+
+    assert runner.done
+    assert runner.failed == {"a": "HTTP 500"}
+    assert runner.succeeded == ["d"]
+    assert set(runner.skipped) == {"b", "c", "x", "y"}
+    assert runner.skipped["x"] == "dependency cycle"
+
+    with pytest.raises(ValueError):
+        CollectionRunner(app, Collection(name="c", requests=[]), [make_request("a", "missing")], concurrency=1)
+
+
+@pytest.mark.unit
+def test_runner_stop_cancels_running_requests():
+    app = FakeHost()
+    runner = CollectionRunner(app, Collection(name="c", requests=[]), [make_request("a"), make_request("b", "a")], concurrency=1)
+    runner.start()
+    assert len(app.in_flight) == 1
+
+    runner.stop()
+    assert not app.in_flight
+    assert runner.done
+    assert runner.skipped == {"a": "run stopped"}
@@ -0,0 +1,253 @@
+import mmap
+import os
+
+import pytest
+
+import controls
+from entities.request import Collection, Method, Request
+from entities.response import Response
+from entities.settings import ResponseStoreSettings, WorkspaceSettings
+from storage import Journal, ResponseStore, SqliteStore
+import util
+
+
+def make_response(size: int, fill: bytes = b"x") -> Response:
+    return Response(status=200, headers={}, data=fill * size)
+
+
+@pytest.mark.unit
+def test_response_store_lookup():
+    store = ResponseStore()
+    response = make_response(10)
+    store["a/b"] = response
+
+    assert "a/b" in store
+    assert store["a/b"] is response
+    assert store.get("a/c") is None
+    assert len(store) == 1
+
+    store["a/b"] = make_response(5)
+    assert len(store) == 1
+    assert store.resident_size == 5
+
+    del store["a/b"]
+    assert "a/b" not in store
+    assert store.resident_size == 0
+
+
+@pytest.mark.unit
+def test_response_store_evicts_least_recently_used():
+    store = ResponseStore(ResponseStoreSettings(memory_budget=100, max_resident_size=100))
+    store["first"] = make_response(60, b"1")
+    store["second"] = make_response(30, b"2")
+    store["first"]  # touch, so 'second' becomes the eviction candidate
+    store["third"] = make_response(30, b"3")
+
+    assert isinstance(store["second"].data, mmap.mmap)
+    assert store["second"].data[:] == b"2" * 30
+    assert isinstance(store["first"].data, bytes)
+    assert isinstance(store["third"].data, bytes)
+    assert store.resident_size == 90
+
+
+@pytest.mark.unit
+def test_response_store_spills_oversized_bodies():
+    store = ResponseStore(ResponseStoreSettings(memory_budget=1000, max_resident_size=10))
+    store["big"] = make_response(50)
+
+    assert isinstance(store["big"].data, mmap.mmap)
+    assert len(store["big"].data) == 50
+    assert store.resident_size == 0
+
+
+@pytest.mark.unit
+def test_response_store_shares_spill_files(tmp_path):
+    settings = ResponseStoreSettings(
+        max_resident_size=10, spill_directory=str(tmp_path), spill_file_size=2 * mmap.ALLOCATIONGRANULARITY, max_spilled=3,
+    )
+    store = ResponseStore(settings)
+    size = mmap.ALLOCATIONGRANULARITY // 2
+    for name in "abc":
+        store[name] = make_response(size, name.encode())
+    store["a"]  # touch, so 'b' is the first to go
+    store["d"] = make_response(size, b"d")
+
+    # the least recently used spilled response made room
+    assert list(store) == ["c", "a", "d"]
+    # 'c' and 'd' share a second file; the first one stays mapped for 'a'
+    for name in "acd":
+        assert store[name].data[:] == name.encode() * size
+    store["e"] = make_response(size, b"e")
+    assert list(store) == ["c", "d", "e"]
+    assert store["e"].data[-1:] == b"e"
+
+
+@pytest.mark.unit
+def test_journal_replay(tmp_path):
+    journal = Journal(str(tmp_path))
+    assert journal.load() == []
+
+    collection = Collection(name="collection", requests=[])
+    journal.create_collection(collection)
+    request = Request(name="request", method=Method.GET, url="http://example.com", headers={})
+    collection.requests.append(request)
+    journal.create_request(collection, request)
+    request.url = "http://example.com/edited"
+    journal.update_request(collection, request)
+
+    # not part of the workspace, so never written
+    journal.update_request(collection, Request(name="", method=Method.GET, url="", headers={}))
+    journal.close()
+
+    journal = Journal(str(tmp_path))
+    collections = journal.load()
+    assert [collection.name for collection in collections] == ["collection"]
+    assert collections[0].requests[0].url == "http://example.com/edited"
+    assert collections[0].requests[0].method is Method.GET
+    journal.close()
+
+
+@pytest.mark.unit
+def test_journal_compaction(tmp_path):
+    journal = Journal(str(tmp_path), WorkspaceSettings(compact_after=3))
+    journal.load()
+    collection = Collection(name="collection", requests=[])
+    journal.create_collection(collection)
+    for index in range(4):
+        request = Request(name=f"request {index}", method=Method.POST, url="http://example.com", headers={})
+        collection.requests.append(request)
+        journal.create_request(collection, request)
+    journal.close()
+
+    assert journal.generation == 1
+    assert sorted(os.listdir(tmp_path)) == ["journal.1.ndjson", "snapshot.1.json"]
+
+    # a torn last entry is ignored
+    with open(tmp_path / "journal.1.ndjson", "a") as file:
+        file.write('{"op": "create_req')
+
+    journal = Journal(str(tmp_path))
+    collections = journal.load()
+    assert [request.name for request in collections[0].requests] == [f"request {index}" for index in range(4)]
+    journal.close()
+
+
+@pytest.mark.unit
+def test_journal_appends_after_torn_entry(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.load()
+    collection = Collection(name="collection", requests=[])
+    journal.create_collection(collection)
+    journal.close()
+
+    with open(tmp_path / "journal.0.ndjson", "a") as file:
+        file.write('{"op": "create_req')
+
+    journal = Journal(str(tmp_path))
+    collection = journal.load()[0]
+    request = Request(name="request", method=Method.GET, url="http://example.com", headers={})
+    collection.requests.append(request)
+    journal.create_request(collection, request)
+    journal.close()
+
+    journal = Journal(str(tmp_path))
+    collections = journal.load()
+    assert [request.name for request in collections[0].requests] == ["request"]
+    journal.close()
+
+
+@pytest.mark.unit
+def test_sqlite_store(tmp_path):
+    store = SqliteStore(str(tmp_path))
+    assert store.load() == []
+
+    collection = Collection(name="collection", requests=[])
+    store.create_collection(collection)
+    for name in ["b", "C", "a", "d"]:
+        request = Request(name=name, method=Method.GET, url=f"http://example.com/{name}", headers={"x": name})
+        collection.requests.append(request)
+        store.create_request(collection, request)
+    request.method = Method.DELETE
+    store.update_request(collection, request)
+    store.close()
+
+    store = SqliteStore(str(tmp_path))
+    collections = store.load()
+    assert [collection.name for collection in collections] == ["collection"]
+    collection = collections[0]
+    # requests are only read when asked for
+    assert collection.requests == []
+    assert store.request_count(collection) == 4
+    assert store.request_names(collection) == ["a", "b", "C", "d"]
+    assert store.request_names(collection, offset=1, limit=2) == ["b", "C"]
+    assert store.has_request(collection, "C") and not store.has_request(collection, "c")
+
+    request = store.get_request(collection, "d")
+    assert request is not None
+    assert request.method is Method.DELETE and request.headers == {"x": "d"}
+    assert store.get_request(collection, "d") is request
+    assert store.get_request(collection, "missing") is None
+
+    request.url = "http://example.com/edited"
+    store.update_request(collection, request)
+    store.close()
+
+    store = SqliteStore(str(tmp_path))
+    collection = store.load()[0]
+    request = store.get_request(collection, "d")
+    assert request is not None and request.url == "http://example.com/edited"
+    store.close()
+
+
+@pytest.mark.unit
+def test_sqlite_store_keeps_recent_requests(tmp_path, monkeypatch):
+    monkeypatch.setattr(SqliteStore, "LOADED_KEPT", 2)
+    store = SqliteStore(str(tmp_path))
+    store.load()
+    collection = Collection(name="collection", requests=[])
+    store.create_collection(collection)
+    for name in "abc":
+        store.create_request(collection, Request(name=name, method=Method.GET, url="http://example.com", headers={}))
+
+    # 'a' was evicted, so it is read again; edits to it are still saved
+    first = store.get_request(collection, "a")
+    assert first is not None
+    assert store.get_request(collection, "a") is first
+    assert store.get_request(collection, "c") is store.get_request(collection, "c")
+    store.get_request(collection, "b")
+    first.url = "http://example.com/a"
+    store.update_request(collection, first)
+    assert store.get_request(collection, "a") is first
+    store.update_request(collection, Request(name="a", method=Method.GET, url="http://example.com/stale", headers={}))
+    store.close()
+
+    store = SqliteStore(str(tmp_path))
+    collection = store.load()[0]
+    request = store.get_request(collection, "a")
+    assert request is not None and request.url == "http://example.com/a"
+    store.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("store_type", [Journal, SqliteStore])
+def test_request_names_follow_name_key(tmp_path, store_type):
+    store = store_type(str(tmp_path))
+    store.load()
+    collection = Collection(name="collection", requests=[])
+    store.create_collection(collection)
+    # str.lower would put "Élan" after "×"; NOCASE only folds ASCII
+    names = ["×", "Élan", "b", "A", "a"]
+    for name in names:
+        request = Request(name=name, method=Method.GET, url="http://example.com", headers={})
+        collection.requests.append(request)
+        store.create_request(collection, request)
+
+    assert [util.name_key(name) for name in store.request_names(collection)] == sorted(map(util.name_key, names))
+    items = controls.PagedItems(
+        lambda offset, limit: store.request_names(collection, offset, limit),
+        lambda: store.request_count(collection),
+        key=util.name_key,
+    )
+    for name in names:
+        assert items[items.index(name)] == name
+    store.close()
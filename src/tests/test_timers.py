@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from timers import TimerQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.unit
+def test_timer_queue_runs_timers_in_deadline_order(clock):
+    timers = TimerQueue()
+    fired = []
+    assert timers.timeout() is None
+
+    timers.schedule(3.0, lambda: fired.append("c"))
+    timers.schedule(1.0, lambda: fired.append("a"))
+    timers.schedule(2.0, lambda: fired.append("b"))
+    # equal deadlines fire in the order they were scheduled
+    timers.schedule(2.0, lambda: fired.append("b2"))
+    assert timers.timeout() == 1.0
+
+    clock[0] += 2.0
+    timers.run_due()
+    assert fired == ["a", "b", "b2"]
+    assert timers.timeout() == 1.0
+
+    clock[0] += 1.0
+    timers.run_due()
+    assert fired == ["a", "b", "b2", "c"]
+    assert timers.timeout() is None
+
+
+@pytest.mark.unit
+def test_timer_queue_skips_cancelled_timers(clock):
+    timers = TimerQueue()
+    fired = []
+    first = timers.schedule(1.0, lambda: fired.append("first"))
+    timers.schedule(2.0, lambda: fired.append("second"))
+    repeating = timers.schedule(0.5, lambda: fired.append("repeating"), interval=0.5)
+
+    first.cancel()
+    repeating.cancel()
+    # cancelled timers no longer count towards the next deadline
+    assert timers.timeout() == 2.0
+
+    clock[0] += 5.0
+    timers.run_due()
+    assert fired == ["second"]
+    assert timers.timeout() is None
+
+
+@pytest.mark.unit
+def test_timer_queue_fires_overdue_timers_once(clock):
+    timers = TimerQueue()
+    fired = []
+    timers.schedule(1.0, lambda: fired.append(time.monotonic()), interval=1.0)
+
+    # a late loop fires a repeating timer once per call, not once per missed interval
+    clock[0] += 10.5
+    assert timers.timeout() == 0.0
+    timers.run_due()
+    assert fired == [110.5]
+    assert timers.timeout() == 0.0
+
+    timers.run_due()
+    assert fired == [110.5, 110.5]
+    # then it is back on its interval
+    assert timers.timeout() == 1.0
@@ -0,0 +1,68 @@
+import heapq
+import itertools
+import time
+import typing
+
+
+class Timer:
+    deadline: float
+    interval: float | None
+    callback: typing.Callable[[], typing.Any]
+    cancelled: bool
+
+    def __init__(self, deadline: float, callback: typing.Callable[[], typing.Any], interval: float | None = None):
+        self.deadline = deadline
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerQueue:
+    __heap: list[tuple[float, int, Timer]]
+    __sequence: typing.Iterator[int]
+
+    def __init__(self):
+        self.__heap = []
+        self.__sequence = itertools.count()
+
+    def schedule(self, delay: float, callback: typing.Callable[[], typing.Any], interval: float | None = None) -> Timer:
+        """
+        Run `callback` after `delay` seconds, then every `interval` seconds
+        if one is given, until the returned timer is cancelled.
+        """
+        timer = Timer(time.monotonic() + delay, callback, interval)
+        self.__push(timer)
+        return timer
+
+    def timeout(self) -> float | None:
+        """
+        Seconds until the next timer is due, or None if nothing is scheduled.
+        """
+        while self.__heap and self.__heap[0][2].cancelled:
+            heapq.heappop(self.__heap)
+
+        if not self.__heap:
+            return None
+        return max(0.0, self.__heap[0][0] - time.monotonic())
+
+    def run_due(self):
+        now = time.monotonic()
+        # taken up front, so a rescheduled timer that is still due waits for the next call
+        due = []
+        while self.__heap and self.__heap[0][0] <= now:
+            due.append(heapq.heappop(self.__heap)[2])
+
+        for timer in due:
+            if timer.cancelled:
+                continue
+
+            if timer.interval is not None:
+                timer.deadline = max(timer.deadline + timer.interval, now)
+                self.__push(timer)
+            timer.callback()
+
+    def __push(self, timer: Timer):
+        heapq.heappush(self.__heap, (timer.deadline, next(self.__sequence), timer))
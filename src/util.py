@@ -4,3 +4,35 @@ def ellipsize(string: str, max_len: int):
     else:
         return string[:max_len-3] + "..."
 
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            break
+        value /= 1024
+
+    if unit == "B":
+        return f"{size} B"
+    return f"{value:.1f} {unit}"
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} us"
+    elif seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def name_key(name: str) -> str:
+    """
+    Sort key of request names. Only ASCII letters are folded, which is the
+    order SQLite's NOCASE collation gives, so names sorted here and names
+    read from a SqliteStore line up.
+    """
+    return name.translate(ASCII_LOWER)
@@ -0,0 +1,56 @@
+import array
+import itertools
+import mmap
+import operator
+import typing
+
+
+# a response body, a buffer still being streamed into, or a spilled body
+type Buffer = bytes | bytearray | mmap.mmap
+
+
+class LineIndex:
+    """
+    Start offsets of every line in a (possibly still growing) body. Only
+    bytes that arrived since the last update are scanned, and the scan
+    itself runs in C via bytes.split and itertools.accumulate.
+    """
+    CHUNK: typing.ClassVar[int] = 1024 * 1024
+
+    __starts: array.array
+    __scanned: int
+
+    def __init__(self):
+        self.__starts = array.array("Q", [0])
+        self.__scanned = 0
+
+    def update(self, body: Buffer):
+        end = len(body)
+        while self.__scanned < end:
+            chunk = body[self.__scanned:self.__scanned + LineIndex.CHUNK]
+            # every piece but the last is terminated by a newline
+            lengths = map(len, chunk.split(b"\n")[:-1])
+            starts = itertools.accumulate(map(operator.add, lengths, itertools.repeat(1)), initial=self.__scanned)
+            self.__starts.extend(itertools.islice(starts, 1, None))
+            self.__scanned += len(chunk)
+
+    def __len__(self) -> int:
+        if self.__scanned == 0:
+            return 0
+        if self.__starts[-1] == self.__scanned:
+            # body ends with a newline, which does not open a visible line
+            return len(self.__starts) - 1
+        return len(self.__starts)
+
+    def span(self, line: int) -> tuple[int, int]:
+        """
+        Byte range of `line`, excluding its newline.
+        """
+        start = self.__starts[line]
+        if line + 1 < len(self.__starts):
+            return start, self.__starts[line + 1] - 1
+        return start, self.__scanned
+
+    @property
+    def size(self) -> int:
+        return self.__scanned
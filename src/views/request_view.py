@@ -5,7 +5,7 @@ import typing
 
 import colors
 from controls import Button, OptionBox, LineEdit, Panel
-from entities.request import Method
+from entities.request import Method, Request
 
 if typing.TYPE_CHECKING:
     from ..app import App
@@ -44,6 +44,15 @@ class RequestView(Panel):
             self.__app.set_focus(self.__url)
         elif ch == ord('S'):
             self.__app.set_focus(self.__send)
+        elif ch == ord('r'):
+            self.__app.set_focus(self.__app.response_pane)
+        elif ch == ord('c'):
+            self.__app.set_focus(self.__app.collection_list)
+
+    def set_request(self, request: Request):
+        self.__method.set_option(request.method.value)
+        self.__url.set_text(request.url)
+        self.__url.background = colors.get_color("contrast")
 
     def update_url(self, url):
         valid = True
@@ -57,10 +66,12 @@ class RequestView(Panel):
         self.__url.background = curses.COLOR_RED if not valid else colors.get_color("contrast")
         if valid and self.__app.context.active_request:
             self.__app.context.active_request.url = url
+            self.__app.save_request(self.__app.context.active_request)
 
     def update_method(self, method: str):
         if self.__app.context.active_request:
             self.__app.context.active_request.method = Method(method)
+            self.__app.save_request(self.__app.context.active_request)
 
     def render(self):
         super().render()
@@ -82,5 +93,3 @@ class RequestView(Panel):
 
         self.__send.render()
 
-        self._win.refresh()
-
@@ -1,47 +1,161 @@
 from __future__ import annotations
-import io
-import logging
+import codecs
+import curses
 import typing
 
-from controls import Panel
-from entities.response import Response
+from controls import Control, Panel
+from entities.response import Response, ResponseTiming
+import util
+from .line_index import Buffer, LineIndex
 
 if typing.TYPE_CHECKING:
     from ..app import App
 
 
-def take_lines(text: str, max_line_length: int, max_lines: int):
-    line = io.StringIO()
-    line_length = 0
-    lines_produced = 0
-    for ch in text:
-        if ch == '\n' or line_length == max_line_length:
-            yield line.getvalue()
-            line = io.StringIO()
-            line_length = 0
-            lines_produced += 1
-            if lines_produced == max_lines:
-                return
-            continue
+def is_binary(prefix: bytes) -> bool:
+    if b"\0" in prefix:
+        return True
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix)
+    except UnicodeDecodeError:
+        return True
+    return False
 
-        line.write(ch)
-        line_length += 1
 
-    if line_length > 0:
-        yield line.getvalue()
+PHASES = ("queued", "connect", "tls", "send", "wait", "download")
+
+
+def waterfall(timing: ResponseTiming, width: int) -> list[str]:
+    """
+    One row per phase: its name, duration and a bar placed on a time axis
+    spanning the whole exchange.
+    """
+    axis = max(width - 21, 1)
+    lines = []
+    offset = 0.0
+    for phase in PHASES:
+        duration = getattr(timing, phase)
+        start = int(offset / timing.total * axis) if timing.total > 0 else 0
+        length = round(duration / timing.total * axis) if timing.total > 0 else 0
+        if duration > 0:
+            length = max(length, 1)
+        bar = " " * min(start, axis - length) + "█" * length
+        lines.append(f"{phase:<9}{util.format_duration(duration):>10}  {bar}")
+        offset += duration
+    connection = "reused connection" if timing.reused else "new connection"
+    lines.append(f"{'total':<9}{util.format_duration(timing.total):>10}  {connection}")
+    return lines
 
 
 class ResponseView(Panel):
+    """
+    Scrollable view of the active response. Rows are wrapped at the pane
+    width in bytes (backing off to a UTF-8 character boundary), so any row
+    can be located from the line index without decoding what precedes it
+    and a repaint only touches the visible rows.
+    """
     __response: Response | None
+    __body: Buffer
+    __index: LineIndex
+    __binary: bool
+    __top: tuple[int, int]  # line, wrapped row within that line
+    __progress: tuple[int, int | None] | None
+    __screen_full: bool
     __loading: bool
+    __title: str | None  # shown instead of the status of a report
+    __show_timing: bool
 
     def __init__(self, parent: App, pos: tuple[int, int], size: tuple[int, int]):
         super().__init__(parent.stdscr, pos, size)
         self.__response = None
+        self.__body = b""
+        self.__index = LineIndex()
+        self.__binary = False
+        self.__top = 0, 0
+        self.__progress = None
+        self.__screen_full = False
         self.__loading = False
+        self.__title = None
+        self.__show_timing = False
+
+    def try_focus(self):
+        if self.__response is None:
+            super().try_focus()
+
+    def on_focus(self):
+        self.repaint()
+
+    def on_unfocus(self):
+        self.repaint()
+
+    def handle_input(self, ch: int):
+        rows = self.pane_size[0]
+        if ch == curses.KEY_DOWN or ch == ord('j'):
+            self.scroll(1)
+        elif ch == curses.KEY_UP or ch == ord('k'):
+            self.scroll(-1)
+        elif ch == curses.KEY_NPAGE or ch == ord(' '):
+            self.scroll(rows)
+        elif ch == curses.KEY_PPAGE or ch == ord('b'):
+            self.scroll(-rows)
+        elif ch == curses.KEY_HOME or ch == ord('g'):
+            self.__top = 0, 0
+            self.repaint()
+        elif ch == curses.KEY_END or ch == ord('G'):
+            self.__top = len(self.__index), 0
+            self.scroll(-rows)
+        elif ch == ord('t'):
+            self.__show_timing = not self.__show_timing
+            self.repaint()
+        elif ch == Control.ESC:
+            self.unfocus()
+
+    def scroll(self, delta: int):
+        line, row = self.__top
+        count = len(self.__index)
+        while delta > 0 and line < count:
+            if row + 1 < self.__rows_in(line):
+                row += 1
+            elif line + 1 < count:
+                line, row = line + 1, 0
+            else:
+                break
+            delta -= 1
+
+        while delta < 0 and (line, row) > (0, 0):
+            if row > 0:
+                row -= 1
+            else:
+                line -= 1
+                row = self.__rows_in(line) - 1
+            delta += 1
+
+        if (line, row) != self.__top:
+            self.__top = line, row
+            self.repaint()
+
+    def __rows_in(self, line: int) -> int:
+        start, end = self.__index.span(line)
+        return max(1, -(-(end - start) // self.pane_size[1]))
+
+    def __row_start(self, start: int, end: int, row: int) -> int:
+        position = start + row * self.pane_size[1]
+        if position >= end:
+            return end
+        # never begin a row on a UTF-8 continuation byte
+        while position > start and self.__body[position] & 0xC0 == 0x80:
+            position -= 1
+        return position
 
     def render(self):
-        super().render()
+        self.__screen_full = False
+        if self.focused:
+            self._win.attron(curses.A_BOLD)
+            super().render()
+            self._win.attroff(curses.A_BOLD)
+        else:
+            super().render()
+        self.__render_status()
 
         if self.__loading:
             self._win.move(1, 1)
@@ -51,30 +165,130 @@ class ResponseView(Panel):
         if self.__response is None:
             return
 
-        try:
-            data = self.__response.data.decode('utf-8')
-        except:
-            logging.exception("failed")
+        if self.__show_timing and self.__response.timing is not None and self.__title is None:
+            for y, line in enumerate(waterfall(self.__response.timing, self.pane_size[1])[:self.pane_size[0]], 1):
+                self._win.move(y, 1)
+                self._win.addnstr(line, self.pane_size[1])
+            self.__screen_full = True
+            return
+
+        if self.__binary:
+            self._win.move(1, 1)
             self._win.addnstr("[binary data]", self.pane_size[1] - 2)
+            self.__screen_full = True
             return
 
-        line_no = 1
-        for line in take_lines(data, self.pane_size[1], self.pane_size[0]):
-            self._win.move(line_no, 1)
-            self._win.addnstr(line, self.pane_size[1])
-            line_no += 1
-            
+        rows, columns = self.pane_size
+        line, row = self.__top
+        count = len(self.__index)
+        y = 1
+        while y <= rows and line < count:
+            start, end = self.__index.span(line)
+            line_rows = self.__rows_in(line)
+            while row < line_rows and y <= rows:
+                row_start = self.__row_start(start, end, row)
+                row_end = self.__row_start(start, end, row + 1)
+                text = bytes(self.__body[row_start:row_end]).decode('utf-8', 'replace').rstrip('\r')
+                self._win.move(y, 1)
+                self._win.addnstr(text, columns)
+                y += 1
+                row += 1
+            line, row = line + 1, 0
+        self.__screen_full = y > rows
+
+    def __render_status(self):
+        if self.__response is None:
+            return
+
+        status = f" {self.__title or self.__response.status} "
+        if self.__title is None and self.__response.cache_status is not None:
+            status += f"· {self.__response.cache_status} "
+        if self.__title is None and self.__response.timing is not None:
+            status += f"· {util.format_duration(self.__response.timing.total)} "
+        if self.__progress is not None:
+            received, total = self.__progress
+            status += "· " + util.format_size(received)
+            if total is not None:
+                status += " / " + util.format_size(total)
+            status += " "
+        else:
+            status += "· " + util.format_size(len(self.__body)) + " "
+
+        count = len(self.__index)
+        if count > self.pane_size[0]:
+            status += f"· {self.__top[0] + 1}/{count} "
+        self._win.addnstr(0, 2, status, max(self._size[1] - 4, 0))
 
     def set_loading(self, loading: bool):
         if self.__loading != loading:
             self.__loading = loading
             self.repaint()
 
-    def set_response(self, response: Response, reset_loading: bool = True):
-        if self.__response == response:
+    def set_response(self, response: Response, reset_loading: bool = True, body: bytearray | None = None):
+        """
+        Display `response`. While it is still streaming, `body` is the buffer
+        its data is being read into; call set_progress as the buffer grows.
+        """
+        buffer = response.data if body is None else body
+        if self.__response is response and self.__body is buffer:
             return
 
+        if self.__response is not response:
+            self.__top = 0, 0
+            self.__index = LineIndex()
+            self.__binary = False
+
         self.__loading = False if reset_loading else self.__loading
+        self.__title = None
         self.__response = response
+        self.__body = buffer
+        self.__progress = None if buffer is response.data else (0, None)
+        self.__update_index()
         self.repaint()
 
+    def clear(self):
+        self.__response = None
+        self.__body = b""
+        self.__index = LineIndex()
+        self.__binary = False
+        self.__top = 0, 0
+        self.__progress = None
+        self.__loading = False
+        self.__title = None
+        self.repaint()
+
+    def set_report(self, title: str, text: str):
+        """
+        Display plain text produced by the app, such as a benchmark report,
+        in place of a response. Updating a report keeps the scroll position.
+        """
+        report = self.__response if self.__title is not None else None
+        if report is None:
+            report = Response(status=0, headers={}, data=b"")
+            self.__top = 0, 0
+        report.data = text.encode()
+        self.__title = title
+        self.__loading = False
+        self.__response = report
+        self.__body = report.data
+        self.__progress = None
+        self.__index = LineIndex()
+        self.__binary = False
+        self.__update_index()
+        self.repaint()
+
+    def set_progress(self, received: int, total: int | None):
+        self.__progress = received, total
+        self.__update_index()
+        if self.__screen_full:
+            # the visible rows cannot change any more, only the counters
+            self._win.border()
+            self.__render_status()
+            self._refresh()
+        else:
+            self.repaint()
+
+    def __update_index(self):
+        if self.__index.size == 0 and self.__body:
+            self.__binary = is_binary(bytes(self.__body[:8192]))
+        self.__index.update(self.__body)